@@ -0,0 +1,137 @@
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+import httpx  # noqa: E402
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from infrastructure.api.auth import security  # noqa: E402
+from infrastructure.api.fastapi_app import app  # noqa: E402
+from infrastructure.cache import LruTtlCache  # noqa: E402
+from infrastructure.persistence.database import Base, get_async_db  # noqa: E402
+from infrastructure.persistence.models import Conversation, User  # noqa: E402
+
+
+def _database(path: Path, users: int):
+    # A SQLite file stands in for MySQL: the statement count is what matters here, not
+    # the latency of this backend.
+    engine = create_engine(
+        f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 30}
+    )
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    conversations = {}
+    with session_factory() as db:
+        for index in range(users):
+            user = User(email=f"user{index}@example.com", password_hash="x")
+            db.add(user)
+            db.flush()
+            conversation = Conversation(user_id=user.id, title="bench")
+            db.add(conversation)
+            db.flush()
+            conversations[user.id] = conversation.id
+        db.commit()
+    return engine, session_factory, conversations
+
+
+def _run(requests: int, users: int, concurrency: int, cache_entries: int) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "bench.db"
+        return asyncio.run(_measure(path, requests, users, concurrency, cache_entries))
+
+
+async def _measure(
+    path: Path, requests: int, users: int, concurrency: int, cache_entries: int
+) -> dict:
+    engine, _, conversations = _database(path, users)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", connect_args={"timeout": 30})
+    session_factory = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+    async def get_test_db():
+        async with session_factory() as session:
+            yield session
+
+    statements = []
+    event.listen(
+        async_engine.sync_engine,
+        "before_cursor_execute",
+        lambda *args: statements.append(args[2]),
+    )
+    app.dependency_overrides[get_async_db] = get_test_db
+    security.principal_cache = LruTtlCache(cache_entries, 30)
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+    slots = asyncio.Semaphore(concurrency)
+    tokens = {
+        user_id: {"Authorization": f"Bearer {security.create_access_token(str(user_id))}"}
+        for user_id in conversations
+    }
+    user_ids = list(conversations)
+
+    async def call(index: int) -> None:
+        user_id = user_ids[index % len(user_ids)]
+        conversation_id = conversations[user_id]
+        headers = tokens[user_id]
+        # The chat screen's calls: sidebar list, open a conversation, send a message.
+        step = index % 3
+        async with slots:
+            if step == 0:
+                await client.get("/conversations", headers=headers)
+            elif step == 1:
+                await client.get(f"/conversations/{conversation_id}", headers=headers)
+            else:
+                await client.post(
+                    f"/conversations/{conversation_id}/messages",
+                    headers=headers,
+                    json={"role": "user", "content": "oi"},
+                )
+
+    started = time.perf_counter()
+    await asyncio.gather(*(call(index) for index in range(requests)))
+    elapsed = time.perf_counter() - started
+    await client.aclose()
+    app.dependency_overrides.pop(get_async_db, None)
+    engine.dispose()
+    await async_engine.dispose()
+
+    user_reads = sum(1 for statement in statements if "FROM users" in statement)
+    return {
+        "queries": len(statements) / requests,
+        "user_reads": user_reads / requests,
+        "requests_per_second": requests / elapsed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="SQL statements per authenticated chat request, with and without the "
+        "principal cache"
+    )
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    header = "principal cache | queries/request | users reads/request | requests/s"
+    print(header)
+    print("-" * len(header))
+    for label, entries in (("off", 0), ("on", 1024)):
+        result = _run(args.requests, args.users, args.concurrency, entries)
+        print(
+            f"{label:<15} | {result['queries']:>15.2f} | {result['user_reads']:>19.2f} | "
+            f"{result['requests_per_second']:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+import httpx  # noqa: E402
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from infrastructure.api.auth.security import Principal, get_current_principal  # noqa: E402
+from infrastructure.api.fastapi_app import app  # noqa: E402
+from infrastructure.persistence.database import Base, get_async_db  # noqa: E402
+from infrastructure.persistence.models import Conversation, User  # noqa: E402
+
+# Importing a conversation history: one POST /conversations/{id}/messages per message
+# (a commit and a refresh each) vs. POST /conversations/{id}/messages/bulk in batches.
+
+
+async def _import(path: Path, messages: list, batch: int) -> dict:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        user = User(email=f"import-{time.time_ns()}@example.com", password_hash="x")
+        db.add(user)
+        db.flush()
+        conversation = Conversation(user_id=user.id, title="import")
+        db.add(conversation)
+        db.commit()
+        principal = Principal(id=user.id, email=user.email, created_at=datetime.utcnow())
+        conversation_id = conversation.id
+    engine.dispose()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+    async def get_test_db():
+        async with session_factory() as session:
+            yield session
+
+    statements = []
+    event.listen(
+        async_engine.sync_engine,
+        "before_cursor_execute",
+        lambda *args: statements.append(args[2]),
+    )
+    app.dependency_overrides[get_async_db] = get_test_db
+    app.dependency_overrides[get_current_principal] = lambda: principal
+    transport = httpx.ASGITransport(app=app)
+    url = f"/conversations/{conversation_id}/messages"
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            started = time.perf_counter()
+            if batch:
+                for start in range(0, len(messages), batch):
+                    chunk = messages[start : start + batch]
+                    response = await client.post(f"{url}/bulk", json={"messages": chunk})
+                    response.raise_for_status()
+            else:
+                for message in messages:
+                    response = await client.post(url, json=message)
+                    response.raise_for_status()
+            elapsed = time.perf_counter() - started
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+        app.dependency_overrides.pop(get_current_principal, None)
+        await async_engine.dispose()
+
+    return {
+        "seconds": elapsed,
+        "messages_per_second": len(messages) / elapsed,
+        "statements": len(statements),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Per-message vs. bulk insertion of a conversation history on SQLite"
+    )
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+
+    roles = ("user", "assistant")
+    messages = [
+        {"role": roles[index % 2], "content": f"mensagem {index} " + "x" * 200}
+        for index in range(args.messages)
+    ]
+
+    header = "path          | seconds | messages/s | SQL statements"
+    print(header)
+    print("-" * len(header))
+    for label, batch in (("per message", 0), (f"bulk ({args.batch})", args.batch)):
+        with tempfile.TemporaryDirectory() as directory:
+            result = asyncio.run(_import(Path(directory) / "bulk.db", messages, batch))
+        print(
+            f"{label:<13} | {result['seconds']:>7.2f} | {result['messages_per_second']:>10.0f} | "
+            f"{result['statements']:>14}"
+        )
+
+
+if __name__ == "__main__":
+    main()
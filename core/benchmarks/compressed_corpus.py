@@ -0,0 +1,102 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from infrastructure.embeddings import PqVectorStore  # noqa: E402
+
+# Memory and recall@k of the product-quantized corpus store against exact cosine over
+# the float32 matrix. Vectors are synthetic sentence-embedding stand-ins: unit vectors
+# near a low-dimensional subspace (topics) plus noise; queries are drawn the same way.
+# "pq only" ranks by the approximate scores; "shortlist N" re-scores the N best codes
+# exactly from the float rows, as /search/dataset does before the quantum rerank.
+
+
+def _vectors(count: int, dim: int, topics: int, rng: np.random.Generator) -> np.ndarray:
+    basis = np.random.default_rng(0).normal(size=(topics, dim))
+    mixture = rng.normal(size=(count, topics)) * (rng.random((count, topics)) < 0.1)
+    vectors = mixture @ basis + 0.5 * rng.normal(size=(count, dim))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+def _recall(found: np.ndarray, exact: np.ndarray) -> float:
+    return len(set(found.tolist()) & set(exact.tolist())) / len(exact)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Memory and recall of the product-quantized corpus store"
+    )
+    parser.add_argument("--documents", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--topics", type=int, default=64)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--subspaces", type=int, nargs="+", default=[24, 48, 96])
+    parser.add_argument("--shortlists", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--train-sample", type=int, default=20000)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    matrix = _vectors(args.documents, args.dim, args.topics, rng)
+    queries = _vectors(args.queries, args.dim, args.topics, rng)
+
+    start = time.perf_counter()
+    exact = [np.argsort(-(matrix @ query), kind="stable")[: args.top_k] for query in queries]
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    print(
+        f"{args.documents} x {args.dim} float32: {matrix.nbytes / 2**20:.1f} MiB, "
+        f"exact search {exact_ms:.1f} ms per query"
+    )
+
+    header = (
+        f"subspaces | MiB   | ratio | train s | add s | pq ms | ranking       "
+        f"| recall@{args.top_k}"
+    )
+    print(header)
+    print("-" * len(header))
+    for subspaces in args.subspaces:
+        start = time.perf_counter()
+        sample = rng.choice(args.documents, min(args.train_sample, args.documents), replace=False)
+        store = PqVectorStore.train(matrix[sample], subspaces)
+        train_s = time.perf_counter() - start
+        start = time.perf_counter()
+        store.add(matrix)
+        add_s = time.perf_counter() - start
+
+        largest = max(args.shortlists)
+        start = time.perf_counter()
+        shortlists = [store.search(query, largest)[0] for query in queries]
+        pq_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+        rows = [("pq only", [ids[: args.top_k] for ids in shortlists])]
+        for size in args.shortlists:
+            rescored = []
+            for query, ids in zip(queries, shortlists):
+                # search returns the best codes first, so a prefix is a smaller shortlist.
+                candidates = ids[:size]
+                rescored.append(candidates[np.argsort(-(matrix[candidates] @ query))[: args.top_k]])
+            rows.append((f"shortlist {size}", rescored))
+
+        for index, (label, found) in enumerate(rows):
+            recall = np.mean([_recall(items, truth) for items, truth in zip(found, exact)])
+            prefix = (
+                f"{subspaces:>9} | {store.nbytes / 2**20:>5.1f} | "
+                f"{matrix.nbytes / store.nbytes:>5.1f} | {train_s:>7.1f} | {add_s:>5.1f} | "
+                f"{pq_ms:>5.1f}"
+                if index == 0
+                else f"{'':>9} | {'':>5} | {'':>5} | {'':>7} | {'':>5} | {'':>5}"
+            )
+            print(f"{prefix} | {label:<13} | {recall:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+from sqlalchemy import create_engine, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+
+from infrastructure.api.auth import security  # noqa: E402
+from infrastructure.api.auth.security import Principal, get_current_principal  # noqa: E402
+from infrastructure.api.fastapi_app import app  # noqa: E402
+from infrastructure.persistence.database import (  # noqa: E402
+    Base,
+    async_database_url,
+    get_async_db,
+    pool_options,
+)
+from infrastructure.persistence.models import Conversation, Message, User  # noqa: E402
+
+# Opening a conversation (GET /conversations/{id}: ownership check + first page of
+# messages) under growing concurrency, on the async routes and on a sync copy of the
+# same handler run in the threadpool, as the routes were before. Point --database-url at
+# a local MySQL (mysql+pymysql://...) for numbers that include network round trips; the
+# default SQLite file only shows the overhead of each model. At high concurrency the sync
+# handlers can exhaust the threadpool while requests wait for a pooled connection; those
+# requests fail after --pool-timeout and are counted as errors.
+
+
+def _seed(engine, users: int, messages: int) -> dict:
+    Base.metadata.create_all(bind=engine)
+    conversations = {}
+    with Session(engine) as db:
+        for index in range(users):
+            user = User(email=f"load{index}-{time.time_ns()}@example.com", password_hash="x")
+            db.add(user)
+            db.flush()
+            conversation = Conversation(user_id=user.id, title="load")
+            db.add(conversation)
+            db.flush()
+            db.add_all(
+                Message(conversation_id=conversation.id, role="user", content=f"m{number}")
+                for number in range(messages)
+            )
+            conversations[user.id] = conversation.id
+        db.commit()
+    return conversations
+
+
+def _sync_app(session_factory, get_test_async_db) -> FastAPI:
+    baseline = FastAPI()
+    baseline.dependency_overrides[get_async_db] = get_test_async_db
+
+    def get_sync_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @baseline.get("/conversations/{conversation_id}")
+    def open_conversation(
+        conversation_id: int,
+        db: Session = Depends(get_sync_db),
+        current_user: Principal = Depends(get_current_principal),
+    ) -> dict:
+        conversation = db.scalar(
+            select(Conversation).where(
+                Conversation.id == conversation_id, Conversation.user_id == current_user.id
+            )
+        )
+        messages = db.scalars(
+            select(Message)
+            .where(Message.conversation_id == conversation.id)
+            .order_by(Message.created_at, Message.id)
+            .limit(201)
+        ).all()
+        return {"id": conversation.id, "messages": [message.content for message in messages]}
+
+    return baseline
+
+
+async def _load(target: FastAPI, calls: list, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=target, raise_app_exceptions=False)
+    slots = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def call(path: str, headers: dict) -> None:
+            nonlocal errors
+            async with slots:
+                started = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                latencies.append(time.perf_counter() - started)
+                errors += response.status_code != 200
+
+        started = time.perf_counter()
+        await asyncio.gather(*(call(path, headers) for path, headers in calls))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests_per_second": len(calls) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+async def _run(database_url: str, args) -> None:
+    options = {"pool_timeout": args.pool_timeout}
+    engine = create_engine(database_url, **(pool_options(database_url) | options))
+    async_url = async_database_url(database_url)
+    async_engine = create_async_engine(async_url, **(pool_options(async_url) | options))
+    conversations = _seed(engine, args.users, args.messages)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    async_session_factory = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+    async def get_test_async_db():
+        async with async_session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = get_test_async_db
+    targets = {"async": app, "sync": _sync_app(session_factory, get_test_async_db)}
+    calls = [
+        (
+            f"/conversations/{conversation_id}",
+            {"Authorization": f"Bearer {security.create_access_token(str(user_id))}"},
+        )
+        for user_id, conversation_id in conversations.items()
+    ]
+    calls = [calls[index % len(calls)] for index in range(args.requests)]
+
+    header = "routes | concurrency | requests/s |  p50 ms |  p95 ms | errors"
+    print(header)
+    print("-" * len(header))
+    try:
+        for concurrency in args.concurrency:
+            for name, target in targets.items():
+                result = await _load(target, calls, concurrency)
+                print(
+                    f"{name:<6} | {concurrency:>11} | {result['requests_per_second']:>10.0f} | "
+                    f"{result['p50_ms']:>7.1f} | {result['p95_ms']:>7.1f} | {result['errors']:>6}"
+                )
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+        engine.dispose()
+        await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Throughput of the chat routes on the async session vs. sync handlers"
+    )
+    parser.add_argument("--database-url", help="sync SQLAlchemy URL; a SQLite file by default")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--pool-timeout", type=float, default=5.0)
+    parser.add_argument(
+        "--concurrency", type=lambda value: [int(item) for item in value.split(",")],
+        default=[1, 8, 32, 128],
+    )
+    args = parser.parse_args()
+
+    if args.database_url:
+        asyncio.run(_run(args.database_url, args))
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(_run(f"sqlite:///{Path(directory) / 'load.db'}", args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# Modules the API must not pull in at import; they load on first use or in the warm-up.
+HEAVY_MODULES = ("torch", "transformers", "sentence_transformers", "pennylane")
+
+
+def _import_app() -> float:
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", "import infrastructure.api.fastapi_app"],
+        cwd=SRC,
+        check=True,
+    )
+    return time.perf_counter() - started
+
+
+def _slowest_imports(limit: int) -> list:
+    # -X importtime writes "import time: self | cumulative | module" to stderr.
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import infrastructure.api.fastapi_app"],
+        cwd=SRC,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        self_time = parts[0].rsplit(":", 1)[-1].strip()
+        if len(parts) != 3 or not self_time.isdigit():
+            continue
+        # Self time, so a module is not counted again in every package above it.
+        rows.append((int(self_time), parts[2].strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def _loaded_heavy_modules() -> list:
+    code = (
+        "import sys, infrastructure.api.fastapi_app;"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=SRC, check=True, capture_output=True, text=True
+    )
+    return [name for name in result.stdout.strip().split(",") if name]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cold import time of the API application")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="slowest top-level imports to list")
+    args = parser.parse_args()
+
+    timings = sorted(_import_app() for _ in range(args.runs))
+    print(
+        f"import infrastructure.api.fastapi_app: median {timings[len(timings) // 2]:.2f}s "
+        f"(min {timings[0]:.2f}s, max {timings[-1]:.2f}s, {args.runs} runs)"
+    )
+    heavy = _loaded_heavy_modules()
+    print(f"heavy modules loaded at import: {', '.join(heavy) if heavy else 'none'}")
+    print()
+    print("self ms | module")
+    for micros, name in _slowest_imports(args.top):
+        print(f"{micros / 1000:>7.1f} | {name}")
+
+
+if __name__ == "__main__":
+    main()
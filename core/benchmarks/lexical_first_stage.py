@@ -0,0 +1,161 @@
+import argparse
+import hashlib
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from application.dtos import (  # noqa: E402
+    DocumentDTO,
+    EvaluationConfigDTO,
+    EvaluationDatasetDTO,
+    EvaluationQueryDTO,
+)
+from application.interfaces import Embedder  # noqa: E402
+from application.services import EvaluationService  # noqa: E402
+from application.use_cases import LexicalStage, RealizarBuscaUseCase  # noqa: E402
+from infrastructure.quantum import CosineSimilarityComparator  # noqa: E402
+from infrastructure.retrieval import Bm25Index, tokenize  # noqa: E402
+
+# Per-query search latency and recall@k over an uploaded-style corpus (every search
+# embeds the documents) with and without the BM25 first stage. Topics are sets of
+# words; a document mixes one topic with shared filler words, a query asks for one
+# topic and that topic's documents are relevant, including those that share no word
+# with the query. Without --model, a stand-in embedder maps the words of a topic close
+# to each other (as a model maps synonyms) and filler words to small random vectors;
+# each text costs --encode-ms-per-text, about what MiniLM takes per short text on one
+# CPU.
+
+
+class TopicEmbedder(Embedder):
+    def __init__(self, dim: int, cost_ms: float) -> None:
+        self._dim = dim
+        self._cost_ms = cost_ms
+
+    def _random(self, name: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.sha256(name.encode("utf-8")).digest()[:8], "big")
+        return np.random.default_rng(seed).normal(size=self._dim)
+
+    def _word_vector(self, word: str) -> np.ndarray:
+        if word.startswith("t") and "w" in word:
+            return self._random(word.split("w")[0]) + 0.5 * self._random(word)
+        return 0.2 * self._random(word)
+
+    def embed_texts(self, texts):
+        texts = list(texts)
+        if self._cost_ms:
+            time.sleep(self._cost_ms * len(texts) / 1000)
+        vectors = []
+        for text in texts:
+            vector = np.zeros(self._dim)
+            for word in tokenize(text):
+                vector += self._word_vector(word)
+            vectors.append(vector.tolist())
+        return vectors
+
+
+def _dataset(args) -> EvaluationDatasetDTO:
+    rng = np.random.default_rng(args.seed)
+    topics = [[f"t{topic}w{word}" for word in range(8)] for topic in range(args.topics)]
+    filler = [f"filler{word}" for word in range(200)]
+    documents, by_topic = [], {}
+    for index in range(args.documents):
+        topic = int(rng.integers(args.topics))
+        words = list(rng.choice(topics[topic], size=4)) + list(rng.choice(filler, size=20))
+        rng.shuffle(words)
+        doc_id = f"d{index}"
+        documents.append(DocumentDTO(doc_id=doc_id, text=" ".join(words)))
+        by_topic.setdefault(topic, []).append(doc_id)
+    queries = []
+    for index in range(args.queries):
+        topic = int(rng.choice(list(by_topic)))
+        queries.append(
+            EvaluationQueryDTO(
+                query_id=f"q{index}",
+                query=" ".join(rng.choice(topics[topic], size=2, replace=False)),
+                relevant_doc_ids=by_topic[topic],
+            )
+        )
+    return EvaluationDatasetDTO(dataset_id="synthetic", documents=documents, queries=queries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Latency and recall of dense search with and without the BM25 first stage"
+    )
+    parser.add_argument("--documents", type=int, default=5000)
+    parser.add_argument("--topics", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--timed-queries", type=int, default=5)
+    parser.add_argument("--pools", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--encode-ms-per-text", type=float, default=2.0)
+    parser.add_argument("--model", action="store_true", help="embed with the local model")
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.model:
+        from infrastructure.embeddings import LocalEmbedder
+
+        embedder = scoring_embedder = LocalEmbedder()
+    else:
+        embedder = TopicEmbedder(args.dim, args.encode_ms_per_text)
+        scoring_embedder = TopicEmbedder(args.dim, 0.0)
+    use_case = RealizarBuscaUseCase(
+        embedder, CosineSimilarityComparator(), CosineSimilarityComparator()
+    )
+    dataset = _dataset(args)
+
+    start = time.perf_counter()
+    index = Bm25Index.build(doc.text for doc in dataset.documents)
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"{len(dataset.documents)} documents, BM25 index built in {build_ms:.0f} ms")
+
+    # Recall comes from one encoding of the whole corpus, cut to each pool.
+    scoring = RealizarBuscaUseCase(
+        scoring_embedder, CosineSimilarityComparator(), CosineSimilarityComparator()
+    )
+    recall = {}
+    for fusion in ("none", "rrf"):
+        config = EvaluationConfigDTO(
+            modes=("classical",),
+            top_ks=(args.top_k,),
+            candidate_ks=(args.top_k,),
+            lexical_pools=tuple(args.pools),
+            fusion=fusion,
+            workers=1,
+        )
+        report = EvaluationService(scoring).avaliar(dataset, config, index)
+        for cell in report.cells:
+            recall[(cell.lexical_pool, fusion)] = cell.recall_at_k.mean
+
+    header = f"first stage       | search ms | recall@{args.top_k} | recall lost"
+    print(header)
+    print("-" * len(header))
+    full = recall[(None, "none")]
+    timed = dataset.queries[: args.timed_queries]
+    for pool in [None] + list(args.pools):
+        for fusion in ("none",) if pool is None else ("none", "rrf"):
+            stage = None
+            if pool is not None:
+                stage = LexicalStage(index=index, pool_size=pool, fusion=fusion)
+            start = time.perf_counter()
+            for item in timed:
+                encoded = use_case.encode(item.query, dataset.documents, lexical=stage)
+                use_case.rank(encoded)
+            search_ms = (time.perf_counter() - start) * 1000 / len(timed)
+            label = "none" if pool is None else f"bm25 {pool}"
+            if fusion == "rrf":
+                label += " + rrf"
+            value = recall[(pool, fusion)]
+            print(f"{label:<17} | {search_ms:>9.1f} | {value:>9.3f} | {full - value:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+import httpx  # noqa: E402
+from fastapi.concurrency import run_in_threadpool  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from infrastructure.api.auth import security  # noqa: E402
+from infrastructure.api.auth.throttle import LoginThrottle  # noqa: E402
+from infrastructure.api.fastapi_app import app  # noqa: E402
+from infrastructure.persistence.database import Base, get_async_db  # noqa: E402
+from infrastructure.persistence.models import User  # noqa: E402
+
+# Login latency while the threadpool is busy with search traffic. The sync search routes
+# run in Starlette's threadpool (40 threads); the "search load" here keeps more requests
+# than that in flight, each holding a thread for --search-ms as an encode or a circuit
+# would. "shared" hashes passwords in that same threadpool, as login did before;
+# "dedicated" uses the password-hash pool.
+
+
+async def _search_load(stop: asyncio.Event, in_flight: int, seconds: float) -> None:
+    async def worker() -> None:
+        while not stop.is_set():
+            await run_in_threadpool(time.sleep, seconds)
+
+    await asyncio.gather(*(worker() for _ in range(in_flight)))
+
+
+async def _logins(client, users: int, logins: int, concurrency: int) -> list:
+    slots = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def login(index: int) -> None:
+        async with slots:
+            started = time.perf_counter()
+            response = await client.post(
+                "/auth/login",
+                data={"username": f"user{index % users}@example.com", "password": "segredo123"},
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+
+    await asyncio.gather(*(login(index) for index in range(logins)))
+    return sorted(latencies)
+
+
+async def _scenario(args, shared: bool, busy: bool) -> dict:
+    original = security._run_password_work
+    if shared:
+        security._run_password_work = run_in_threadpool
+    stop = asyncio.Event()
+    load = (
+        asyncio.create_task(_search_load(stop, args.search_in_flight, args.search_ms / 1000))
+        if busy
+        else None
+    )
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            latencies = await _logins(client, args.users, args.logins, args.concurrency)
+    finally:
+        stop.set()
+        if load is not None:
+            await load
+        security._run_password_work = original
+    return {
+        "p50": latencies[len(latencies) // 2],
+        "p99": latencies[max(0, int(len(latencies) * 0.99) - 1)],
+    }
+
+
+async def _run(path: Path, args) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    password_hash = security.get_password_hash("segredo123")
+    with Session(engine) as db:
+        db.add_all(
+            User(email=f"user{index}@example.com", password_hash=password_hash)
+            for index in range(args.users)
+        )
+        db.commit()
+    engine.dispose()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+    async def get_test_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = get_test_db
+    security.login_throttle = LoginThrottle(0, 1, 0)
+    header = "password hashing | search load | login p50 ms | login p99 ms"
+    print(header)
+    print("-" * len(header))
+    try:
+        for shared in (True, False):
+            for busy in (False, True):
+                result = await _scenario(args, shared, busy)
+                print(
+                    f"{'shared' if shared else 'dedicated':<16} | {'on' if busy else 'off':<11} | "
+                    f"{result['p50']:>12.0f} | {result['p99']:>12.0f}"
+                )
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+        await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Login latency with passwords hashed in the shared threadpool or in "
+        "the dedicated password-hash pool, with and without search load"
+    )
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--search-in-flight", type=int, default=80)
+    parser.add_argument("--search-ms", type=float, default=200.0)
+    args = parser.parse_args()
+
+    print(
+        f"BCRYPT_ROUNDS={security.BCRYPT_ROUNDS} "
+        f"PASSWORD_HASH_WORKERS={security.PASSWORD_HASH_WORKERS}"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(_run(Path(directory) / "login.db", args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+import argparse
+import hashlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from application.dtos import DocumentDTO, SearchRequestDTO  # noqa: E402
+from application.instrumentation import StageTimer  # noqa: E402
+from application.interfaces import Embedder  # noqa: E402
+from application.services import SearchService  # noqa: E402
+from application.services.search.metrics import compute_ranking_metrics  # noqa: E402
+from application.use_cases import BuscarPorArquivoUseCase, RealizarBuscaUseCase  # noqa: E402
+from application.use_cases.search.buscar_por_arquivo_use_case import _chunk_text  # noqa: E402
+from application.use_cases.search.realizar_busca_use_case import SearchResult  # noqa: E402
+from domain.entities import Document  # noqa: E402
+from infrastructure.api.search.file_reader import PdfTxtDocumentTextExtractor  # noqa: E402
+from infrastructure.quantum import (  # noqa: E402
+    CosineSimilarityComparator,
+    L2SamplingComparator,
+    SuperpositionSwapTestComparator,
+    SwapTestQuantumComparator,
+)
+from infrastructure.retrieval import tokenize  # noqa: E402
+
+# Micro and macro benchmarks of the search pipeline, kept as a history to catch
+# regressions:
+#   python benchmarks/suite.py run [--quick] [--only scoring] [--label "antes do cache"]
+#   python benchmarks/suite.py compare [--threshold 0.1]
+# run times every case (median of --repeats runs after one warm-up run), prints a table
+# and appends the run, with the commit and machine, to --history. compare checks the
+# last run against the one before it (or --baseline) and exits with status 1 when a
+# case got slower than the threshold allows; cases run with other params are skipped.
+# Inputs are generated from fixed seeds and, without --model, texts are embedded by a
+# deterministic hashing embedder, so the suite runs offline and two runs time the same
+# work.
+# Cases:
+#   chunk_text/chars=N        _chunk_text over an N-character text
+#   scoring/use_case/docs=N   the classical scoring stage of RealizarBuscaUseCase.encode
+#                             over N documents with stored embeddings (only the query
+#                             is embedded; the time is the "scoring" span)
+#   scoring/matrix/docs=N     CosineSimilarityComparator.compare_many over the same rows
+#   comparator/<name>/dim=D   compare_many of one query against --candidates vectors
+#   ranking_metrics/results=N compute_ranking_metrics over N results and 10 relevant ids
+#   search_service/<mode>     SearchService end to end (embedding, ranking, answer)
+
+HISTORY_PATH = Path(__file__).resolve().parent / "results" / "history.json"
+BACKENDS = ("cosine", "swap_test", "superposition", "l2_sampling")
+MODES = ("classical", "quantum", "compare")
+# Scoring sizes at or above this are timed once (after the warm-up run): at 1e6 documents a
+# single pass over the per-document comparator takes seconds.
+LARGE_CASE_DOCS = 100000
+
+
+class HashingEmbedder(Embedder):
+    # Deterministic stand-in for the model: a text is the sum of one seeded random
+    # vector per token, so texts sharing words get similar vectors.
+
+    def __init__(self, dim: int) -> None:
+        self._dim = dim
+        self._words: dict = {}
+
+    def _word(self, word: str) -> np.ndarray:
+        vector = self._words.get(word)
+        if vector is None:
+            seed = int.from_bytes(hashlib.sha256(word.encode("utf-8")).digest()[:8], "big")
+            vector = np.random.default_rng(seed).normal(size=self._dim)
+            self._words[word] = vector
+        return vector
+
+    def embed_texts(self, texts):
+        vectors = []
+        for text in texts:
+            vector = np.zeros(self._dim)
+            for word in tokenize(text):
+                vector += self._word(word)
+            vectors.append(vector.tolist())
+        return vectors
+
+
+class _ScoringEmbedder(Embedder):
+    # Embeds only the query in the scoring cases, whose documents carry embeddings.
+
+    def __init__(self, dim: int) -> None:
+        self._vector = np.random.default_rng(1).normal(size=dim).tolist()
+
+    def embed_texts(self, texts):
+        return [self._vector for _ in texts]
+
+
+def _text(rng: np.random.Generator, chars: int) -> str:
+    # Sentences of 6 to 24 words drawn from a fixed vocabulary.
+    sentences, length = [], 0
+    while length < chars:
+        words = rng.integers(0, 2000, size=int(rng.integers(6, 25)))
+        sentence = " ".join(f"termo{word}" for word in words).capitalize() + "."
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(sentences)[:chars]
+
+
+def _documents(count: int, seed: int, chars: int = 400) -> list:
+    rng = np.random.default_rng(seed)
+    return [DocumentDTO(doc_id=f"d{index}", text=_text(rng, chars)) for index in range(count)]
+
+
+def _comparator(name: str, seed: int):
+    if name == "cosine":
+        return CosineSimilarityComparator()
+    if name == "superposition":
+        return SuperpositionSwapTestComparator()
+    if name == "l2_sampling":
+        return L2SamplingComparator(seed=seed)
+    return SwapTestQuantumComparator()
+
+
+def _chunk_cases(args):
+    for chars in args.chunk_chars:
+        def make(chars=chars):
+            text = _text(np.random.default_rng(args.seed), chars)
+            return lambda: _chunk_text(text)
+
+        yield f"chunk_text/chars={chars}", {"chars": chars}, args.repeats, make
+
+
+def _scoring_cases(args):
+    for size in args.docs:
+        repeats = 1 if size >= LARGE_CASE_DOCS else args.repeats
+        params = {"docs": size, "dim": args.scoring_dim}
+
+        def rows(size=size):
+            rng = np.random.default_rng(args.seed)
+            return rng.normal(size=(size, args.scoring_dim)).astype(np.float32)
+
+        def use_case_case(size=size):
+            matrix = rows(size)
+            documents = [
+                DocumentDTO(doc_id=f"d{index}", text=f"d{index}", embedding=matrix[index])
+                for index in range(size)
+            ]
+            use_case = RealizarBuscaUseCase(
+                _ScoringEmbedder(args.scoring_dim),
+                CosineSimilarityComparator(),
+                CosineSimilarityComparator(),
+            )
+
+            def run():
+                timer = StageTimer()
+                use_case.encode("consulta", documents, timer=timer)
+                return timer.as_dict()["scoring"]
+
+            return run
+
+        def matrix_case(size=size):
+            matrix = rows(size)
+            query = np.random.default_rng(args.seed + 1).normal(size=args.scoring_dim)
+            comparator = CosineSimilarityComparator()
+            return lambda: comparator.compare_many(query, matrix)
+
+        yield f"scoring/use_case/docs={size}", params, repeats, use_case_case
+        yield f"scoring/matrix/docs={size}", params, repeats, matrix_case
+
+
+def _comparator_cases(args):
+    for backend in args.backends:
+        for dim in args.dims:
+            params = {"dim": dim, "candidates": args.candidates}
+
+            def make(backend=backend, dim=dim):
+                rng = np.random.default_rng(args.seed)
+                query = rng.normal(size=dim)
+                candidates = rng.normal(size=(args.candidates, dim)) + 0.5 * query
+                comparator = _comparator(backend, args.seed)
+                return lambda: comparator.compare_many(query, candidates)
+
+            yield f"comparator/{backend}/dim={dim}", params, args.repeats, make
+
+
+def _metrics_cases(args):
+    for count in args.results:
+        def make(count=count):
+            rng = np.random.default_rng(args.seed)
+            results = [
+                SearchResult(Document(doc_id=f"d{index}", text=""), float(score))
+                for index, score in enumerate(np.sort(rng.random(count))[::-1])
+            ]
+            relevant = [f"d{index}" for index in rng.choice(count, min(10, count), False)]
+            return lambda: compute_ranking_metrics(results, relevant, 10, 0.0, 20)
+
+        yield f"ranking_metrics/results={count}", {"results": count}, args.repeats, make
+
+
+def _service_cases(args, embedder):
+    params = {
+        "docs": args.service_docs,
+        "top_k": 5,
+        "candidate_k": args.candidate_k,
+        "backend": args.backend,
+    }
+    for mode in MODES:
+        def make(mode=mode):
+            service = SearchService(
+                RealizarBuscaUseCase(
+                    embedder,
+                    CosineSimilarityComparator(),
+                    _comparator(args.backend, args.seed),
+                ),
+                BuscarPorArquivoUseCase(PdfTxtDocumentTextExtractor()),
+            )
+            documents = _documents(args.service_docs, args.seed)
+            request = SearchRequestDTO(query=documents[0].text[:80], documents=documents)
+            if mode == "compare":
+                return lambda: service.comparar_por_texto(request, 5, args.candidate_k)
+            return lambda: service.buscar_por_texto(request, mode, 5, args.candidate_k)
+
+        yield f"search_service/{mode}", params, args.repeats, make
+
+
+def _measure(run, repeats: int) -> list:
+    # A run may return its own measurement in ms (a single stage of a larger call).
+    samples = []
+    for index in range(repeats + 1):
+        start = time.perf_counter()
+        value = run()
+        elapsed = (time.perf_counter() - start) * 1000
+        if index:
+            samples.append(value if isinstance(value, float) else elapsed)
+    return samples
+
+
+def _commit() -> str | None:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip()
+
+
+def _load_history(path: Path) -> list:
+    if not path.exists():
+        return []
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def run(args) -> None:
+    if args.quick:
+        args.chunk_chars = [chars for chars in args.chunk_chars if chars <= 100000]
+        args.docs = [size for size in args.docs if size <= 10000]
+        args.dims = [dim for dim in args.dims if dim <= 16]
+        args.service_docs = min(args.service_docs, 50)
+    if args.model:
+        from infrastructure.embeddings import LocalEmbedder
+
+        embedder, embedder_name = LocalEmbedder(), "model"
+    else:
+        embedder, embedder_name = HashingEmbedder(args.dim), f"hashing-{args.dim}"
+
+    groups = [
+        _chunk_cases(args),
+        _scoring_cases(args),
+        _comparator_cases(args),
+        _metrics_cases(args),
+        _service_cases(args, embedder),
+    ]
+    header = "case                                | median ms |    min ms | runs"
+    print(header)
+    print("-" * len(header))
+    results = {}
+    for cases in groups:
+        for name, params, repeats, make in cases:
+            if args.only and not any(part in name for part in args.only):
+                continue
+            samples = _measure(make(), repeats)
+            median = statistics.median(samples)
+            results[name] = {
+                "median_ms": median,
+                "min_ms": min(samples),
+                "repeats": len(samples),
+                "params": params,
+            }
+            print(f"{name:<35} | {median:>9.3f} | {min(samples):>9.3f} | {len(samples):>4}")
+
+    history = _load_history(args.history)
+    history.append(
+        {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "label": args.label,
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "embedder": embedder_name,
+            "quick": args.quick,
+            "seed": args.seed,
+            "results": results,
+        }
+    )
+    args.history.parent.mkdir(parents=True, exist_ok=True)
+    args.history.write_text(json.dumps(history, indent=2) + "\n", encoding="utf-8")
+    print(f"run {len(history) - 1} saved to {args.history}")
+
+
+def compare(args) -> int:
+    history = _load_history(args.history)
+    if len(history) < 2:
+        print(f"{args.history} needs at least two runs to compare")
+        return 2
+    baseline, current = history[args.baseline], history[args.current]
+    for key in ("embedder", "quick", "seed", "cpus", "platform"):
+        if baseline.get(key) != current.get(key):
+            print(f"warning: runs differ in {key}: {baseline.get(key)} vs {current.get(key)}")
+    print(
+        f"baseline {baseline['timestamp']} ({baseline.get('commit')}) vs "
+        f"current {current['timestamp']} ({current.get('commit')}), "
+        f"threshold {args.threshold:.0%}"
+    )
+
+    header = "case                                | base ms | current ms | change | status"
+    print(header)
+    print("-" * len(header))
+    regressions = 0
+    skipped = []
+    for name, result in current["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        # Same name, different inputs (--candidates, --scoring-dim, ...): not comparable.
+        if previous.get("params") != result.get("params"):
+            skipped.append(name)
+            continue
+        before, after = previous["median_ms"], result["median_ms"]
+        change = (after - before) / before if before else 0.0
+        # Sub-noise differences of very fast cases are not reported either way.
+        status = ""
+        if abs(after - before) >= args.min_delta_ms:
+            if change > args.threshold:
+                status = "REGRESSION"
+                regressions += 1
+            elif change < -args.threshold:
+                status = "faster"
+        print(f"{name:<35} | {before:>7.3f} | {after:>10.3f} | {change:>+6.0%} | {status}")
+    for name in skipped:
+        print(
+            f"skipped {name}: params {baseline['results'][name].get('params')} vs "
+            f"{current['results'][name].get('params')}"
+        )
+    print(f"{regressions} regression(s)")
+    return 1 if regressions else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Search pipeline benchmark suite")
+    parser.add_argument("--history", type=Path, default=HISTORY_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and append to history")
+    run_parser.add_argument("--only", nargs="+", help="run cases whose name contains any")
+    run_parser.add_argument("--quick", action="store_true", help="small sizes only")
+    run_parser.add_argument("--label", default="")
+    run_parser.add_argument("--repeats", type=int, default=5)
+    run_parser.add_argument("--seed", type=int, default=11)
+    run_parser.add_argument("--model", action="store_true", help="embed with the local model")
+    run_parser.add_argument("--dim", type=int, default=64, help="hashing embedder dimension")
+    run_parser.add_argument("--chunk-chars", type=int, nargs="+", default=[10000, 100000, 1000000])
+    run_parser.add_argument(
+        "--docs", type=int, nargs="+", default=[100, 1000, 10000, 100000, 1000000]
+    )
+    run_parser.add_argument("--scoring-dim", type=int, default=64)
+    run_parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    run_parser.add_argument("--dims", type=int, nargs="+", default=[4, 16, 64])
+    run_parser.add_argument("--candidates", type=int, default=8)
+    run_parser.add_argument("--results", type=int, nargs="+", default=[100, 10000])
+    run_parser.add_argument("--service-docs", type=int, default=200)
+    run_parser.add_argument("--candidate-k", type=int, default=10)
+    run_parser.add_argument("--backend", choices=BACKENDS, default="swap_test")
+
+    compare_parser = commands.add_parser("compare", help="flag regressions between two runs")
+    compare_parser.add_argument("--baseline", type=int, default=-2, help="history index")
+    compare_parser.add_argument("--current", type=int, default=-1, help="history index")
+    compare_parser.add_argument("--threshold", type=float, default=0.10)
+    compare_parser.add_argument("--min-delta-ms", type=float, default=0.05)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        run(args)
+    else:
+        sys.exit(compare(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from infrastructure.quantum import SuperpositionSwapTestComparator  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Superposition swap test vs. one swap test circuit per candidate"
+    )
+    parser.add_argument("--dim", type=int, default=8)
+    parser.add_argument("--candidates", type=int, nargs="+", default=[2, 4, 8, 16])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    comparator = SuperpositionSwapTestComparator()
+    query = rng.normal(size=args.dim)
+
+    header = "M | mode          | width | depth | gates | executions | wall ms"
+    print(header)
+    print("-" * len(header))
+    for count in args.candidates:
+        candidates = [rng.normal(size=args.dim) for _ in range(count)]
+        report = comparator.resource_report(query, candidates)
+        for label, resources, wall_ms in (
+            ("superposition", report.superposition, report.superposition_ms),
+            ("separate", report.separate, report.separate_ms),
+        ):
+            print(
+                f"{count} | {label:<13} | {resources.width:>5} | {resources.depth:>5} | "
+                f"{resources.gate_count:>5} | {resources.executions:>10} | {wall_ms:>7.2f}"
+            )
+        print(f"{count} | max |error| between estimators: {report.max_abs_error:.2e}")
+
+
+if __name__ == "__main__":
+    main()
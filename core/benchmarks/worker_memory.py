@@ -0,0 +1,153 @@
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from infrastructure.embeddings import CorpusMatrixStore  # noqa: E402
+
+
+def _memory_kb() -> dict:
+    # Rss counts shared pages in full, Pss splits them between the processes mapping
+    # them, and Private_* (USS) is what the worker alone adds.
+    values = {}
+    with open("/proc/self/smaps_rollup", encoding="ascii") as handle:
+        for line in handle:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                values[parts[0][:-1]] = int(parts[1])
+    return {
+        "rss": values.get("Rss", 0),
+        "pss": values.get("Pss", 0),
+        "uss": values.get("Private_Clean", 0) + values.get("Private_Dirty", 0),
+    }
+
+
+class RandomWeightsEncoder:
+    # all-MiniLM-L6-v2 architecture with random weights, for machines without the model
+    # files: the same parameter memory and forward pass, no tokenizer.
+
+    def __init__(self) -> None:
+        from transformers import BertConfig, BertModel
+
+        config = BertConfig(
+            vocab_size=30522,
+            hidden_size=384,
+            num_hidden_layers=6,
+            num_attention_heads=12,
+            intermediate_size=1536,
+        )
+        self._model = BertModel(config).eval()
+
+    def encode(self, texts):
+        import torch
+
+        ids = torch.randint(0, 30522, (len(texts), 32))
+        with torch.no_grad():
+            output = self._model(input_ids=ids).last_hidden_state.mean(dim=1)
+        return output.numpy()
+
+
+def _load_encoder(random_weights: bool):
+    if random_weights:
+        return RandomWeightsEncoder()
+    from infrastructure.embeddings import load_model
+
+    return load_model()
+
+
+class _RandomEmbedder:
+    def embed_texts(self, texts):
+        return np.random.default_rng(0).normal(size=(len(texts), 384)).astype("f4")
+
+
+def _corpus(size: int) -> CorpusMatrixStore:
+    store = CorpusMatrixStore()
+    store.build([f"doc {i}" for i in range(size)], _RandomEmbedder())
+    return store
+
+
+def _worker(encoder, store, random_weights: bool, corpus: int, write_fd: int) -> None:
+    import torch
+
+    torch.set_num_threads(1)
+    if encoder is None:
+        encoder = _load_encoder(random_weights)
+        store = _corpus(corpus)
+    encoder.encode(["warm up the worker", "with a short batch"])
+    float(store.matrix[: len(store)].sum())
+    time.sleep(0.5)
+    os.write(write_fd, json.dumps(_memory_kb()).encode())
+    os._exit(0)
+
+
+def _run(workers: int, preload: bool, random_weights: bool, corpus: int) -> list:
+    import gc
+
+    import torch
+
+    encoder = store = None
+    if preload:
+        torch.set_num_threads(1)
+        encoder = _load_encoder(random_weights)
+        store = _corpus(corpus)
+        encoder.encode(["warm up the master"])
+        gc.freeze()
+
+    pipes, results = [], []
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        if os.fork() == 0:
+            os.close(read_fd)
+            _worker(encoder, store, random_weights, corpus, write_fd)
+        os.close(write_fd)
+        pipes.append(read_fd)
+    for read_fd in pipes:
+        results.append(json.loads(os.read(read_fd, 4096).decode()))
+        os.close(read_fd)
+    for _ in range(workers):
+        os.wait()
+    if preload:
+        gc.unfreeze()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Memory per worker with the model loaded before fork vs. in each worker"
+    )
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--corpus", type=int, default=20000, help="rows in the corpus matrix")
+    parser.add_argument(
+        "--random-weights",
+        action="store_true",
+        help="use an untrained model with the MiniLM architecture (no download needed)",
+    )
+    args = parser.parse_args()
+
+    header = "mode        | worker | rss MiB | pss MiB | uss MiB"
+    print(header)
+    print("-" * len(header))
+    for preload in (False, True):
+        label = "preload" if preload else "per-worker"
+        results = _run(args.workers, preload, args.random_weights, args.corpus)
+        for index, memory in enumerate(results):
+            print(
+                f"{label:<11} | {index:>6} | {memory['rss'] / 1024:>7.1f} | "
+                f"{memory['pss'] / 1024:>7.1f} | {memory['uss'] / 1024:>7.1f}"
+            )
+        # USS is the memory each additional worker costs; Pss depends on how many
+        # processes still map the shared pages when it is sampled.
+        mean_uss = sum(memory["uss"] for memory in results) / len(results) / 1024
+        print(f"{label:<11} | mean uss per worker: {mean_uss:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
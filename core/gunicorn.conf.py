@@ -0,0 +1,25 @@
+# gunicorn -c gunicorn.conf.py infrastructure.api.fastapi_app:app
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+pythonpath = "src"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+
+# Load the app, the embedding model and the public dataset matrices once in the master
+# and fork the workers afterwards, so they share those pages copy-on-write.
+preload_app = os.getenv("PRELOAD_MODELS", "true").lower() == "true"
+
+
+def on_starting(server):
+    if preload_app:
+        from infrastructure.api.preload import preload
+
+        preload()
+
+
+def post_fork(server, worker):
+    from infrastructure.api.preload import configure_worker
+
+    configure_worker(workers)
@@ -1,6 +1,20 @@
 from application.dtos.common import DocumentDTO, ErrorDTO
+from application.dtos.corpus import CorpusManifestDTO, CorpusSegmentDTO, CorpusSummaryDTO
+from application.dtos.evaluation import (
+    EvaluationCellDTO,
+    EvaluationConfigDTO,
+    EvaluationDatasetDTO,
+    EvaluationQueryDTO,
+    EvaluationReportDTO,
+    LatencySummaryDTO,
+    MetricSummaryDTO,
+)
 from application.dtos.search import (
+    BatchSearchRequestDTO,
+    BatchSearchResponseDTO,
+    QuantumMetricsDTO,
     SearchComparisonDTO,
+    SearchEventDTO,
     SearchFileRequestDTO,
     SearchMetricsDTO,
     SearchRequestDTO,
@@ -13,10 +27,24 @@ __all__ = [
     "DocumentDTO",
     "ErrorDTO",
     "SearchRequestDTO",
+    "BatchSearchRequestDTO",
     "SearchFileRequestDTO",
     "SearchResultDTO",
     "SearchMetricsDTO",
+    "QuantumMetricsDTO",
     "SearchResponseLiteDTO",
     "SearchComparisonDTO",
     "SearchResponseDTO",
+    "SearchEventDTO",
+    "BatchSearchResponseDTO",
+    "EvaluationQueryDTO",
+    "EvaluationDatasetDTO",
+    "EvaluationConfigDTO",
+    "MetricSummaryDTO",
+    "LatencySummaryDTO",
+    "EvaluationCellDTO",
+    "EvaluationReportDTO",
+    "CorpusSegmentDTO",
+    "CorpusManifestDTO",
+    "CorpusSummaryDTO",
 ]
@@ -1,7 +1,12 @@
-﻿from dataclasses import dataclass
+﻿from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DocumentDTO:
     doc_id: str
     text: str
+    sentences: Optional[List[str]] = None
+    sentence_embeddings: Optional[List[List[float]]] = None
+    # Stored embedding of text (documents of an indexed corpus); not re-embedded.
+    embedding: Optional[Sequence[float]] = field(default=None, compare=False)
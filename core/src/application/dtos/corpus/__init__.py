@@ -0,0 +1,3 @@
+from .corpus_dtos import CorpusManifestDTO, CorpusSegmentDTO, CorpusSummaryDTO
+
+__all__ = ["CorpusSegmentDTO", "CorpusManifestDTO", "CorpusSummaryDTO"]
@@ -0,0 +1,34 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class CorpusSegmentDTO:
+    # An immutable batch of documents and their embeddings, one row each.
+    name: str
+    doc_ids: List[str]
+    texts: List[str]
+    embeddings: np.ndarray
+
+
+@dataclass(frozen=True)
+class CorpusManifestDTO:
+    # The committed state of a corpus: its segments in order and the tombstoned rows
+    # of each. version grows with every write; model names the embedder of the rows.
+    corpus_id: str
+    model: str
+    version: int = 0
+    segments: Tuple[str, ...] = ()
+    deleted: Dict[str, Tuple[int, ...]] = field(default_factory=dict)
+    next_segment: int = 0
+
+
+@dataclass(frozen=True)
+class CorpusSummaryDTO:
+    corpus_id: str
+    documents: int
+    segments: int
+    deleted_rows: int
+    version: int
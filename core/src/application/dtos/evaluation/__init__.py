@@ -0,0 +1,19 @@
+from .evaluation_dtos import (
+    EvaluationCellDTO,
+    EvaluationConfigDTO,
+    EvaluationDatasetDTO,
+    EvaluationQueryDTO,
+    EvaluationReportDTO,
+    LatencySummaryDTO,
+    MetricSummaryDTO,
+)
+
+__all__ = [
+    "EvaluationQueryDTO",
+    "EvaluationDatasetDTO",
+    "EvaluationConfigDTO",
+    "MetricSummaryDTO",
+    "LatencySummaryDTO",
+    "EvaluationCellDTO",
+    "EvaluationReportDTO",
+]
@@ -0,0 +1,75 @@
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from application.dtos.common import DocumentDTO
+
+
+@dataclass(frozen=True)
+class EvaluationQueryDTO:
+    query_id: str
+    query: str
+    relevant_doc_ids: List[str]
+
+
+@dataclass(frozen=True)
+class EvaluationDatasetDTO:
+    dataset_id: str
+    documents: List[DocumentDTO]
+    queries: List[EvaluationQueryDTO]
+
+
+@dataclass(frozen=True)
+class EvaluationConfigDTO:
+    modes: Tuple[str, ...] = ("classical", "quantum")
+    top_ks: Tuple[int, ...] = (1, 3, 5)
+    candidate_ks: Tuple[int, ...] = (10, 20)
+    confidence: float = 0.95
+    workers: int = 4
+    # BM25 pool sizes to evaluate besides the full corpus, and how pools are ranked.
+    lexical_pools: Tuple[int, ...] = ()
+    fusion: str = "none"
+
+
+@dataclass(frozen=True)
+class MetricSummaryDTO:
+    mean: Optional[float]
+    std: Optional[float]
+    ci_low: Optional[float]
+    ci_high: Optional[float]
+
+
+@dataclass(frozen=True)
+class LatencySummaryDTO:
+    mean_ms: float
+    p50_ms: float
+    p90_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+@dataclass(frozen=True)
+class EvaluationCellDTO:
+    mode: str
+    top_k: int
+    candidate_k: int
+    queries: int
+    labelled_queries: int
+    recall_at_k: MetricSummaryDTO
+    mrr: MetricSummaryDTO
+    ndcg_at_k: MetricSummaryDTO
+    latency: LatencySummaryDTO
+    # Set on cells ranked from a BM25 pool: recall@k of the full-corpus cell with the
+    # same mode, top_k and candidate_k minus this cell's, per labelled query.
+    lexical_pool: Optional[int] = None
+    recall_lost: Optional[MetricSummaryDTO] = None
+
+
+@dataclass(frozen=True)
+class EvaluationReportDTO:
+    dataset_id: str
+    queries: int
+    documents: int
+    encode_ms: float
+    duration_ms: float
+    confidence: float
+    cells: List[EvaluationCellDTO] = field(default_factory=list)
@@ -1,5 +1,9 @@
 from .search_dtos import (
+    BatchSearchRequestDTO,
+    BatchSearchResponseDTO,
+    QuantumMetricsDTO,
     SearchComparisonDTO,
+    SearchEventDTO,
     SearchFileRequestDTO,
     SearchMetricsDTO,
     SearchRequestDTO,
@@ -10,10 +14,14 @@ from .search_dtos import (
 
 __all__ = [
     "SearchRequestDTO",
+    "BatchSearchRequestDTO",
     "SearchFileRequestDTO",
     "SearchResultDTO",
     "SearchMetricsDTO",
+    "QuantumMetricsDTO",
     "SearchResponseLiteDTO",
     "SearchComparisonDTO",
     "SearchResponseDTO",
+    "SearchEventDTO",
+    "BatchSearchResponseDTO",
 ]
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 
 from application.dtos.common import DocumentDTO
 
@@ -10,6 +10,12 @@ class SearchRequestDTO:
     documents: List[DocumentDTO]
 
 
+@dataclass(frozen=True)
+class BatchSearchRequestDTO:
+    queries: List[str]
+    documents: List[DocumentDTO]
+
+
 @dataclass(frozen=True)
 class SearchFileRequestDTO:
     query: str
@@ -17,13 +23,28 @@ class SearchFileRequestDTO:
     content: bytes
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SearchResultDTO:
     doc_id: str
     text: str
     score: float
 
 
+@dataclass(frozen=True)
+class QuantumMetricsDTO:
+    prefilter_ms: float
+    rerank_ms: float
+    simulator_ms: float
+    python_overhead_ms: float
+    circuit_executions: int
+    qubits: Optional[int] = None
+    circuit_depth: Optional[int] = None
+    gate_counts: Dict[str, int] = field(default_factory=dict)
+    # Candidates actually reranked; lower than candidate_k when a latency budget applied.
+    effective_candidate_k: Optional[int] = None
+    budget_truncated: bool = False
+
+
 @dataclass(frozen=True)
 class SearchMetricsDTO:
     recall_at_k: Optional[float]
@@ -33,6 +54,10 @@ class SearchMetricsDTO:
     k: int
     candidate_k: int
     has_labels: bool
+    quantum: Optional[QuantumMetricsDTO] = None
+    cached: bool = False
+    effective_candidate_k: Optional[int] = None
+    budget_truncated: bool = False
 
 
 @dataclass(frozen=True)
@@ -56,3 +81,23 @@ class SearchResponseDTO:
     answer: Optional[str] = None
     metrics: Optional[SearchMetricsDTO] = None
     comparison: Optional[SearchComparisonDTO] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class BatchSearchResponseDTO:
+    mode: str
+    responses: List[SearchResponseDTO]
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class SearchEventDTO:
+    # One step of a progressive search: "results", "answer" or "done", or "error"
+    # when a later step could not run.
+    event: str
+    mode: Optional[str] = None
+    response: Optional[SearchResponseLiteDTO] = None
+    answer: Optional[str] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+    detail: Optional[str] = None
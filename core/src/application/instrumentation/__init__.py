@@ -0,0 +1,4 @@
+from .rerank_cost import RerankCostModel
+from .stage_timer import StageLatencyAggregator, StageTimer
+
+__all__ = ["StageTimer", "StageLatencyAggregator", "RerankCostModel"]
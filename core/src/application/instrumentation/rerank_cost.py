@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import threading
+
+
+class RerankCostModel:
+    # Exponentially weighted moving average of the rerank cost per candidate, fed by
+    # every quantum rerank. Shared between requests so budgets are sized from recent
+    # measurements of the comparator actually in use.
+
+    def __init__(self, alpha: float = 0.2) -> None:
+        self._alpha = alpha
+        self._per_candidate_ms: float | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def per_candidate_ms(self) -> float | None:
+        with self._lock:
+            return self._per_candidate_ms
+
+    def observe(self, candidates: int, elapsed_ms: float) -> None:
+        if candidates <= 0:
+            return
+        sample = elapsed_ms / candidates
+        with self._lock:
+            if self._per_candidate_ms is None:
+                self._per_candidate_ms = sample
+            else:
+                self._per_candidate_ms += self._alpha * (sample - self._per_candidate_ms)
+
+    def fit(self, budget_ms: float, candidate_k: int) -> int:
+        # Largest candidate count whose estimated rerank cost fits the budget. Without
+        # measurements yet the request is trusted and the deadline check has to stop it.
+        per_candidate_ms = self.per_candidate_ms
+        if budget_ms <= 0:
+            return 0
+        if not per_candidate_ms:
+            return candidate_k
+        return max(0, min(candidate_k, int(budget_ms // per_candidate_ms)))
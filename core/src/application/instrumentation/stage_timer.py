@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, Mapping, Sequence
+
+
+class StageTimer:
+    # Collects wall-clock milliseconds per pipeline stage. Children share the same
+    # map and only add a name prefix, so compare mode can time both runs apart.
+
+    def __init__(self, prefix: str = "", stages: Dict[str, float] | None = None) -> None:
+        self._prefix = prefix
+        self._stages: Dict[str, float] = stages if stages is not None else {}
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000)
+
+    def add(self, name: str, elapsed_ms: float) -> None:
+        key = f"{self._prefix}{name}"
+        self._stages[key] = self._stages.get(key, 0.0) + elapsed_ms
+
+    def child(self, prefix: str) -> StageTimer:
+        return StageTimer(prefix=f"{self._prefix}{prefix}.", stages=self._stages)
+
+    def as_dict(self) -> Dict[str, float]:
+        return dict(self._stages)
+
+
+class StageLatencyAggregator:
+    # Keeps the last `window` samples per stage in memory and reports percentiles.
+
+    def __init__(self, window: int = 1000) -> None:
+        self._window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stages: Mapping[str, float]) -> None:
+        with self._lock:
+            for name, elapsed_ms in stages.items():
+                samples = self._samples.get(name)
+                if samples is None:
+                    samples = self._samples[name] = deque(maxlen=self._window)
+                samples.append(elapsed_ms)
+
+    def percentiles(
+        self, quantiles: Sequence[int] = (50, 90, 95, 99)
+    ) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            snapshot = {name: sorted(samples) for name, samples in self._samples.items()}
+
+        summary: Dict[str, Dict[str, float]] = {}
+        for name, values in snapshot.items():
+            if not values:
+                continue
+            stats: Dict[str, float] = {"count": len(values)}
+            for quantile in quantiles:
+                # Nearest-rank percentile.
+                rank = max(1, -(-quantile * len(values) // 100))
+                stats[f"p{quantile}"] = values[rank - 1]
+            summary[name] = stats
+        return summary
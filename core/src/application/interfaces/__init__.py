@@ -1,5 +1,19 @@
 ﻿from .embedder import Embedder
-from .quantum_comparator import QuantumComparator
+from .quantum_comparator import CircuitStats, IndexedCandidates, QuantumComparator
 from .document_text_extractor import DocumentTextExtractor
+from .search_result_cache import SearchResultCache
+from .lexical_index import LexicalIndex
+from .vector_index import VectorIndex
+from .corpus_segment_store import CorpusSegmentStore
 
-__all__ = ["Embedder", "QuantumComparator", "DocumentTextExtractor"]
+__all__ = [
+    "Embedder",
+    "QuantumComparator",
+    "CircuitStats",
+    "IndexedCandidates",
+    "DocumentTextExtractor",
+    "SearchResultCache",
+    "LexicalIndex",
+    "VectorIndex",
+    "CorpusSegmentStore",
+]
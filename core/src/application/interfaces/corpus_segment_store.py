@@ -0,0 +1,40 @@
+from abc import ABC, abstractmethod
+from typing import ContextManager, Optional, Sequence
+
+from application.dtos import CorpusManifestDTO, CorpusSegmentDTO
+
+
+class CorpusSegmentStore(ABC):
+    # Durable storage of indexed corpora as append-only segments plus a manifest.
+    # Writing the manifest commits a change: segments it does not name are ignored.
+
+    @abstractmethod
+    def read_manifest(self, corpus_id: str) -> Optional[CorpusManifestDTO]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def write_manifest(self, manifest: CorpusManifestDTO) -> None:
+        # Replaces the previous manifest atomically.
+        raise NotImplementedError
+
+    @abstractmethod
+    def read_segment(self, corpus_id: str, name: str) -> CorpusSegmentDTO:
+        raise NotImplementedError
+
+    @abstractmethod
+    def write_segment(self, corpus_id: str, segment: CorpusSegmentDTO) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_segments(self, corpus_id: str, names: Sequence[str]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_corpus(self, corpus_id: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def locked(self, corpus_id: str) -> ContextManager[None]:
+        # Held around every change of a corpus, so writers in other processes (other
+        # workers) never commit over each other.
+        raise NotImplementedError
@@ -0,0 +1,17 @@
+from abc import ABC, abstractmethod
+from typing import Tuple
+
+import numpy as np
+
+
+class LexicalIndex(ABC):
+    @abstractmethod
+    def __len__(self) -> int:
+        # Number of indexed documents.
+        raise NotImplementedError
+
+    @abstractmethod
+    def top(self, query: str, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        # Positions (in indexing order) and scores of the count best matching
+        # documents, best first.
+        raise NotImplementedError
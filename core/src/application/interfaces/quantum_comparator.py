@@ -1,5 +1,37 @@
 ﻿from abc import ABC, abstractmethod
-from typing import Sequence
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+
+@dataclass(frozen=True)
+class CircuitStats:
+    executions: int
+    simulator_ms: float
+    qubits: Optional[int] = None
+    depth: Optional[int] = None
+    gate_counts: Dict[str, int] = field(default_factory=dict)
+
+
+class IndexedCandidates(Sequence[Sequence[float]]):
+    # Rerank candidates that are rows of a corpus the comparator indexed beforehand
+    # (see QuantumComparator.index_corpus). They read as their vectors, so any
+    # comparator scores them; the one that built index reads the rows from it
+    # instead of preparing the vectors again. Slices keep the index.
+
+    def __init__(
+        self, vectors: Sequence[Sequence[float]], index: Any, rows: Sequence[int]
+    ) -> None:
+        self.vectors = vectors
+        self.index = index
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return IndexedCandidates(self.vectors[item], self.index, self.rows[item])
+        return self.vectors[item]
 
 
 class QuantumComparator(ABC):
@@ -7,3 +39,48 @@ class QuantumComparator(ABC):
     def compare(self, vector_a: Sequence[float], vector_b: Sequence[float]) -> float:
         # Return similarity score in [0, 1].
         raise NotImplementedError
+
+    def compare_many(
+        self, vector_a: Sequence[float], vectors: Sequence[Sequence[float]]
+    ) -> List[float]:
+        # Score one vector against many; override when a batched strategy exists.
+        return [self.compare(vector_a, vector) for vector in vectors]
+
+    def compare_matrix(
+        self, vectors_a: Sequence[Sequence[float]], vectors_b: Sequence[Sequence[float]]
+    ) -> List[List[float]]:
+        # Score every vector of vectors_a against every vector of vectors_b.
+        return [self.compare_many(vector_a, vectors_b) for vector_a in vectors_a]
+
+    def compare_batch(
+        self,
+        vectors_a: Sequence[Sequence[float]],
+        candidates: Sequence[Sequence[Sequence[float]]],
+    ) -> List[List[float]]:
+        # Score each vector of vectors_a against its own list of candidates.
+        return [
+            self.compare_many(vector_a, vectors)
+            for vector_a, vectors in zip(vectors_a, candidates)
+        ]
+
+    @property
+    def linear_cost(self) -> bool:
+        # Whether compare_many costs about the same per candidate however many it gets
+        # (one circuit per candidate, as the default loop). Budgeted reranks split only
+        # such comparators into chunks; the others get the fitted candidates at once.
+        return True
+
+    @property
+    def indexes_corpora(self) -> bool:
+        # Whether index_corpus is worth calling for corpora searched repeatedly.
+        return False
+
+    def index_corpus(self, vectors: Sequence[Sequence[float]]) -> Any:
+        # State built once per corpus, when it is ingested, and reused by every rerank
+        # of its documents through IndexedCandidates.
+        raise NotImplementedError
+
+    def consume_stats(self, with_resources: bool = False) -> Optional[CircuitStats]:
+        # Return and reset the circuit stats gathered since the last call; None for
+        # comparators that do not run circuits.
+        return None
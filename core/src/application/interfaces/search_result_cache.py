@@ -0,0 +1,14 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from application.dtos import SearchResponseDTO
+
+
+class SearchResultCache(ABC):
+    @abstractmethod
+    def get(self, key: str) -> Optional[SearchResponseDTO]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, key: str, response: SearchResponseDTO) -> None:
+        raise NotImplementedError
@@ -0,0 +1,16 @@
+from abc import ABC, abstractmethod
+from typing import Sequence, Tuple
+
+import numpy as np
+
+
+class VectorIndex(ABC):
+    @abstractmethod
+    def __len__(self) -> int:
+        # Number of indexed vectors.
+        raise NotImplementedError
+
+    @abstractmethod
+    def search(self, query_vector: Sequence[float], count: int) -> Tuple[np.ndarray, np.ndarray]:
+        # Ids and approximate cosine scores of the count nearest vectors, best first.
+        raise NotImplementedError
@@ -5,11 +5,25 @@ from domain.entities import Document
 
 
 def document_dto_to_entity(dto: DocumentDTO) -> Document:
-    return Document(doc_id=dto.doc_id, text=dto.text)
+    return Document(
+        doc_id=dto.doc_id,
+        text=dto.text,
+        sentences=tuple(dto.sentences) if dto.sentences is not None else None,
+        sentence_embeddings=(
+            tuple(dto.sentence_embeddings) if dto.sentence_embeddings is not None else None
+        ),
+    )
 
 
 def document_entity_to_dto(entity: Document) -> DocumentDTO:
-    return DocumentDTO(doc_id=entity.doc_id, text=entity.text)
+    return DocumentDTO(
+        doc_id=entity.doc_id,
+        text=entity.text,
+        sentences=list(entity.sentences) if entity.sentences is not None else None,
+        sentence_embeddings=(
+            list(entity.sentence_embeddings) if entity.sentence_embeddings is not None else None
+        ),
+    )
 
 
 def results_to_dtos(results: Iterable) -> list[SearchResultDTO]:
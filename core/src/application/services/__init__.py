@@ -1,3 +1,5 @@
-﻿from application.services.search.search_service import SearchService
+﻿from application.services.evaluation.evaluation_service import EvaluationService
+from application.services.search.search_service import SearchService
+from application.services.corpus.corpus_index_service import CorpusIndexService
 
-__all__ = ["SearchService"]
+__all__ = ["SearchService", "EvaluationService", "CorpusIndexService"]
@@ -0,0 +1,3 @@
+from .corpus_index_service import CorpusExistsError, CorpusIndexService
+
+__all__ = ["CorpusIndexService", "CorpusExistsError"]
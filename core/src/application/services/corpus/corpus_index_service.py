@@ -0,0 +1,318 @@
+import re
+import threading
+import uuid
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from application.dtos import (
+    CorpusManifestDTO,
+    CorpusSegmentDTO,
+    CorpusSummaryDTO,
+    DocumentDTO,
+)
+from application.interfaces import CorpusSegmentStore, Embedder
+
+# A corpus is compacted into a single segment once more than this share of its rows
+# is tombstoned or it has more than this many segments.
+COMPACT_DELETED_RATIO = 0.3
+COMPACT_MAX_SEGMENTS = 8
+# Lock-free reads of a corpus retried after a concurrent compaction before reading
+# under the corpus lock.
+LOAD_ATTEMPTS = 3
+
+_CORPUS_ID = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+class CorpusExistsError(ValueError):
+    pass
+
+
+@dataclass
+class _Corpus:
+    manifest: CorpusManifestDTO
+    segments: Dict[str, CorpusSegmentDTO]
+    # Live doc_id -> (segment, row), in segment then row order.
+    rows: Dict[str, Tuple[str, int]]
+    # Search view of the live documents, built on first use.
+    documents: Optional[List[DocumentDTO]] = None
+
+
+def _live_rows(
+    manifest: CorpusManifestDTO, segments: Dict[str, CorpusSegmentDTO]
+) -> Dict[str, Tuple[str, int]]:
+    rows: Dict[str, Tuple[str, int]] = {}
+    for name in manifest.segments:
+        deleted = set(manifest.deleted.get(name, ()))
+        for row, doc_id in enumerate(segments[name].doc_ids):
+            if row not in deleted:
+                rows[doc_id] = (name, row)
+    return rows
+
+
+def _tombstones(deleted: Dict[str, Set[int]]) -> Dict[str, Tuple[int, ...]]:
+    return {name: tuple(sorted(rows)) for name, rows in deleted.items() if rows}
+
+
+class CorpusIndexService:
+    # Persistent corpora searched by id. Documents are embedded once, when added or
+    # updated, and kept in append-only segments: an update appends the new text and
+    # tombstones the old row, a delete only tombstones it. Compaction rewrites the
+    # live rows as one segment. Every change commits a new manifest, and reads check
+    # the manifest version, so other processes' changes are picked up. Writers of a
+    # corpus are serialized by its own lock; reads take none and return the corpus as
+    # of its last commit, so they never wait for a writer's embedding.
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        store: CorpusSegmentStore,
+        model_name: str = "",
+        compact_ratio: float = COMPACT_DELETED_RATIO,
+        max_segments: int = COMPACT_MAX_SEGMENTS,
+    ) -> None:
+        self._embedder = embedder
+        self._store = store
+        self._model_name = model_name
+        self._compact_ratio = compact_ratio
+        self._max_segments = max_segments
+        self._corpora: Dict[str, _Corpus] = {}
+        self._writers: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def criar_corpus(
+        self, documents: Iterable[DocumentDTO], corpus_id: str | None = None
+    ) -> CorpusSummaryDTO:
+        corpus_id = corpus_id or uuid.uuid4().hex
+        if not _CORPUS_ID.fullmatch(corpus_id):
+            raise ValueError("Invalid corpus id")
+        with self._writer(corpus_id), self._store.locked(corpus_id):
+            if self._store.read_manifest(corpus_id) is not None:
+                raise CorpusExistsError(corpus_id)
+            manifest = CorpusManifestDTO(corpus_id=corpus_id, model=self._model_name)
+            return self._upsert(_Corpus(manifest, {}, {}), documents, create=True)
+
+    def adicionar_documentos(
+        self, corpus_id: str, documents: Iterable[DocumentDTO]
+    ) -> Optional[CorpusSummaryDTO]:
+        # Adds new doc_ids and replaces the text of known ones; documents whose text
+        # did not change are not embedded again.
+        with self._writer(corpus_id), self._store.locked(corpus_id):
+            corpus = self._read(corpus_id)
+            if corpus is None:
+                return None
+            return self._upsert(corpus, documents)
+
+    def remover_documentos(
+        self, corpus_id: str, doc_ids: Sequence[str]
+    ) -> Optional[CorpusSummaryDTO]:
+        with self._writer(corpus_id), self._store.locked(corpus_id):
+            corpus = self._read(corpus_id)
+            if corpus is None:
+                return None
+            deleted = {name: set(rows) for name, rows in corpus.manifest.deleted.items()}
+            located = [corpus.rows[doc_id] for doc_id in doc_ids if doc_id in corpus.rows]
+            if not located:
+                return self._summary(corpus)
+            for name, row in located:
+                deleted.setdefault(name, set()).add(row)
+            manifest = replace(corpus.manifest, deleted=_tombstones(deleted))
+            return self._summary(self._commit(corpus, manifest, []))
+
+    def compactar(self, corpus_id: str) -> Optional[CorpusSummaryDTO]:
+        with self._writer(corpus_id), self._store.locked(corpus_id):
+            corpus = self._read(corpus_id)
+            if corpus is None:
+                return None
+            return self._summary(self._compact(corpus))
+
+    def remover_corpus(self, corpus_id: str) -> bool:
+        if not _CORPUS_ID.fullmatch(corpus_id):
+            return False
+        with self._writer(corpus_id), self._store.locked(corpus_id):
+            self._corpora.pop(corpus_id, None)
+            if self._store.read_manifest(corpus_id) is None:
+                return False
+            self._store.delete_corpus(corpus_id)
+            return True
+
+    def resumo(self, corpus_id: str) -> Optional[CorpusSummaryDTO]:
+        corpus = self._load(corpus_id)
+        return self._summary(corpus) if corpus is not None else None
+
+    def documentos(self, corpus_id: str) -> Optional[List[DocumentDTO]]:
+        # Live documents with their stored embeddings. Rows embedded by another model
+        # go without one (searches embed them) until the next compaction.
+        loaded = self.documentos_versionados(corpus_id)
+        return loaded[1] if loaded is not None else None
+
+    def documentos_versionados(
+        self, corpus_id: str
+    ) -> Optional[Tuple[CorpusManifestDTO, List[DocumentDTO]]]:
+        # The documents with the manifest they were read at, so callers can cache
+        # what they derive from them by version.
+        corpus = self._load(corpus_id)
+        if corpus is None:
+            return None
+        if corpus.documents is None:
+            # Two readers may both build the view; either result is the same.
+            stored = corpus.manifest.model == self._model_name
+            documents = []
+            for doc_id, (name, row) in corpus.rows.items():
+                segment = corpus.segments[name]
+                documents.append(
+                    DocumentDTO(
+                        doc_id=doc_id,
+                        text=segment.texts[row],
+                        embedding=segment.embeddings[row] if stored else None,
+                    )
+                )
+            corpus.documents = documents
+        return corpus.manifest, corpus.documents
+
+    def _writer(self, corpus_id: str) -> threading.Lock:
+        with self._lock:
+            return self._writers.setdefault(corpus_id, threading.Lock())
+
+    def _load(self, corpus_id: str) -> Optional[_Corpus]:
+        # For readers; writers hold the corpus lock and call _read directly.
+        for _ in range(LOAD_ATTEMPTS - 1):
+            try:
+                return self._read(corpus_id)
+            except FileNotFoundError:
+                # Another process compacted the corpus after its manifest was read,
+                # removing the segments it named; the new manifest names the current ones.
+                continue
+        # Still racing writers: read while holding them off.
+        with self._store.locked(corpus_id):
+            return self._read(corpus_id)
+
+    def _read(self, corpus_id: str) -> Optional[_Corpus]:
+        if not _CORPUS_ID.fullmatch(corpus_id):
+            return None
+        manifest = self._store.read_manifest(corpus_id)
+        if manifest is None:
+            self._corpora.pop(corpus_id, None)
+            return None
+        cached = self._corpora.get(corpus_id)
+        if cached is not None and cached.manifest == manifest:
+            return cached
+        # Segments are immutable and uniquely named, so loaded ones are reused.
+        known = cached.segments if cached is not None else {}
+        segments = {
+            name: known.get(name) or self._store.read_segment(corpus_id, name)
+            for name in manifest.segments
+        }
+        corpus = _Corpus(manifest, segments, _live_rows(manifest, segments))
+        self._corpora[corpus_id] = corpus
+        return corpus
+
+    def _segment(
+        self, manifest: CorpusManifestDTO, doc_ids: List[str], texts: List[str], embeddings
+    ) -> CorpusSegmentDTO:
+        # The random suffix keeps names unique across a delete and re-create.
+        return CorpusSegmentDTO(
+            name=f"{manifest.next_segment:06d}-{uuid.uuid4().hex[:8]}",
+            doc_ids=doc_ids,
+            texts=texts,
+            embeddings=np.asarray(embeddings, dtype=np.float32),
+        )
+
+    def _upsert(
+        self, corpus: _Corpus, documents: Iterable[DocumentDTO], create: bool = False
+    ) -> CorpusSummaryDTO:
+        latest = {doc.doc_id: doc.text for doc in documents}
+        changed = []
+        for doc_id, text in latest.items():
+            location = corpus.rows.get(doc_id)
+            if location is None or corpus.segments[location[0]].texts[location[1]] != text:
+                changed.append(doc_id)
+        if not changed and not create:
+            return self._summary(corpus)
+
+        deleted = {name: set(rows) for name, rows in corpus.manifest.deleted.items()}
+        for doc_id in changed:
+            if doc_id in corpus.rows:
+                name, row = corpus.rows[doc_id]
+                deleted.setdefault(name, set()).add(row)
+        added = []
+        if changed:
+            texts = [latest[doc_id] for doc_id in changed]
+            added.append(
+                self._segment(corpus.manifest, changed, texts, self._embedder.embed_texts(texts))
+            )
+        manifest = replace(
+            corpus.manifest,
+            segments=corpus.manifest.segments + tuple(segment.name for segment in added),
+            deleted=_tombstones(deleted),
+            next_segment=corpus.manifest.next_segment + len(added),
+        )
+        return self._summary(self._commit(corpus, manifest, added))
+
+    def _write(
+        self, corpus: _Corpus, manifest: CorpusManifestDTO, added: List[CorpusSegmentDTO]
+    ) -> _Corpus:
+        # Segments first, then the manifest that makes them part of the corpus.
+        manifest = replace(manifest, version=corpus.manifest.version + 1)
+        for segment in added:
+            self._store.write_segment(manifest.corpus_id, segment)
+        self._store.write_manifest(manifest)
+        available = {**corpus.segments, **{segment.name: segment for segment in added}}
+        segments = {name: available[name] for name in manifest.segments}
+        written = _Corpus(manifest, segments, _live_rows(manifest, segments))
+        self._corpora[manifest.corpus_id] = written
+        return written
+
+    def _commit(
+        self, corpus: _Corpus, manifest: CorpusManifestDTO, added: List[CorpusSegmentDTO]
+    ) -> _Corpus:
+        written = self._write(corpus, manifest, added)
+        total = sum(len(segment.doc_ids) for segment in written.segments.values())
+        deleted = total - len(written.rows)
+        if (
+            len(written.segments) > self._max_segments
+            or (total and deleted / total > self._compact_ratio)
+            or written.manifest.model != self._model_name
+        ):
+            return self._compact(written)
+        return written
+
+    def _compact(self, corpus: _Corpus) -> _Corpus:
+        # Rewrites the live rows as one segment, then removes the old segments. Rows
+        # embedded by another model are embedded again.
+        doc_ids = list(corpus.rows)
+        texts = [corpus.segments[name].texts[row] for name, row in corpus.rows.values()]
+        added = []
+        if doc_ids:
+            if corpus.manifest.model == self._model_name:
+                embeddings = np.concatenate(
+                    [
+                        corpus.segments[name].embeddings[
+                            [row for segment, row in corpus.rows.values() if segment == name]
+                        ]
+                        for name in corpus.manifest.segments
+                    ]
+                )
+            else:
+                embeddings = self._embedder.embed_texts(texts)
+            added.append(self._segment(corpus.manifest, doc_ids, texts, embeddings))
+        manifest = replace(
+            corpus.manifest,
+            model=self._model_name,
+            segments=tuple(segment.name for segment in added),
+            deleted={},
+            next_segment=corpus.manifest.next_segment + len(added),
+        )
+        compacted = self._write(corpus, manifest, added)
+        self._store.delete_segments(manifest.corpus_id, corpus.manifest.segments)
+        return compacted
+
+    def _summary(self, corpus: _Corpus) -> CorpusSummaryDTO:
+        return CorpusSummaryDTO(
+            corpus_id=corpus.manifest.corpus_id,
+            documents=len(corpus.rows),
+            segments=len(corpus.manifest.segments),
+            deleted_rows=sum(len(rows) for rows in corpus.manifest.deleted.values()),
+            version=corpus.manifest.version,
+        )
@@ -0,0 +1,3 @@
+from .evaluation_service import EvaluationService, ranking_metric_matrix
+
+__all__ = ["EvaluationService", "ranking_metric_matrix"]
@@ -0,0 +1,207 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from statistics import NormalDist
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from application.dtos import (
+    EvaluationCellDTO,
+    EvaluationConfigDTO,
+    EvaluationDatasetDTO,
+    EvaluationReportDTO,
+    LatencySummaryDTO,
+    MetricSummaryDTO,
+)
+from application.interfaces import LexicalIndex
+from application.use_cases import EncodedSearch, LexicalStage, RealizarBuscaUseCase
+
+
+def ranking_metric_matrix(
+    rankings: Sequence[Sequence[str]],
+    relevant_doc_ids: Sequence[Sequence[str]],
+    top_ks: Sequence[int],
+) -> Dict[str, np.ndarray]:
+    # Recall@K, MRR and NDCG@K for every query and every K at once, with the same
+    # definitions as compute_ranking_metrics. Rows follow top_ks, columns queries.
+    width = max([len(ranking) for ranking in rankings] + list(top_ks) + [1])
+    hits = np.zeros((len(rankings), width), dtype=float)
+    for row, (ranking, relevant) in enumerate(zip(rankings, relevant_doc_ids)):
+        relevant_set = set(relevant)
+        hits[row, : len(ranking)] = [doc_id in relevant_set for doc_id in ranking]
+    n_relevant = np.array(
+        [len(set(relevant)) for relevant in relevant_doc_ids[: len(rankings)]], dtype=float
+    )
+
+    first_hit = np.argmax(hits > 0, axis=1)
+    mrr = np.where(hits.any(axis=1), 1.0 / (first_hit + 1), 0.0)
+
+    discounts = 1.0 / np.log2(np.arange(width) + 2)
+    ideal = np.concatenate([[0.0], np.cumsum(discounts)])
+    recall, ndcg = [], []
+    for k in top_ks:
+        top = hits[:, :k]
+        found = top.sum(axis=1)
+        recall.append(
+            np.divide(found, n_relevant, out=np.zeros_like(found), where=n_relevant > 0)
+        )
+        idcg = ideal[np.minimum(k, n_relevant).astype(int)]
+        dcg = top @ discounts[:k]
+        ndcg.append(np.divide(dcg, idcg, out=np.zeros_like(dcg), where=idcg > 0))
+
+    return {
+        "recall_at_k": np.array(recall),
+        "mrr": np.tile(mrr, (len(top_ks), 1)),
+        "ndcg_at_k": np.array(ndcg),
+    }
+
+
+def summarize(values: np.ndarray, confidence: float) -> MetricSummaryDTO:
+    # Normal-approximation interval for the mean.
+    if values.size == 0:
+        return MetricSummaryDTO(mean=None, std=None, ci_low=None, ci_high=None)
+    mean = float(values.mean())
+    std = float(values.std(ddof=1)) if values.size > 1 else 0.0
+    half = NormalDist().inv_cdf(0.5 + confidence / 2) * std / np.sqrt(values.size)
+    return MetricSummaryDTO(mean=mean, std=std, ci_low=mean - half, ci_high=mean + half)
+
+
+def summarize_latency(latencies_ms: Sequence[float]) -> LatencySummaryDTO:
+    values = np.asarray(latencies_ms, dtype=float)
+    if values.size == 0:
+        values = np.zeros(1)
+    p50, p90, p95, p99 = np.percentile(values, [50, 90, 95, 99])
+    return LatencySummaryDTO(
+        mean_ms=float(values.mean()),
+        p50_ms=float(p50),
+        p90_ms=float(p90),
+        p95_ms=float(p95),
+        p99_ms=float(p99),
+    )
+
+
+class EvaluationService:
+    def __init__(self, buscar_use_case: RealizarBuscaUseCase) -> None:
+        self._buscar_use_case = buscar_use_case
+
+    def avaliar(
+        self,
+        dataset: EvaluationDatasetDTO,
+        config: EvaluationConfigDTO | None = None,
+        lexical_index: LexicalIndex | None = None,
+    ) -> EvaluationReportDTO:
+        # Encodes the corpus and every query once, ranks each (query, mode,
+        # candidate_k) in parallel and aggregates the metrics of every top_k from
+        # the same rankings. Each of config.lexical_pools repeats the grid on that
+        # encoding cut down to every query's BM25 pool (lexical_index must cover
+        # dataset.documents) and reports the recall lost against the full corpus.
+        config = config or EvaluationConfigDTO()
+        if config.lexical_pools and lexical_index is None:
+            raise ValueError("lexical_pools requires a lexical index")
+        start = time.perf_counter()
+        queries = [item.query for item in dataset.queries]
+        encoded = self._buscar_use_case.encode_batch(queries, dataset.documents)
+        encode_ms = (time.perf_counter() - start) * 1000
+
+        relevant = [item.relevant_doc_ids for item in dataset.queries]
+        labelled = np.array([len(item) > 0 for item in relevant], dtype=bool)
+        grids = {None: self._grid(encoded, config, relevant)}
+        for pool_size in config.lexical_pools:
+            stage = LexicalStage(index=lexical_index, pool_size=pool_size, fusion=config.fusion)
+            narrowed = [
+                self._buscar_use_case.narrow(query, item, stage)
+                for query, item in zip(queries, encoded)
+            ]
+            grids[pool_size] = self._grid(narrowed, config, relevant)
+
+        cells: List[EvaluationCellDTO] = []
+        for pool_size, grid in grids.items():
+            for mode in config.modes:
+                for candidate_k in config.candidate_ks:
+                    metrics, latencies = grid[(mode, candidate_k)]
+                    latency = summarize_latency(latencies)
+                    mask = labelled[: len(latencies)]
+                    for row, top_k in enumerate(config.top_ks):
+                        summaries = {
+                            name: summarize(values[row][mask], config.confidence)
+                            for name, values in metrics.items()
+                        }
+                        recall_lost = None
+                        if pool_size is not None:
+                            full = grids[None][(mode, candidate_k)][0]["recall_at_k"][row]
+                            lost = full - metrics["recall_at_k"][row]
+                            recall_lost = summarize(lost[mask], config.confidence)
+                        cells.append(
+                            EvaluationCellDTO(
+                                mode=mode,
+                                top_k=top_k,
+                                candidate_k=candidate_k,
+                                queries=len(latencies),
+                                labelled_queries=int(mask.sum()),
+                                latency=latency,
+                                lexical_pool=pool_size,
+                                recall_lost=recall_lost,
+                                **summaries,
+                            )
+                        )
+
+        return EvaluationReportDTO(
+            dataset_id=dataset.dataset_id,
+            queries=len(dataset.queries),
+            documents=len(dataset.documents),
+            encode_ms=encode_ms,
+            duration_ms=(time.perf_counter() - start) * 1000,
+            confidence=config.confidence,
+            cells=cells,
+        )
+
+    def _grid(
+        self,
+        encoded: Sequence[EncodedSearch],
+        config: EvaluationConfigDTO,
+        relevant: Sequence[Sequence[str]],
+    ) -> Dict[Tuple[str, int], Tuple[Dict[str, np.ndarray], List[float]]]:
+        # Metric matrices and latencies of every (mode, candidate_k).
+        runs = self._rank_all(encoded, config) if encoded else {}
+        grid = {}
+        for mode in config.modes:
+            for candidate_k in config.candidate_ks:
+                # The classical ranking does not depend on candidate_k.
+                key = (mode, candidate_k if mode == "quantum" else None)
+                rankings, latencies = runs.get(key, ([], []))
+                metrics = ranking_metric_matrix(rankings, relevant, config.top_ks)
+                grid[(mode, candidate_k)] = (metrics, latencies)
+        return grid
+
+    def _rank_all(
+        self, encoded: Sequence[EncodedSearch], config: EvaluationConfigDTO
+    ) -> Dict[Tuple[str, Optional[int]], Tuple[List[List[str]], List[float]]]:
+        keys: List[Tuple[str, Optional[int]]] = []
+        for mode in config.modes:
+            if mode == "quantum":
+                keys.extend((mode, candidate_k) for candidate_k in config.candidate_ks)
+            else:
+                keys.append((mode, None))
+
+        with ThreadPoolExecutor(max_workers=max(1, config.workers)) as executor:
+            futures = {
+                key: [
+                    executor.submit(self._rank_one, item, key[0], key[1] or 0)
+                    for item in encoded
+                ]
+                for key in keys
+            }
+            runs = {}
+            for key, items in futures.items():
+                outcomes = [future.result() for future in items]
+                runs[key] = ([doc_ids for doc_ids, _ in outcomes], [ms for _, ms in outcomes])
+        return runs
+
+    def _rank_one(
+        self, encoded: EncodedSearch, mode: str, candidate_k: int
+    ) -> Tuple[List[str], float]:
+        start = time.perf_counter()
+        results, _ = self._buscar_use_case.rank(encoded, mode=mode, candidate_k=candidate_k)
+        # Same per-query latency as a single search: its share of encoding plus ranking.
+        latency_ms = encoded.encode_ms + encoded.scoring_ms + (time.perf_counter() - start) * 1000
+        return results.doc_ids(), latency_ms
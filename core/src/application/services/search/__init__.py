@@ -1,3 +1,19 @@
-﻿from .search_service import SearchService
+﻿from .result_cache import (
+    content_fingerprint,
+    corpus_fingerprint,
+    manifest_fingerprint,
+    mark_cached,
+    normalize_query,
+    search_cache_key,
+)
+from .search_service import SearchService
 
-__all__ = ["SearchService"]
+__all__ = [
+    "SearchService",
+    "content_fingerprint",
+    "corpus_fingerprint",
+    "manifest_fingerprint",
+    "mark_cached",
+    "normalize_query",
+    "search_cache_key",
+]
@@ -1,8 +1,8 @@
 import math
 from typing import Iterable, Sequence
 
-from application.dtos import SearchMetricsDTO
-from application.use_cases.search.realizar_busca_use_case import SearchResult
+from application.dtos import QuantumMetricsDTO, SearchMetricsDTO
+from application.use_cases.search.realizar_busca_use_case import RankedResults, SearchResult
 
 
 def compute_ranking_metrics(
@@ -11,6 +11,9 @@ def compute_ranking_metrics(
     k: int,
     latency_ms: float,
     candidate_k: int,
+    quantum: QuantumMetricsDTO | None = None,
+    effective_candidate_k: int | None = None,
+    budget_truncated: bool = False,
 ) -> SearchMetricsDTO:
     relevant_set = set(relevant_doc_ids or [])
     has_labels = len(relevant_set) > 0
@@ -20,17 +23,22 @@ def compute_ranking_metrics(
     ndcg_at_k = None
 
     if has_labels:
-        top_k = results[:k]
-        hits = [item for item in top_k if item.document.doc_id in relevant_set]
+        # Array-backed rankings hand out their ids without building a result per item.
+        if isinstance(results, RankedResults):
+            doc_ids = results.doc_ids()
+        else:
+            doc_ids = [item.document.doc_id for item in results]
+        top_k = doc_ids[:k]
+        hits = [doc_id for doc_id in top_k if doc_id in relevant_set]
         recall_at_k = len(hits) / len(relevant_set)
 
         mrr = 0.0
-        for index, item in enumerate(results, start=1):
-            if item.document.doc_id in relevant_set:
+        for index, doc_id in enumerate(doc_ids, start=1):
+            if doc_id in relevant_set:
                 mrr = 1.0 / index
                 break
 
-        gains = [1.0 if item.document.doc_id in relevant_set else 0.0 for item in top_k]
+        gains = [1.0 if doc_id in relevant_set else 0.0 for doc_id in top_k]
         dcg = sum(gain / math.log2(idx + 2) for idx, gain in enumerate(gains))
         ideal_gains = [1.0] * min(k, len(relevant_set))
         idcg = sum(gain / math.log2(idx + 2) for idx, gain in enumerate(ideal_gains))
@@ -44,4 +52,7 @@ def compute_ranking_metrics(
         k=k,
         candidate_k=candidate_k,
         has_labels=has_labels,
+        quantum=quantum,
+        effective_candidate_k=effective_candidate_k,
+        budget_truncated=budget_truncated,
     )
@@ -0,0 +1,74 @@
+import hashlib
+import json
+import re
+import unicodedata
+from dataclasses import replace
+from typing import Any, Iterable
+
+from application.dtos import (
+    CorpusManifestDTO,
+    DocumentDTO,
+    SearchMetricsDTO,
+    SearchResponseDTO,
+)
+
+
+def normalize_query(query: str) -> str:
+    # Only changes that cannot alter the embedding: Unicode form and whitespace.
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", query)).strip()
+
+
+def corpus_fingerprint(documents: Iterable[DocumentDTO]) -> str:
+    digest = hashlib.sha256()
+    for document in documents:
+        for part in (document.doc_id, document.text):
+            encoded = part.encode("utf-8")
+            # Length prefixes keep ("ab", "c") and ("a", "bc") apart.
+            digest.update(len(encoded).to_bytes(8, "big"))
+            digest.update(encoded)
+    return digest.hexdigest()
+
+
+def manifest_fingerprint(manifest: CorpusManifestDTO) -> str:
+    # An indexed corpus changes only with a new manifest version. The segment names
+    # (unique per write) keep a deleted and re-created corpus apart at equal versions.
+    parts = [manifest.corpus_id, str(manifest.version), *manifest.segments]
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def content_fingerprint(filename: str, content: bytes) -> str:
+    digest = hashlib.sha256(filename.rsplit(".", 1)[-1].lower().encode("utf-8"))
+    digest.update(content)
+    return digest.hexdigest()
+
+
+def search_cache_key(query: str, fingerprint: str, model_name: str, **params: Any) -> str:
+    payload = {
+        "query": normalize_query(query),
+        "corpus": fingerprint,
+        "model": model_name,
+        "params": params,
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=sorted).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _mark_metrics(metrics: SearchMetricsDTO | None) -> SearchMetricsDTO | None:
+    return replace(metrics, cached=True) if metrics is not None else None
+
+
+def mark_cached(response: SearchResponseDTO, lookup_ms: float) -> SearchResponseDTO:
+    comparison = response.comparison
+    if comparison is not None:
+        classical, quantum = comparison.classical, comparison.quantum
+        comparison = replace(
+            comparison,
+            classical=replace(classical, metrics=_mark_metrics(classical.metrics)),
+            quantum=replace(quantum, metrics=_mark_metrics(quantum.metrics)),
+        )
+    return replace(
+        response,
+        metrics=_mark_metrics(response.metrics),
+        comparison=comparison,
+        timings={"cache_lookup": lookup_ms},
+    )
@@ -1,21 +1,46 @@
 from __future__ import annotations
 
 import time
-from typing import Iterable, Sequence
+from dataclasses import replace
+from typing import Any, Iterable, Iterator, Sequence
 
 from application.dtos import (
+    BatchSearchRequestDTO,
+    BatchSearchResponseDTO,
+    DocumentDTO,
     SearchComparisonDTO,
+    SearchEventDTO,
     SearchFileRequestDTO,
     SearchRequestDTO,
     SearchResponseDTO,
     SearchResponseLiteDTO,
 )
+from application.instrumentation import StageTimer
 from application.mappers.search import results_to_dtos
 from application.services.search.metrics import compute_ranking_metrics
-from application.use_cases import BuscarPorArquivoUseCase, RealizarBuscaUseCase
+from application.use_cases import (
+    BuscarPorArquivoUseCase,
+    EncodedSearch,
+    LexicalStage,
+    RealizarBuscaUseCase,
+    ShortlistStage,
+)
 from application.use_cases.search.realizar_busca_use_case import SearchResult
 
 
+def _deadline(latency_budget_ms: float | None) -> float | None:
+    if latency_budget_ms is None:
+        return None
+    return time.perf_counter() + latency_budget_ms / 1000
+
+
+def _remaining(latency_budget_ms: float | None, start: float) -> float | None:
+    # What is left of a budget after the work done since start (e.g. file extraction).
+    if latency_budget_ms is None:
+        return None
+    return latency_budget_ms - (time.perf_counter() - start) * 1000
+
+
 class SearchService:
     def __init__(
         self,
@@ -25,6 +50,12 @@ class SearchService:
         self._buscar_use_case = buscar_use_case
         self._buscar_por_arquivo_use_case = buscar_por_arquivo_use_case
 
+    def preparar_documentos(self, documents: Iterable[DocumentDTO]) -> list[DocumentDTO]:
+        return self._buscar_use_case.prepare_documents(documents)
+
+    def indexar_documentos(self, documents: Iterable[DocumentDTO]) -> tuple[list[DocumentDTO], Any]:
+        return self._buscar_use_case.index_documents(documents)
+
     def buscar_por_texto(
         self,
         request: SearchRequestDTO,
@@ -32,7 +63,15 @@ class SearchService:
         top_k: int = 5,
         candidate_k: int = 20,
         relevant_doc_ids: Iterable[str] | None = None,
+        instrument: bool = False,
+        timer: StageTimer | None = None,
+        latency_budget_ms: float | None = None,
+        include_answer: bool = True,
+        lexical: LexicalStage | None = None,
+        shortlist: ShortlistStage | None = None,
+        rerank_index: Any = None,
     ) -> SearchResponseDTO:
+        timer = timer or StageTimer()
         response, _ = self._run_search(
             request.query,
             request.documents,
@@ -40,6 +79,13 @@ class SearchService:
             top_k=top_k,
             candidate_k=candidate_k,
             relevant_doc_ids=relevant_doc_ids,
+            instrument=instrument,
+            timer=timer,
+            deadline=_deadline(latency_budget_ms),
+            with_answer=include_answer,
+            lexical=lexical,
+            shortlist=shortlist,
+            rerank_index=rerank_index,
         )
         return SearchResponseDTO(
             query=request.query,
@@ -47,6 +93,7 @@ class SearchService:
             results=response.results,
             answer=response.answer,
             metrics=response.metrics,
+            timings=timer.as_dict(),
         )
 
     def comparar_por_texto(
@@ -55,23 +102,59 @@ class SearchService:
         top_k: int = 5,
         candidate_k: int = 20,
         relevant_doc_ids: Iterable[str] | None = None,
+        instrument: bool = False,
+        timer: StageTimer | None = None,
+        latency_budget_ms: float | None = None,
+        include_answer: bool = True,
+        lexical: LexicalStage | None = None,
+        shortlist: ShortlistStage | None = None,
+        rerank_index: Any = None,
     ) -> SearchResponseDTO:
-        classical, _ = self._run_search(
+        timer = timer or StageTimer()
+        # One budget for the whole comparison; only the quantum rerank can be cut. Both
+        # modes rank the same encoding, and the answer is built once, from the
+        # classical ranking, for the response and both comparison entries.
+        deadline = _deadline(latency_budget_ms)
+        encoded = self._buscar_use_case.encode(
             request.query,
             request.documents,
+            timer=timer.child("classical"),
+            lexical=lexical,
+            shortlist=shortlist,
+            rerank_index=rerank_index,
+        )
+        classical, classical_results = self._rank(
+            request.query,
+            encoded,
             mode="classical",
             top_k=top_k,
             candidate_k=candidate_k,
             relevant_doc_ids=relevant_doc_ids,
+            instrument=instrument,
+            timer=timer.child("classical"),
+            with_answer=False,
         )
-        quantum, _ = self._run_search(
+        quantum, _ = self._rank(
             request.query,
-            request.documents,
+            encoded,
             mode="quantum",
             top_k=top_k,
             candidate_k=candidate_k,
             relevant_doc_ids=relevant_doc_ids,
+            instrument=instrument,
+            timer=timer.child("quantum"),
+            with_answer=False,
+            deadline=deadline,
         )
+        if include_answer:
+            answer = self._buscar_use_case.build_answer(
+                request.query,
+                classical_results,
+                timer.child("classical"),
+                query_vector=encoded.query_vector if encoded is not None else None,
+            )
+            classical = replace(classical, answer=answer)
+            quantum = replace(quantum, answer=answer)
 
         comparison = SearchComparisonDTO(classical=classical, quantum=quantum)
         return SearchResponseDTO(
@@ -81,23 +164,167 @@ class SearchService:
             answer=classical.answer,
             metrics=classical.metrics,
             comparison=comparison,
+            timings=timer.as_dict(),
         )
 
+    def buscar_em_etapas(
+        self,
+        request: SearchRequestDTO,
+        mode: str = "compare",
+        top_k: int = 5,
+        candidate_k: int = 20,
+        relevant_doc_ids: Iterable[str] | None = None,
+        instrument: bool = False,
+        timer: StageTimer | None = None,
+        latency_budget_ms: float | None = None,
+        include_answer: bool = True,
+        lexical: LexicalStage | None = None,
+        shortlist: ShortlistStage | None = None,
+        rerank_index: Any = None,
+    ) -> Iterator[SearchEventDTO]:
+        # Yields each mode's ranking as soon as it is ready, followed by its answer.
+        # The encoding is shared between modes, and callers that stop iterating
+        # skip the remaining (quantum) work.
+        timer = timer or StageTimer()
+        deadline = _deadline(latency_budget_ms)
+        relevant = list(relevant_doc_ids or [])
+        modes = ["classical", "quantum"] if mode == "compare" else [mode]
+
+        encoded = self._buscar_use_case.encode(
+            request.query,
+            request.documents,
+            timer=timer.child(modes[0]),
+            lexical=lexical,
+            shortlist=shortlist,
+            rerank_index=rerank_index,
+        )
+        for current in modes:
+            mode_timer = timer.child(current)
+            lite, results = self._rank(
+                request.query,
+                encoded,
+                mode=current,
+                top_k=top_k,
+                candidate_k=candidate_k,
+                relevant_doc_ids=relevant,
+                instrument=instrument,
+                timer=mode_timer,
+                with_answer=False,
+                deadline=deadline,
+            )
+            yield SearchEventDTO(event="results", mode=current, response=lite)
+            if not include_answer:
+                continue
+            answer = self._buscar_use_case.build_answer(
+                request.query,
+                results,
+                mode_timer,
+                query_vector=encoded.query_vector if encoded else None,
+            )
+            yield SearchEventDTO(event="answer", mode=current, answer=answer)
+
+        yield SearchEventDTO(event="done", timings=timer.as_dict())
+
+    def buscar_em_lote(
+        self,
+        request: BatchSearchRequestDTO,
+        mode: str = "classical",
+        top_k: int = 5,
+        candidate_k: int = 20,
+        relevant_doc_ids: Sequence[Iterable[str]] | None = None,
+        timer: StageTimer | None = None,
+        lexical: LexicalStage | None = None,
+        rerank_index: Any = None,
+    ) -> BatchSearchResponseDTO:
+        # Several queries against one corpus: encoded once, scored as one matrix and,
+        # in quantum mode, reranked in a single comparator batch. Answers are not
+        # built here; this is the throughput path used for evaluations.
+        timer = timer or StageTimer()
+        modes = ["classical", "quantum"] if mode == "compare" else [mode]
+        encoded = self._buscar_use_case.encode_batch(
+            request.queries,
+            request.documents,
+            timer,
+            lexical=lexical,
+            rerank_index=rerank_index,
+        )
+        relevant = list(relevant_doc_ids or [None] * len(request.queries))
+
+        ranked = {}
+        rank_ms = {}
+        for current in modes:
+            mode_timer = timer.child(current) if mode == "compare" else timer
+            start = time.perf_counter()
+            ranked[current] = self._buscar_use_case.rank_batch(
+                encoded, mode=current, candidate_k=candidate_k, timer=mode_timer
+            )
+            rank_ms[current] = (time.perf_counter() - start) * 1000 / max(1, len(encoded))
+
+        responses = []
+        with timer.span("result_mapping"):
+            for index, query in enumerate(request.queries):
+                lites = {}
+                for current in modes:
+                    results = ranked[current][index] if encoded else []
+                    latency_ms = 0.0
+                    if encoded:
+                        item = encoded[index]
+                        latency_ms = item.encode_ms + item.scoring_ms + rank_ms[current]
+                    lites[current] = SearchResponseLiteDTO(
+                        results=results_to_dtos(results[:top_k]),
+                        metrics=compute_ranking_metrics(
+                            results,
+                            relevant_doc_ids=relevant[index],
+                            k=top_k,
+                            latency_ms=latency_ms,
+                            candidate_k=candidate_k,
+                        ),
+                    )
+                first = lites[modes[0]]
+                comparison = None
+                if mode == "compare":
+                    comparison = SearchComparisonDTO(
+                        classical=lites["classical"], quantum=lites["quantum"]
+                    )
+                responses.append(
+                    SearchResponseDTO(
+                        query=query,
+                        mode=mode,
+                        results=first.results,
+                        metrics=first.metrics,
+                        comparison=comparison,
+                    )
+                )
+
+        return BatchSearchResponseDTO(mode=mode, responses=responses, timings=timer.as_dict())
+
     def buscar_por_arquivo(
         self,
         request: SearchFileRequestDTO,
         mode: str = "classical",
         top_k: int = 5,
         candidate_k: int = 20,
+        instrument: bool = False,
+        timer: StageTimer | None = None,
+        latency_budget_ms: float | None = None,
+        include_answer: bool = True,
     ) -> SearchResponseDTO:
-        docs = self._buscar_por_arquivo_use_case.execute(request.filename, request.content)
+        start = time.perf_counter()
+        timer = timer or StageTimer()
+        docs = self._buscar_por_arquivo_use_case.execute(request.filename, request.content, timer)
         if not docs:
-            return SearchResponseDTO(query=request.query, mode=mode, results=[])
+            return SearchResponseDTO(
+                query=request.query, mode=mode, results=[], timings=timer.as_dict()
+            )
         return self.buscar_por_texto(
             SearchRequestDTO(query=request.query, documents=docs),
             mode=mode,
             top_k=top_k,
             candidate_k=candidate_k,
+            instrument=instrument,
+            timer=timer,
+            latency_budget_ms=_remaining(latency_budget_ms, start),
+            include_answer=include_answer,
         )
 
     def comparar_por_arquivo(
@@ -105,14 +332,51 @@ class SearchService:
         request: SearchFileRequestDTO,
         top_k: int = 5,
         candidate_k: int = 20,
+        instrument: bool = False,
+        timer: StageTimer | None = None,
+        latency_budget_ms: float | None = None,
+        include_answer: bool = True,
     ) -> SearchResponseDTO:
-        docs = self._buscar_por_arquivo_use_case.execute(request.filename, request.content)
+        start = time.perf_counter()
+        timer = timer or StageTimer()
+        docs = self._buscar_por_arquivo_use_case.execute(request.filename, request.content, timer)
         if not docs:
-            return SearchResponseDTO(query=request.query, mode="compare", results=[])
+            return SearchResponseDTO(
+                query=request.query, mode="compare", results=[], timings=timer.as_dict()
+            )
         return self.comparar_por_texto(
             SearchRequestDTO(query=request.query, documents=docs),
             top_k=top_k,
             candidate_k=candidate_k,
+            instrument=instrument,
+            timer=timer,
+            latency_budget_ms=_remaining(latency_budget_ms, start),
+            include_answer=include_answer,
+        )
+
+    def buscar_por_arquivo_em_etapas(
+        self,
+        request: SearchFileRequestDTO,
+        mode: str = "compare",
+        top_k: int = 5,
+        candidate_k: int = 20,
+        instrument: bool = False,
+        timer: StageTimer | None = None,
+        latency_budget_ms: float | None = None,
+        include_answer: bool = True,
+    ) -> Iterator[SearchEventDTO]:
+        start = time.perf_counter()
+        timer = timer or StageTimer()
+        docs = self._buscar_por_arquivo_use_case.execute(request.filename, request.content, timer)
+        yield from self.buscar_em_etapas(
+            SearchRequestDTO(query=request.query, documents=docs),
+            mode=mode,
+            top_k=top_k,
+            candidate_k=candidate_k,
+            instrument=instrument,
+            timer=timer,
+            latency_budget_ms=_remaining(latency_budget_ms, start),
+            include_answer=include_answer,
         )
 
     def _run_search(
@@ -123,28 +387,94 @@ class SearchService:
         top_k: int,
         candidate_k: int,
         relevant_doc_ids: Iterable[str] | None,
+        instrument: bool = False,
+        timer: StageTimer | None = None,
+        deadline: float | None = None,
+        with_answer: bool = True,
+        lexical: LexicalStage | None = None,
+        shortlist: ShortlistStage | None = None,
+        rerank_index: Any = None,
     ) -> tuple[SearchResponseLiteDTO, Sequence[SearchResult]]:
-        start = time.perf_counter()
-        results = self._buscar_use_case.score(
+        timer = timer or StageTimer()
+        encoded = self._buscar_use_case.encode(
             query,
             documents,
+            timer=timer,
+            lexical=lexical,
+            shortlist=shortlist,
+            rerank_index=rerank_index,
+        )
+        return self._rank(
+            query,
+            encoded,
             mode=mode,
+            top_k=top_k,
             candidate_k=candidate_k,
-        )
-        latency_ms = (time.perf_counter() - start) * 1000
-
-        answer = self._buscar_use_case.build_answer(query, list(results))
-        metrics = compute_ranking_metrics(
-            results,
             relevant_doc_ids=relevant_doc_ids,
-            k=top_k,
-            latency_ms=latency_ms,
-            candidate_k=candidate_k,
+            instrument=instrument,
+            timer=timer,
+            with_answer=with_answer,
+            deadline=deadline,
         )
 
-        response = SearchResponseLiteDTO(
-            results=results_to_dtos(list(results)[:top_k]),
-            answer=answer,
-            metrics=metrics,
-        )
+    def _rank(
+        self,
+        query: str,
+        encoded: EncodedSearch | None,
+        mode: str,
+        top_k: int,
+        candidate_k: int,
+        relevant_doc_ids: Iterable[str] | None,
+        instrument: bool = False,
+        timer: StageTimer | None = None,
+        with_answer: bool = True,
+        deadline: float | None = None,
+    ) -> tuple[SearchResponseLiteDTO, Sequence[SearchResult]]:
+        timer = timer or StageTimer()
+        results: Sequence[SearchResult] = []
+        quantum_metrics = None
+        # latency_ms keeps its meaning per mode: encoding plus that mode's ranking.
+        latency_ms = 0.0
+        if encoded is not None:
+            start = time.perf_counter()
+            results, quantum_metrics = self._buscar_use_case.rank(
+                encoded,
+                mode=mode,
+                candidate_k=candidate_k,
+                with_resources=instrument,
+                timer=timer,
+                deadline=deadline,
+            )
+            latency_ms = (
+                encoded.encode_ms + encoded.scoring_ms + (time.perf_counter() - start) * 1000
+            )
+
+        answer = None
+        if with_answer:
+            answer = self._buscar_use_case.build_answer(
+                query,
+                results,
+                timer,
+                query_vector=encoded.query_vector if encoded is not None else None,
+            )
+        with timer.span("metrics"):
+            metrics = compute_ranking_metrics(
+                results,
+                relevant_doc_ids=relevant_doc_ids,
+                k=top_k,
+                latency_ms=latency_ms,
+                candidate_k=candidate_k,
+                quantum=quantum_metrics if instrument else None,
+                effective_candidate_k=(
+                    quantum_metrics.effective_candidate_k if quantum_metrics else None
+                ),
+                budget_truncated=quantum_metrics.budget_truncated if quantum_metrics else False,
+            )
+
+        with timer.span("result_mapping"):
+            response = SearchResponseLiteDTO(
+                results=results_to_dtos(results[:top_k]),
+                answer=answer,
+                metrics=metrics,
+            )
         return response, results
@@ -1,5 +1,21 @@
-﻿from application.use_cases.search.realizar_busca_use_case import RealizarBuscaUseCase, SearchResult
+﻿from application.use_cases.search.realizar_busca_use_case import (
+    EncodedSearch,
+    LexicalStage,
+    RankedResults,
+    RealizarBuscaUseCase,
+    SearchResult,
+    ShortlistStage,
+)
 from application.use_cases.search.ler_arquivo_use_case import LerArquivoUseCase
 from application.use_cases.search.buscar_por_arquivo_use_case import BuscarPorArquivoUseCase
 
-__all__ = ["RealizarBuscaUseCase", "SearchResult", "LerArquivoUseCase", "BuscarPorArquivoUseCase"]
+__all__ = [
+    "RealizarBuscaUseCase",
+    "SearchResult",
+    "RankedResults",
+    "EncodedSearch",
+    "LexicalStage",
+    "ShortlistStage",
+    "LerArquivoUseCase",
+    "BuscarPorArquivoUseCase",
+]
@@ -1,5 +1,21 @@
-﻿from .realizar_busca_use_case import RealizarBuscaUseCase, SearchResult
+﻿from .realizar_busca_use_case import (
+    EncodedSearch,
+    LexicalStage,
+    RankedResults,
+    RealizarBuscaUseCase,
+    SearchResult,
+    ShortlistStage,
+)
 from .ler_arquivo_use_case import LerArquivoUseCase
 from .buscar_por_arquivo_use_case import BuscarPorArquivoUseCase
 
-__all__ = ["RealizarBuscaUseCase", "SearchResult", "LerArquivoUseCase", "BuscarPorArquivoUseCase"]
+__all__ = [
+    "RealizarBuscaUseCase",
+    "SearchResult",
+    "RankedResults",
+    "EncodedSearch",
+    "LexicalStage",
+    "ShortlistStage",
+    "LerArquivoUseCase",
+    "BuscarPorArquivoUseCase",
+]
@@ -1,7 +1,9 @@
 import re
 
 from application.dtos import DocumentDTO
+from application.instrumentation import StageTimer
 from application.interfaces import DocumentTextExtractor
+from application.use_cases.search.realizar_busca_use_case import answer_sentences
 
 
 def _chunk_text(text: str, max_chars: int = 800, overlap: int = 150) -> list[str]:
@@ -44,14 +46,23 @@ class BuscarPorArquivoUseCase:
     def __init__(self, extractor: DocumentTextExtractor) -> None:
         self._extractor = extractor
 
-    def execute(self, filename: str, content: bytes) -> list[DocumentDTO]:
-        text = self._extractor.extract(filename, content)
+    def execute(
+        self, filename: str, content: bytes, timer: StageTimer | None = None
+    ) -> list[DocumentDTO]:
+        timer = timer or StageTimer()
+        with timer.span("extract"):
+            text = self._extractor.extract(filename, content)
         if not text:
             return []
-        chunks = _chunk_text(text)
+        with timer.span("chunk"):
+            chunks = _chunk_text(text)
         if not chunks:
             return []
+        # Answer sentence boundaries are kept with each chunk so answers need not
+        # split the text again.
         return [
-            DocumentDTO(doc_id=f"uploaded-{index + 1}", text=chunk)
+            DocumentDTO(
+                doc_id=f"uploaded-{index + 1}", text=chunk, sentences=answer_sentences(chunk)
+            )
             for index, chunk in enumerate(chunks)
         ]
@@ -1,19 +1,175 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 import re
-from typing import Iterable, List
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
-from application.dtos import DocumentDTO
-from application.interfaces import Embedder, QuantumComparator
+import numpy as np
+
+from application.dtos import DocumentDTO, QuantumMetricsDTO
+from application.instrumentation import RerankCostModel, StageTimer
+from application.interfaces import (
+    CircuitStats,
+    Embedder,
+    IndexedCandidates,
+    LexicalIndex,
+    QuantumComparator,
+    VectorIndex,
+)
 from application.mappers.search import document_dto_to_entity
 from domain.entities import Document
 
+# Deadline checks spread over a budgeted rerank whose cost is linear in the candidates.
+BUDGET_CHECKS = 4
 
-@dataclass(frozen=True)
+# Extractive answers: sentences of at least ANSWER_MIN_CHARS from the top documents,
+# picked by maximal marginal relevance (relevance vs. redundancy weighted by lambda).
+ANSWER_DOCUMENTS = 3
+ANSWER_MAX_CANDIDATES = 30
+ANSWER_MIN_CHARS = 30
+ANSWER_SENTENCES = 3
+ANSWER_MMR_LAMBDA = 0.7
+# Sentence embeddings computed during one use case's lifetime are reused up to this size.
+SENTENCE_CACHE_SIZE = 4096
+# Reciprocal rank fusion: the document at (0-based) rank r of a ranking gets 1 / (RRF_K + r + 1).
+RRF_K = 60
+
+
+@dataclass(frozen=True, slots=True)
 class SearchResult:
     document: Document
     score: float
 
 
+class RankedResults(Sequence[SearchResult]):
+    # A ranking kept as two parallel arrays over the request's documents: their
+    # positions and scores, best first. Document entities and SearchResult objects
+    # are only built for the items read, which is usually the returned top_k.
+    __slots__ = ("_documents", "_order", "_scores")
+
+    def __init__(
+        self, documents: Sequence[DocumentDTO], order: np.ndarray, scores: np.ndarray
+    ) -> None:
+        self._documents = documents
+        self._order = np.asarray(order, dtype=np.intp)
+        self._scores = np.asarray(scores, dtype=np.float64)
+
+    @classmethod
+    def by_score(
+        cls, documents: Sequence[DocumentDTO], scores: Sequence[float], indices=None
+    ) -> "RankedResults":
+        # Orders indices (all documents by default) by descending score; ties keep
+        # their original order, as a stable sort would.
+        scores = np.asarray(scores, dtype=np.float64)
+        if indices is None:
+            indices = np.arange(len(scores))
+        indices = np.asarray(indices, dtype=np.intp)
+        order = np.argsort(-scores, kind="stable")
+        return cls(documents, indices[order], scores[order])
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return RankedResults(self._documents, self._order[index], self._scores[index])
+        document = self._documents[self._order[index]]
+        return SearchResult(
+            document=document_dto_to_entity(document), score=float(self._scores[index])
+        )
+
+    def doc_ids(self) -> List[str]:
+        documents = self._documents
+        return [documents[position].doc_id for position in self._order.tolist()]
+
+    def extend(self, other: "RankedResults") -> "RankedResults":
+        return RankedResults(
+            self._documents,
+            np.concatenate([self._order, other._order]),
+            np.concatenate([self._scores, other._scores]),
+        )
+
+
+@dataclass(frozen=True)
+class EncodedSearch:
+    # documents are the request DTOs; they become entities only when a result is read.
+    documents: List[DocumentDTO]
+    query_vector: List[float]
+    doc_vectors: List[List[float]]
+    base_scores: List[float]
+    encode_ms: float
+    scoring_ms: float
+    # Quantum comparator state of the request's corpus (RealizarBuscaUseCase.
+    # index_documents) and the position of each document in it.
+    rerank_index: Any = None
+    positions: Optional[List[int]] = None
+
+
+@dataclass(frozen=True)
+class LexicalStage:
+    # First stage run before the dense encoding: only the pool_size documents the
+    # index ranks best are embedded and scored. The index covers the request's
+    # documents in the same order. With fusion="rrf" the classical scores of the pool
+    # become the reciprocal rank fusion of its BM25 and dense rankings, so quantum
+    # candidates are picked from the fused order as well.
+    index: LexicalIndex
+    pool_size: int
+    fusion: str = "none"
+
+
+@dataclass(frozen=True)
+class ShortlistStage:
+    # Approximate first stage over a compressed copy of the corpus vectors, whose ids
+    # are the documents' positions: only the size best documents by approximate
+    # cosine are embedded (usually served from the corpus matrix) and scored exactly,
+    # and those exact scores feed candidate selection and the quantum rerank. It is
+    # skipped when a lexical pool already narrowed the corpus.
+    index: VectorIndex
+    size: int
+
+
+def _lexical_pool(
+    stage: Optional[LexicalStage], query: str, count: int
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    # Positions of the pooled documents, in corpus order so ties rank as they would
+    # without the first stage, and the BM25 rank of each; None keeps the whole corpus.
+    if stage is None or (stage.pool_size >= count and stage.fusion != "rrf"):
+        return None
+    if len(stage.index) != count:
+        raise ValueError("Lexical index does not match the documents")
+    positions, scores = stage.index.top(query, stage.pool_size)
+    # A query without any indexed term has no lexical signal to narrow by.
+    if not len(scores) or scores[0] <= 0:
+        return None
+    return np.sort(positions), np.argsort(positions, kind="stable")
+
+
+def _shortlist(
+    stage: Optional[ShortlistStage], query_vector: Sequence[float], count: int
+) -> Optional[np.ndarray]:
+    # Positions of the shortlisted documents in corpus order; None keeps the corpus.
+    if stage is None or stage.size >= count:
+        return None
+    if len(stage.index) != count:
+        raise ValueError("Vector index does not match the documents")
+    ids, _ = stage.index.search(query_vector, stage.size)
+    return np.sort(ids)
+
+
+def _candidates(encoded: EncodedSearch, indices) -> Sequence[Sequence[float]]:
+    vectors = [encoded.doc_vectors[i] for i in indices]
+    if encoded.rerank_index is None:
+        return vectors
+    rows = [encoded.positions[i] for i in indices]
+    return IndexedCandidates(vectors, encoded.rerank_index, rows)
+
+
+def _fuse(dense_scores: Sequence[float], lexical_ranks: np.ndarray) -> List[float]:
+    order = np.argsort(-np.asarray(dense_scores, dtype=np.float64), kind="stable")
+    dense_ranks = np.empty(len(order), dtype=np.intp)
+    dense_ranks[order] = np.arange(len(order))
+    return (1.0 / (RRF_K + dense_ranks + 1) + 1.0 / (RRF_K + lexical_ranks + 1)).tolist()
+
+
 def _normalize_text(text: str) -> str:
     return re.sub(r"\s+", " ", text).strip()
 
@@ -25,16 +181,67 @@ def _split_sentences(text: str) -> List[str]:
     return [part.strip() for part in parts if part.strip()]
 
 
+def answer_sentences(text: str) -> List[str]:
+    # Sentences of a document eligible for the extractive answer.
+    return [
+        sentence
+        for sentence in _split_sentences(_normalize_text(text))
+        if len(sentence) >= ANSWER_MIN_CHARS
+    ]
+
+
+def _mmr(relevance: np.ndarray, similarity: np.ndarray, count: int, weight: float) -> List[int]:
+    selected: List[int] = [int(np.argmax(relevance))]
+    redundancy = similarity[selected[0]].copy()
+    while len(selected) < min(count, len(relevance)):
+        scores = weight * relevance - (1 - weight) * redundancy
+        scores[selected] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        redundancy = np.maximum(redundancy, similarity[best])
+    return selected
+
+
+def _top_indices(scores: Sequence[float], count: int) -> np.ndarray:
+    # Positions of the count best scores, best first (stable for ties).
+    return np.argsort(-np.asarray(scores, dtype=np.float64), kind="stable")[:count]
+
+
+def _quantum_metrics(
+    prefilter_ms: float,
+    rerank_ms: float,
+    stats: Optional[CircuitStats],
+    effective_candidate_k: int,
+    budget_truncated: bool,
+) -> QuantumMetricsDTO:
+    simulator_ms = stats.simulator_ms if stats else 0.0
+    return QuantumMetricsDTO(
+        prefilter_ms=prefilter_ms,
+        rerank_ms=rerank_ms,
+        simulator_ms=simulator_ms,
+        python_overhead_ms=max(0.0, rerank_ms - simulator_ms),
+        circuit_executions=stats.executions if stats else 0,
+        qubits=stats.qubits if stats else None,
+        circuit_depth=stats.depth if stats else None,
+        gate_counts=dict(stats.gate_counts) if stats else {},
+        effective_candidate_k=effective_candidate_k,
+        budget_truncated=budget_truncated,
+    )
+
+
 class RealizarBuscaUseCase:
     def __init__(
         self,
         embedder: Embedder,
         classical_comparator: QuantumComparator,
         quantum_comparator: QuantumComparator,
+        cost_model: RerankCostModel | None = None,
     ) -> None:
         self._embedder = embedder
         self._classical_comparator = classical_comparator
         self._quantum_comparator = quantum_comparator
+        self._cost_model = cost_model or RerankCostModel()
+        self._sentence_vectors: Dict[str, List[float]] = {}
 
     def score(
         self,
@@ -42,70 +249,435 @@ class RealizarBuscaUseCase:
         documents: Iterable[DocumentDTO],
         mode: str = "classical",
         candidate_k: int = 20,
-    ) -> List[SearchResult]:
+    ) -> Sequence[SearchResult]:
+        results, _ = self.score_with_stats(query, documents, mode=mode, candidate_k=candidate_k)
+        return results
+
+    def score_with_stats(
+        self,
+        query: str,
+        documents: Iterable[DocumentDTO],
+        mode: str = "classical",
+        candidate_k: int = 20,
+        with_resources: bool = False,
+        timer: StageTimer | None = None,
+        deadline: float | None = None,
+    ) -> tuple[Sequence[SearchResult], Optional[QuantumMetricsDTO]]:
+        encoded = self.encode(query, documents, timer=timer)
+        if encoded is None:
+            return [], None
+        return self.rank(
+            encoded,
+            mode=mode,
+            candidate_k=candidate_k,
+            with_resources=with_resources,
+            timer=timer,
+            deadline=deadline,
+        )
+
+    def encode(
+        self,
+        query: str,
+        documents: Iterable[DocumentDTO],
+        timer: StageTimer | None = None,
+        lexical: LexicalStage | None = None,
+        shortlist: ShortlistStage | None = None,
+        rerank_index: Any = None,
+    ) -> Optional[EncodedSearch]:
+        # Embeds query and documents and computes the classical scores once, so
+        # several modes can be ranked from the same encoding. With a lexical stage
+        # only its pool is embedded, and otherwise with a shortlist only the
+        # shortlisted documents; first stages count as scoring time. rerank_index
+        # covers the documents in the same order, as the first stages' indexes do.
+        timer = timer or StageTimer()
         docs_dto = list(documents)
         if not docs_dto:
+            return None
+        positions = list(range(len(docs_dto))) if rerank_index is not None else None
+
+        lexical_ms = 0.0
+        pool = None
+        if lexical is not None:
+            lexical_start = time.perf_counter()
+            with timer.span("lexical"):
+                pool = _lexical_pool(lexical, query, len(docs_dto))
+                if pool is not None:
+                    docs_dto = [docs_dto[i] for i in pool[0].tolist()]
+                    positions = pool[0].tolist() if positions is not None else None
+            lexical_ms = (time.perf_counter() - lexical_start) * 1000
+
+        encode_start = time.perf_counter()
+        with timer.span("query_encode"):
+            query_vector = self._embedder.embed_texts([query])[0]
+        shortlist_ms = 0.0
+        if pool is None and shortlist is not None:
+            shortlist_start = time.perf_counter()
+            with timer.span("shortlist"):
+                shortlisted = _shortlist(shortlist, query_vector, len(docs_dto))
+                if shortlisted is not None:
+                    docs_dto = [docs_dto[i] for i in shortlisted.tolist()]
+                    positions = shortlisted.tolist() if positions is not None else None
+            shortlist_ms = (time.perf_counter() - shortlist_start) * 1000
+        with timer.span("document_encode"):
+            doc_vectors = self._document_vectors(docs_dto)
+        encode_ms = (time.perf_counter() - encode_start) * 1000 - shortlist_ms
+
+        scoring_start = time.perf_counter()
+        with timer.span("scoring"):
+            base_scores = [
+                self._classical_comparator.compare(query_vector, vector)
+                for vector in doc_vectors
+            ]
+            if pool is not None and lexical.fusion == "rrf":
+                base_scores = _fuse(base_scores, pool[1])
+        scoring_ms = lexical_ms + shortlist_ms + (time.perf_counter() - scoring_start) * 1000
+
+        return EncodedSearch(
+            documents=docs_dto,
+            query_vector=query_vector,
+            doc_vectors=doc_vectors,
+            base_scores=base_scores,
+            encode_ms=encode_ms,
+            scoring_ms=scoring_ms,
+            rerank_index=rerank_index,
+            positions=positions,
+        )
+
+    def encode_batch(
+        self,
+        queries: Sequence[str],
+        documents: Iterable[DocumentDTO],
+        timer: StageTimer | None = None,
+        lexical: LexicalStage | None = None,
+        rerank_index: Any = None,
+    ) -> List[EncodedSearch]:
+        # Embeds the corpus once and all queries in a single call, then scores the
+        # whole (queries x documents) matrix at once. Encoding and scoring times are
+        # split evenly across the queries. With a lexical stage only the union of the
+        # queries' pools is embedded, and each query keeps its own pool.
+        timer = timer or StageTimer()
+        docs_dto = list(documents)
+        if not docs_dto or not queries:
             return []
 
-        docs = [document_dto_to_entity(dto) for dto in docs_dto]
-        query_vector = self._embedder.embed_texts([query])[0]
-        doc_vectors = self._embedder.embed_texts([doc.text for doc in docs])
+        lexical_ms = 0.0
+        pools: List[Optional[Tuple[np.ndarray, np.ndarray]]] = [None] * len(queries)
+        encoded_docs = docs_dto
+        positions = None
+        if lexical is not None:
+            lexical_start = time.perf_counter()
+            with timer.span("lexical"):
+                pools = [_lexical_pool(lexical, query, len(docs_dto)) for query in queries]
+                if all(pool is not None for pool in pools):
+                    positions = np.unique(np.concatenate([pool[0] for pool in pools]))
+                    encoded_docs = [docs_dto[i] for i in positions.tolist()]
+            lexical_ms = (time.perf_counter() - lexical_start) * 1000
 
-        base_scores = [
-            self._classical_comparator.compare(query_vector, vector)
-            for vector in doc_vectors
-        ]
+        encode_start = time.perf_counter()
+        with timer.span("query_encode"):
+            query_vectors = self._embedder.embed_texts(list(queries))
+        with timer.span("document_encode"):
+            doc_vectors = self._document_vectors(encoded_docs)
+        encode_ms = (time.perf_counter() - encode_start) * 1000
+
+        scoring_start = time.perf_counter()
+        with timer.span("scoring"):
+            score_matrix = self._classical_comparator.compare_matrix(query_vectors, doc_vectors)
+        scoring_ms = lexical_ms + (time.perf_counter() - scoring_start) * 1000
 
-        if mode == "quantum":
+        encoded = []
+        all_positions = list(range(len(docs_dto))) if rerank_index is not None else None
+        for query_vector, base_scores, pool in zip(query_vectors, score_matrix, pools):
+            pooled_docs, vectors, pooled = encoded_docs, doc_vectors, all_positions
+            if pool is not None:
+                columns = (
+                    np.searchsorted(positions, pool[0]) if positions is not None else pool[0]
+                ).tolist()
+                pooled_docs = [encoded_docs[column] for column in columns]
+                vectors = [doc_vectors[column] for column in columns]
+                pooled = pool[0].tolist()
+                base_scores = [base_scores[column] for column in columns]
+                if lexical.fusion == "rrf":
+                    base_scores = _fuse(base_scores, pool[1])
+            encoded.append(
+                EncodedSearch(
+                    documents=pooled_docs,
+                    query_vector=query_vector,
+                    doc_vectors=vectors,
+                    base_scores=base_scores,
+                    encode_ms=encode_ms / len(queries),
+                    scoring_ms=scoring_ms / len(queries),
+                    rerank_index=rerank_index,
+                    positions=pooled if rerank_index is not None else None,
+                )
+            )
+        return encoded
+
+    def _document_vectors(self, documents: Sequence[DocumentDTO]) -> List[Sequence[float]]:
+        # Documents of an indexed corpus carry their embedding; only the rest is
+        # embedded, in a single call.
+        missing = [index for index, doc in enumerate(documents) if doc.embedding is None]
+        if len(missing) == len(documents):
+            return self._embedder.embed_texts([doc.text for doc in documents])
+        vectors: List[Sequence[float]] = [doc.embedding for doc in documents]
+        if missing:
+            encoded = self._embedder.embed_texts([documents[index].text for index in missing])
+            for index, vector in zip(missing, encoded):
+                vectors[index] = vector
+        return vectors
+
+    def narrow(
+        self, query: str, encoded: EncodedSearch, lexical: LexicalStage
+    ) -> EncodedSearch:
+        # The encoding lexical would have produced, cut from an encoding of the whole
+        # corpus (same vectors and dense scores) to compare pool sizes without
+        # re-embedding. Encoding and scoring times are scaled to the pool's share.
+        pool = _lexical_pool(lexical, query, len(encoded.documents))
+        if pool is None:
+            return encoded
+        positions = pool[0].tolist()
+        base_scores = [encoded.base_scores[i] for i in positions]
+        if lexical.fusion == "rrf":
+            base_scores = _fuse(base_scores, pool[1])
+        share = len(positions) / len(encoded.documents)
+        return EncodedSearch(
+            documents=[encoded.documents[i] for i in positions],
+            query_vector=encoded.query_vector,
+            doc_vectors=[encoded.doc_vectors[i] for i in positions],
+            base_scores=base_scores,
+            encode_ms=encoded.encode_ms * share,
+            scoring_ms=encoded.scoring_ms * share,
+            rerank_index=encoded.rerank_index,
+            positions=(
+                [encoded.positions[i] for i in positions] if encoded.positions is not None else None
+            ),
+        )
+
+    def rank(
+        self,
+        encoded: EncodedSearch,
+        mode: str = "classical",
+        candidate_k: int = 20,
+        with_resources: bool = False,
+        timer: StageTimer | None = None,
+        deadline: float | None = None,
+    ) -> tuple[RankedResults, Optional[QuantumMetricsDTO]]:
+        # deadline is a time.perf_counter() instant; when given, the rerank is sized
+        # and cut short to finish by then.
+        timer = timer or StageTimer()
+        docs = encoded.documents
+        base_scores = encoded.base_scores
+
+        if mode != "quantum":
+            with timer.span("candidate_selection"):
+                results = RankedResults.by_score(docs, base_scores)
+            return results, None
+
+        selection_start = time.perf_counter()
+        with timer.span("candidate_selection"):
             candidate_k = max(1, min(candidate_k, len(docs)))
-            candidate_indices = sorted(
-                range(len(base_scores)),
-                key=lambda i: base_scores[i],
-                reverse=True,
-            )[:candidate_k]
-            results = [
-                SearchResult(
-                    document=docs[i],
-                    score=self._quantum_comparator.compare(query_vector, doc_vectors[i]),
+            candidate_indices = _top_indices(base_scores, candidate_k)
+        prefilter_ms = encoded.scoring_ms + (time.perf_counter() - selection_start) * 1000
+
+        # Drop anything recorded by earlier calls so the stats cover this rerank only.
+        self._quantum_comparator.consume_stats()
+        rerank_start = time.perf_counter()
+        with timer.span("rerank"):
+            candidate_vectors = _candidates(encoded, candidate_indices)
+            if deadline is None:
+                quantum_scores = self._compare_observed(encoded.query_vector, candidate_vectors)
+            else:
+                quantum_scores = self._compare_within(
+                    encoded.query_vector, candidate_vectors, deadline
+                )
+            reranked = candidate_indices[: len(quantum_scores)]
+            results = RankedResults.by_score(docs, quantum_scores, reranked)
+            # Candidates the budget did not reach keep their classical order and score.
+            unreached = candidate_indices[len(quantum_scores) :]
+            if len(unreached):
+                results = results.extend(
+                    RankedResults(docs, unreached, np.asarray(base_scores)[unreached])
                 )
-                for i in candidate_indices
+        rerank_ms = (time.perf_counter() - rerank_start) * 1000
+        circuit_stats = self._quantum_comparator.consume_stats(with_resources)
+
+        return results, _quantum_metrics(
+            prefilter_ms,
+            rerank_ms,
+            circuit_stats,
+            effective_candidate_k=len(quantum_scores),
+            budget_truncated=len(quantum_scores) < len(candidate_indices),
+        )
+
+    def _compare_observed(
+        self, query_vector: Sequence[float], vectors: Sequence[Sequence[float]]
+    ) -> List[float]:
+        start = time.perf_counter()
+        scores = self._quantum_comparator.compare_many(query_vector, vectors)
+        self._cost_model.observe(len(vectors), (time.perf_counter() - start) * 1000)
+        return scores
+
+    def _compare_within(
+        self,
+        query_vector: Sequence[float],
+        vectors: Sequence[Sequence[float]],
+        deadline: float,
+    ) -> List[float]:
+        # Shrinks the candidate list to what the cost model expects to fit before the
+        # deadline. Comparators whose cost is not linear in the candidates (a single
+        # circuit, a vectorised estimate) rerank that prefix in one call; the others
+        # go in BUDGET_CHECKS chunks and stop before a chunk that would overrun.
+        fitted = self._cost_model.fit((deadline - time.perf_counter()) * 1000, len(vectors))
+        if fitted == 0:
+            return []
+        if not self._quantum_comparator.linear_cost:
+            return self._compare_observed(query_vector, vectors[:fitted])
+        chunk_size = -(-fitted // BUDGET_CHECKS)
+        scores: List[float] = []
+        for start in range(0, fitted, chunk_size):
+            chunk = vectors[start : min(fitted, start + chunk_size)]
+            remaining_ms = (deadline - time.perf_counter()) * 1000
+            estimate_ms = (self._cost_model.per_candidate_ms or 0.0) * len(chunk)
+            if remaining_ms <= 0 or estimate_ms > remaining_ms:
+                break
+            scores.extend(self._compare_observed(query_vector, chunk))
+        return scores
+
+    def rank_batch(
+        self,
+        encoded: Sequence[EncodedSearch],
+        mode: str = "classical",
+        candidate_k: int = 20,
+        timer: StageTimer | None = None,
+    ) -> List[RankedResults]:
+        # Ranks several encoded queries; in quantum mode every query's candidates
+        # are handed to the comparator in one compare_batch call.
+        timer = timer or StageTimer()
+        if mode != "quantum":
+            return [self.rank(item, mode=mode, timer=timer)[0] for item in encoded]
+
+        with timer.span("candidate_selection"):
+            candidate_lists = [
+                _top_indices(item.base_scores, max(1, min(candidate_k, len(item.documents))))
+                for item in encoded
             ]
-        else:
-            results = [
-                SearchResult(document=doc, score=score)
-                for doc, score in zip(docs, base_scores)
+
+        with timer.span("rerank"):
+            score_lists = self._quantum_comparator.compare_batch(
+                [item.query_vector for item in encoded],
+                [_candidates(item, indices) for item, indices in zip(encoded, candidate_lists)],
+            )
+            ranked = [
+                RankedResults.by_score(item.documents, scores, indices)
+                for item, indices, scores in zip(encoded, candidate_lists, score_lists)
             ]
+        # Batch reranks do not report per-query circuit stats; discard them.
+        self._quantum_comparator.consume_stats()
+        return ranked
 
-        results.sort(key=lambda item: item.score, reverse=True)
-        return results
+    def index_documents(
+        self, documents: Iterable[DocumentDTO]
+    ) -> Tuple[List[DocumentDTO], Any]:
+        # Ingestion step for quantum comparators that keep state per corpus: builds it
+        # over the documents in this order, and returns them with their embedding so
+        # searches do not embed them again. Others get the documents back and None.
+        docs = list(documents)
+        if not docs or not self._quantum_comparator.indexes_corpora:
+            return docs, None
+        vectors = self._document_vectors(docs)
+        docs = [
+            doc if doc.embedding is not None else replace(doc, embedding=vector)
+            for doc, vector in zip(docs, vectors)
+        ]
+        return docs, self._quantum_comparator.index_corpus(vectors)
+
+    def prepare_documents(self, documents: Iterable[DocumentDTO]) -> List[DocumentDTO]:
+        # Ingestion step for corpora that are searched repeatedly: splits the answer
+        # sentences and embeds all of them in a single call.
+        docs = list(documents)
+        sentences = [
+            doc.sentences if doc.sentences is not None else answer_sentences(doc.text)
+            for doc in docs
+        ]
+        flat = [sentence for items in sentences for sentence in items]
+        vectors = self._embedder.embed_texts(flat) if flat else []
+        prepared, offset = [], 0
+        for doc, items in zip(docs, sentences):
+            prepared.append(
+                DocumentDTO(
+                    doc_id=doc.doc_id,
+                    text=doc.text,
+                    sentences=list(items),
+                    sentence_embeddings=[list(v) for v in vectors[offset : offset + len(items)]],
+                )
+            )
+            offset += len(items)
+        return prepared
 
-    def build_answer(self, query: str, results: List[SearchResult]) -> str | None:
+    def build_answer(
+        self,
+        query: str,
+        results: Sequence[SearchResult],
+        timer: StageTimer | None = None,
+        query_vector: Sequence[float] | None = None,
+    ) -> str | None:
         if not results:
             return None
+        with (timer or StageTimer()).span("answer"):
+            return self._build_answer(query, results, query_vector)
 
+    def _build_answer(
+        self,
+        query: str,
+        results: Sequence[SearchResult],
+        query_vector: Sequence[float] | None = None,
+    ) -> str | None:
         candidates: List[str] = []
-        for item in results[:3]:
-            text = _normalize_text(item.document.text)
-            for sentence in _split_sentences(text):
-                if len(sentence) < 30:
-                    continue
-                candidates.append(sentence)
-                if len(candidates) >= 30:
+        vectors: List[Optional[Sequence[float]]] = []
+        for item in results[:ANSWER_DOCUMENTS]:
+            document = item.document
+            sentences = document.sentences
+            if sentences is None:
+                sentences = tuple(answer_sentences(document.text))
+            embeddings = document.sentence_embeddings
+            for index, sentence in enumerate(sentences):
+                if len(candidates) >= ANSWER_MAX_CANDIDATES:
                     break
-            if len(candidates) >= 30:
-                break
+                candidates.append(sentence)
+                vectors.append(embeddings[index] if embeddings is not None else None)
 
         if not candidates:
             return None
 
-        query_vector = self._embedder.embed_texts([query])[0]
-        sentence_vectors = self._embedder.embed_texts(candidates)
-        scores = [
-            self._classical_comparator.compare(query_vector, vector)
-            for vector in sentence_vectors
+        # Only sentences without a stored or previously computed embedding are
+        # encoded, together with the query when the caller has no vector for it.
+        missing = [
+            sentence
+            for sentence, vector in zip(candidates, vectors)
+            if vector is None and sentence not in self._sentence_vectors
+        ]
+        missing = list(dict.fromkeys(missing))
+        texts = ([] if query_vector is not None else [query]) + missing
+        if texts:
+            encoded = self._embedder.embed_texts(texts)
+            if query_vector is None:
+                query_vector, encoded = encoded[0], encoded[1:]
+            if len(self._sentence_vectors) + len(missing) > SENTENCE_CACHE_SIZE:
+                self._sentence_vectors.clear()
+            self._sentence_vectors.update(zip(missing, encoded))
+        sentence_vectors = [
+            vector if vector is not None else self._sentence_vectors[sentence]
+            for sentence, vector in zip(candidates, vectors)
         ]
 
-        top_indices = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:3]
-        top_sentences = [candidates[i] for i in top_indices]
+        relevance = np.asarray(
+            self._classical_comparator.compare_many(query_vector, sentence_vectors), dtype=float
+        )
+        similarity = np.asarray(
+            self._classical_comparator.compare_matrix(sentence_vectors, sentence_vectors),
+            dtype=float,
+        )
+        selected = _mmr(relevance, similarity, ANSWER_SENTENCES, ANSWER_MMR_LAMBDA)
+        top_sentences = [candidates[i] for i in selected]
 
         return "Com base no documento, " + " ".join(top_sentences)
@@ -1,7 +1,13 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Optional, Sequence, Tuple
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Document:
     doc_id: str
     text: str
+    # Answer sentences and their embeddings, when computed at ingestion time.
+    sentences: Optional[Tuple[str, ...]] = field(default=None, compare=False)
+    sentence_embeddings: Optional[Tuple[Sequence[float], ...]] = field(
+        default=None, compare=False
+    )
@@ -0,0 +1,73 @@
+import argparse
+import json
+from pathlib import Path
+
+from application.dtos import EvaluationConfigDTO
+from application.services import EvaluationService
+from infrastructure.api.search.search_controller import build_search_use_case
+from infrastructure.datasets import PublicDatasetRepository
+from infrastructure.evaluation import evaluation_dataset_from_public, report_to_rows, write_report
+from infrastructure.retrieval import Bm25Index
+
+DEFAULT_DATA_PATH = Path(__file__).resolve().parents[1] / "data" / "public_datasets.json"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Evaluate every query of a public dataset over a top_k/candidate_k grid"
+    )
+    parser.add_argument("dataset_id")
+    parser.add_argument("--modes", nargs="+", default=["classical", "quantum"])
+    parser.add_argument("--top-k", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--candidate-k", type=int, nargs="+", default=[10, 20])
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--lexical-pool",
+        type=int,
+        nargs="+",
+        default=[],
+        help="BM25 pool sizes to evaluate besides the full corpus",
+    )
+    parser.add_argument("--fusion", choices=["none", "rrf"], default="none")
+    parser.add_argument("--data-path", type=Path, default=DEFAULT_DATA_PATH)
+    parser.add_argument("--output", type=Path, help="Report path (.json or .csv)")
+    args = parser.parse_args()
+
+    dataset = PublicDatasetRepository(args.data_path).get_dataset(args.dataset_id)
+    if not dataset:
+        parser.error(f"Dataset nao encontrado: {args.dataset_id}")
+
+    # The same use case as the /evaluations jobs, so QUANTUM_COMPARATOR picks the
+    # quantum comparator here as well; reranks run on this process' own threads.
+    use_case = build_search_use_case(offload=False)
+    evaluation_dataset = evaluation_dataset_from_public(dataset)
+    lexical_index = None
+    if args.lexical_pool:
+        lexical_index = Bm25Index.build(doc.text for doc in evaluation_dataset.documents)
+    report = EvaluationService(use_case).avaliar(
+        evaluation_dataset,
+        EvaluationConfigDTO(
+            modes=tuple(args.modes),
+            top_ks=tuple(args.top_k),
+            candidate_ks=tuple(args.candidate_k),
+            confidence=args.confidence,
+            workers=args.workers,
+            lexical_pools=tuple(args.lexical_pool),
+            fusion=args.fusion,
+        ),
+        lexical_index,
+    )
+
+    if args.output:
+        write_report(report, args.output)
+        print(f"Relatorio salvo em {args.output}")
+        return
+
+    print(f"Dataset: {report.dataset_id} ({report.queries} queries, {report.documents} documentos)")
+    for row in report_to_rows(report):
+        print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,9 @@
+import asyncio
+import math
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -6,17 +11,70 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from infrastructure.persistence.database import get_db
+from infrastructure.api.auth.throttle import LoginThrottle
+from infrastructure.cache import LruTtlCache
+from infrastructure.persistence.database import get_async_db, get_db
 from infrastructure.persistence.models import User
 
 SECRET_KEY = os.getenv('JWT_SECRET', 'change-this-secret')
 ALGORITHM = os.getenv('JWT_ALGORITHM', 'HS256')
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv('ACCESS_TOKEN_EXPIRE_MINUTES', '1440'))
-
-pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
+# Resolved users are kept per token subject for a short time, so authenticated requests
+# do not each read the users table. Each worker has its own cache: changes made in
+# another process are seen after at most the TTL. PRINCIPAL_CACHE_MAX_ENTRIES=0 disables it.
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv('PRINCIPAL_CACHE_MAX_ENTRIES', '1024'))
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv('PRINCIPAL_CACHE_TTL_SECONDS', '30'))
+# bcrypt cost factor. Hashes made with another cost are rehashed on the next login.
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+# Hashing and checking passwords runs on its own small pool, apart from the search pools
+# and from the threadpool of the sync auth and conversation routes, so a login storm and
+# heavy search traffic do not queue behind each other. At most PASSWORD_HASH_QUEUE_SIZE
+# jobs wait for a worker; past that the request gets a 503 with Retry-After.
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', '2'))
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv('PASSWORD_HASH_QUEUE_SIZE', '32'))
+PASSWORD_RETRY_AFTER_SECONDS = int(os.getenv('PASSWORD_RETRY_AFTER_SECONDS', '1'))
+LOGIN_MAX_ATTEMPTS = int(os.getenv('LOGIN_MAX_ATTEMPTS', '10'))
+LOGIN_ATTEMPT_WINDOW_SECONDS = float(os.getenv('LOGIN_ATTEMPT_WINDOW_SECONDS', '300'))
+LOGIN_THROTTLE_MAX_ACCOUNTS = int(os.getenv('LOGIN_THROTTLE_MAX_ACCOUNTS', '100000'))
+
+pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto', bcrypt__rounds=BCRYPT_ROUNDS)
+password_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix='password-hash'
+)
+# Running + queued password jobs; the executor's own queue is unbounded.
+password_slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_SIZE)
+login_throttle = LoginThrottle(
+    LOGIN_MAX_ATTEMPTS, LOGIN_ATTEMPT_WINDOW_SECONDS, LOGIN_THROTTLE_MAX_ACCOUNTS
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='/auth/login')
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl='/auth/login', auto_error=False)
+
+
+@dataclass(frozen=True)
+class Principal:
+    # The authenticated user as the routes see it: plain columns, no ORM entity.
+    id: int
+    email: str
+    created_at: datetime
+
+
+principal_cache: LruTtlCache[Principal] = LruTtlCache(
+    PRINCIPAL_CACHE_MAX_ENTRIES, PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+
+def invalidate_principal(user_id: int) -> None:
+    principal_cache.delete(str(user_id))
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_changed_user(mapper, connection, target: User) -> None:
+    invalidate_principal(target.id)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -27,40 +85,121 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def _login_account(email: str) -> str:
+    return email.strip().lower()
+
+
+def check_login_attempt(email: str) -> None:
+    retry_after = login_throttle.attempt(_login_account(email))
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail='Too many login attempts',
+            headers={'Retry-After': str(math.ceil(retry_after))},
+        )
+
+
+def reset_login_attempts(email: str) -> None:
+    login_throttle.reset(_login_account(email))
+
+
+async def _run_password_work(function, *args):
+    if not password_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail='Server busy, try again later',
+            headers={'Retry-After': str(PASSWORD_RETRY_AFTER_SECONDS)},
+        )
+    try:
+        future = password_executor.submit(function, *args)
+    except BaseException:
+        password_slots.release()
+        raise
+    # Released when the job ends, even if the request was cancelled while waiting.
+    future.add_done_callback(lambda _: password_slots.release())
+    return await asyncio.wrap_future(future)
+
+
+async def hash_password(password: str) -> str:
+    return await _run_password_work(get_password_hash, password)
+
+
 def create_access_token(subject: str, expires_delta: Optional[timedelta] = None) -> str:
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode = {'sub': subject, 'exp': expire}
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def get_user_by_email(db: Session, email: str) -> Optional[User]:
-    return db.query(User).filter(User.email == email).first()
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
+    return await db.scalar(select(User).where(User.email == email))
 
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
-    user = get_user_by_email(db, email)
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
+    user = await get_user_by_email(db, email)
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
+    valid, new_hash = await _run_password_work(
+        pwd_context.verify_and_update, password, user.password_hash
+    )
+    if not valid:
         return None
+    if new_hash is not None:
+        # Made with another BCRYPT_ROUNDS: store it again at the current cost.
+        user.password_hash = new_hash
+        await db.commit()
     return user
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail='Could not validate credentials',
         headers={'WWW-Authenticate': 'Bearer'},
     )
+
+
+def _token_subject(token: str) -> str:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str | None = payload.get('sub')
-        if user_id is None:
-            raise credentials_exception
     except JWTError as exc:
-        raise credentials_exception from exc
+        raise _credentials_exception() from exc
+    user_id: str | None = payload.get('sub')
+    if user_id is None or not user_id.isdigit():
+        raise _credentials_exception()
+    return user_id
+
 
-    user = db.get(User, int(user_id))
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+    # Loads the ORM entity; routes that only need the id should use get_current_principal.
+    user = db.get(User, int(_token_subject(token)))
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     return user
+
+
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    subject = _token_subject(token)
+    principal = principal_cache.get(subject)
+    if principal is not None:
+        return principal
+    result = await db.execute(
+        select(User.id, User.email, User.created_at).where(User.id == int(subject))
+    )
+    row = result.first()
+    if row is None:
+        raise _credentials_exception()
+    principal = Principal(id=row.id, email=row.email, created_at=row.created_at)
+    principal_cache.set(subject, principal)
+    return principal
+
+
+async def get_optional_principal(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> Optional[Principal]:
+    # For routes that also serve anonymous callers; a token that is sent must be valid.
+    if token is None:
+        return None
+    return await get_current_principal(token, db)
@@ -0,0 +1,36 @@
+import time
+from typing import Optional
+
+from infrastructure.cache import LruTtlCache
+
+
+class LoginThrottle:
+    # Sliding window of login attempts per account. Attempts are counted before the
+    # password is checked, so a burst of parallel requests cannot queue more bcrypt work
+    # for one account than max_attempts per window. Accounts are kept in a bounded LRU.
+
+    def __init__(self, max_attempts: int, window_seconds: float, max_accounts: int) -> None:
+        self._max_attempts = max_attempts
+        self._window_seconds = window_seconds
+        self._attempts: LruTtlCache[tuple[float, ...]] = LruTtlCache(
+            max_accounts if max_attempts > 0 else 0, window_seconds
+        )
+
+    def attempt(self, account: str) -> Optional[float]:
+        # Records an attempt and returns None, or the seconds to wait when the account
+        # is over the limit (that attempt is not recorded).
+        if self._max_attempts <= 0:
+            return None
+        now = time.monotonic()
+        recent = tuple(
+            moment
+            for moment in self._attempts.get(account) or ()
+            if now - moment < self._window_seconds
+        )
+        if len(recent) >= self._max_attempts:
+            return self._window_seconds - (now - recent[0])
+        self._attempts.set(account, recent + (now,))
+        return None
+
+    def reset(self, account: str) -> None:
+        self._attempts.delete(account)
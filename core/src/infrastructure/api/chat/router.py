@@ -1,104 +1,323 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import base64
+import binascii
+import json
+import os
+from datetime import datetime
 
-from infrastructure.api.auth.security import get_current_user
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import and_, func, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from infrastructure.api.auth.security import Principal, get_current_principal
 from infrastructure.api.chat.schemas import (
     ConversationCreate,
     ConversationDetailOut,
     ConversationOut,
+    ConversationSummaryOut,
+    MessageBatchCreate,
+    MessageBatchOut,
     MessageCreate,
     MessageOut,
+    MessagePageOut,
+    SearchRunSummaryOut,
 )
-from infrastructure.persistence.database import get_db
-from infrastructure.persistence.models import Conversation, Message, User
+from infrastructure.api.search.schemas import SearchResponse as SearchResponseSchema
+from infrastructure.persistence.database import get_async_db
+from infrastructure.persistence.models import Conversation, Message, SearchRun
 
 router = APIRouter(prefix="/conversations", tags=["conversations"])
 
 ALLOWED_ROLES = {"user", "assistant", "system"}
+CONVERSATIONS_PAGE_SIZE = int(os.getenv("CONVERSATIONS_PAGE_SIZE", "50"))
+MESSAGES_PAGE_SIZE = int(os.getenv("MESSAGES_PAGE_SIZE", "200"))
+MAX_PAGE_SIZE = 500
+MAX_MESSAGE_BATCH = int(os.getenv("MAX_MESSAGE_BATCH", "1000"))
+
+
+def _encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, ValueError, TypeError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+def _after_cursor(query, model, cursor: str | None, descending: bool = False):
+    # Keyset condition on (created_at, id): the rows that follow the cursor's row in
+    # the listing order.
+    if not cursor:
+        return query
+    created_at, row_id = _decode_cursor(cursor)
+    if descending:
+        return query.filter(
+            or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < row_id),
+            )
+        )
+    return query.filter(
+        or_(
+            model.created_at > created_at,
+            and_(model.created_at == created_at, model.id > row_id),
+        )
+    )
+
+
+def _page(rows: list, limit: int) -> tuple[list, str | None]:
+    # Rows are fetched with limit + 1; the extra row only signals that a next page exists.
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, _encode_cursor(rows[-1].created_at, rows[-1].id)
+
+
+async def _get_conversation(
+    db: AsyncSession, conversation_id: int, user: Principal
+) -> Conversation:
+    conversation = await db.scalar(
+        select(Conversation).where(
+            Conversation.id == conversation_id, Conversation.user_id == user.id
+        )
+    )
+    if not conversation:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return conversation
+
+
+async def _message_page(
+    db: AsyncSession, conversation_id: int, cursor: str | None, limit: int
+) -> tuple[list[Message], str | None]:
+    # Oldest first, keyset on (created_at, id) over ix_messages_conversation_created.
+    query = select(Message).where(Message.conversation_id == conversation_id)
+    rows = await db.scalars(
+        _after_cursor(query, Message, cursor)
+        .order_by(Message.created_at, Message.id)
+        .limit(limit + 1)
+    )
+    return _page(rows.all(), limit)
 
 
 @router.post("", response_model=ConversationOut, status_code=status.HTTP_201_CREATED)
-def create_conversation(
+async def create_conversation(
     payload: ConversationCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
 ) -> ConversationOut:
     conversation = Conversation(user_id=current_user.id, title=payload.title)
     db.add(conversation)
-    db.commit()
-    db.refresh(conversation)
+    await db.commit()
+    await db.refresh(conversation)
     return conversation
 
 
-@router.get("", response_model=list[ConversationOut])
-def list_conversations(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-) -> list[ConversationOut]:
-    return (
-        db.query(Conversation)
-        .filter(Conversation.user_id == current_user.id)
-        .order_by(Conversation.created_at.desc())
-        .all()
+@router.get("", response_model=list[ConversationSummaryOut])
+async def list_conversations(
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(CONVERSATIONS_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
+) -> list[ConversationSummaryOut]:
+    # Newest first. The body stays a plain list; the cursor of the next page, when
+    # there is one, goes in the X-Next-Cursor header.
+    message_count = (
+        select(func.count(Message.id))
+        .where(Message.conversation_id == Conversation.id)
+        .scalar_subquery()
+    )
+    last_message_at = (
+        select(func.max(Message.created_at))
+        .where(Message.conversation_id == Conversation.id)
+        .scalar_subquery()
+    )
+    query = select(
+        Conversation.id,
+        Conversation.title,
+        Conversation.created_at,
+        message_count.label("message_count"),
+        last_message_at.label("last_message_at"),
+    ).where(Conversation.user_id == current_user.id)
+    rows = await db.execute(
+        _after_cursor(query, Conversation, cursor, descending=True)
+        .order_by(Conversation.created_at.desc(), Conversation.id.desc())
+        .limit(limit + 1)
     )
+    rows, next_cursor = _page(rows.all(), limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
 
 
 @router.get("/{conversation_id}", response_model=ConversationDetailOut)
-def get_conversation(
+async def get_conversation(
     conversation_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    limit: int = Query(MESSAGES_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
 ) -> ConversationDetailOut:
-    conversation = (
-        db.query(Conversation)
-        .filter(Conversation.id == conversation_id, Conversation.user_id == current_user.id)
-        .first()
+    conversation = await _get_conversation(db, conversation_id, current_user)
+    messages, next_cursor = await _message_page(db, conversation.id, None, limit)
+    return ConversationDetailOut(
+        id=conversation.id,
+        title=conversation.title,
+        created_at=conversation.created_at,
+        messages=messages,
+        next_cursor=next_cursor,
     )
-    if not conversation:
-        raise HTTPException(status_code=404, detail="Conversation not found")
 
-    conversation.messages.sort(key=lambda item: item.created_at)
-    return conversation
+
+@router.get("/{conversation_id}/messages", response_model=MessagePageOut)
+async def list_messages(
+    conversation_id: int,
+    cursor: str | None = None,
+    limit: int = Query(MESSAGES_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
+) -> MessagePageOut:
+    conversation = await _get_conversation(db, conversation_id, current_user)
+    messages, next_cursor = await _message_page(db, conversation.id, cursor, limit)
+    return MessagePageOut(items=messages, next_cursor=next_cursor)
 
 
 @router.post("/{conversation_id}/messages", response_model=MessageOut, status_code=status.HTTP_201_CREATED)
-def add_message(
+async def add_message(
     conversation_id: int,
     payload: MessageCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
 ) -> MessageOut:
     if payload.role not in ALLOWED_ROLES:
         raise HTTPException(status_code=400, detail="Invalid role")
 
-    conversation = (
-        db.query(Conversation)
-        .filter(Conversation.id == conversation_id, Conversation.user_id == current_user.id)
-        .first()
-    )
-    if not conversation:
-        raise HTTPException(status_code=404, detail="Conversation not found")
+    conversation = await _get_conversation(db, conversation_id, current_user)
 
     message = Message(conversation_id=conversation.id, role=payload.role, content=payload.content)
     db.add(message)
-    db.commit()
-    db.refresh(message)
+    await db.commit()
+    await db.refresh(message)
     return message
 
 
+@router.post(
+    "/{conversation_id}/messages/bulk",
+    response_model=MessageBatchOut,
+    status_code=status.HTTP_201_CREATED,
+)
+async def add_messages(
+    conversation_id: int,
+    payload: MessageBatchCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
+) -> MessageBatchOut:
+    # For imports and syncs of long histories: one transaction and one executemany
+    # instead of a request, commit and refresh per message.
+    if not payload.messages:
+        raise HTTPException(status_code=400, detail="No messages")
+    if len(payload.messages) > MAX_MESSAGE_BATCH:
+        raise HTTPException(
+            status_code=400, detail=f"Too many messages (max {MAX_MESSAGE_BATCH})"
+        )
+    invalid = [
+        str(position)
+        for position, message in enumerate(payload.messages)
+        if message.role not in ALLOWED_ROLES
+    ]
+    if invalid:
+        raise HTTPException(
+            status_code=400, detail=f"Invalid role at positions {', '.join(invalid)}"
+        )
+
+    conversation = await _get_conversation(db, conversation_id, current_user)
+
+    rows = [
+        {"conversation_id": conversation.id, "role": message.role, "content": message.content}
+        for message in payload.messages
+    ]
+    # Ids grow with the position in the batch, so sorting them restores its order.
+    if db.bind.dialect.insert_executemany_returning:
+        ids = await db.scalars(insert(Message).returning(Message.id), rows)
+        ids = sorted(ids.all())
+    else:
+        # MySQL has no RETURNING. The ownership check above opened this transaction's
+        # snapshot, so rows other transactions commit meanwhile are not visible: the
+        # newest len(rows) ids of the conversation are the ones just inserted.
+        await db.execute(insert(Message), rows)
+        ids = await db.scalars(
+            select(Message.id)
+            .where(Message.conversation_id == conversation.id)
+            .order_by(Message.id.desc())
+            .limit(len(rows))
+        )
+        ids = ids.all()[::-1]
+    await db.commit()
+    return MessageBatchOut(ids=ids)
+
+
+@router.get("/{conversation_id}/search-runs", response_model=list[SearchRunSummaryOut])
+async def list_search_runs(
+    conversation_id: int,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(CONVERSATIONS_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
+) -> list[SearchRunSummaryOut]:
+    # Newest first, paged like the conversation list (X-Next-Cursor header).
+    conversation = await _get_conversation(db, conversation_id, current_user)
+    query = select(
+        SearchRun.id,
+        SearchRun.route,
+        SearchRun.query,
+        SearchRun.mode,
+        SearchRun.total_ms,
+        SearchRun.created_at,
+    ).where(SearchRun.conversation_id == conversation.id)
+    rows = await db.execute(
+        _after_cursor(query, SearchRun, cursor, descending=True)
+        .order_by(SearchRun.created_at.desc(), SearchRun.id.desc())
+        .limit(limit + 1)
+    )
+    rows, next_cursor = _page(rows.all(), limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
+
+
+@router.get("/{conversation_id}/search-runs/{run_id}", response_model=SearchResponseSchema)
+async def replay_search_run(
+    conversation_id: int,
+    run_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
+) -> Response:
+    # The stored body as it was first sent; no embedding or circuit runs again.
+    body = await db.scalar(
+        select(SearchRun.response)
+        .join(Conversation, SearchRun.conversation_id == Conversation.id)
+        .where(
+            SearchRun.id == run_id,
+            SearchRun.conversation_id == conversation_id,
+            Conversation.user_id == current_user.id,
+        )
+    )
+    if body is None:
+        raise HTTPException(status_code=404, detail="Search run not found")
+    return Response(content=body, media_type="application/json")
+
+
 @router.delete("/{conversation_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_conversation(
+async def delete_conversation(
     conversation_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
 ) -> None:
-    conversation = (
-        db.query(Conversation)
-        .filter(Conversation.id == conversation_id, Conversation.user_id == current_user.id)
-        .first()
-    )
-    if not conversation:
-        raise HTTPException(status_code=404, detail="Conversation not found")
+    conversation = await _get_conversation(db, conversation_id, current_user)
 
-    db.delete(conversation)
-    db.commit()
+    await db.delete(conversation)
+    await db.commit()
@@ -17,6 +17,12 @@ class ConversationOut(BaseModel):
         from_attributes = True
 
 
+class ConversationSummaryOut(ConversationOut):
+    # Listing projection: counts and the last activity, never the message bodies.
+    message_count: int = 0
+    last_message_at: Optional[datetime] = None
+
+
 class MessageCreate(BaseModel):
     role: str
     content: str
@@ -32,11 +38,39 @@ class MessageOut(BaseModel):
         from_attributes = True
 
 
+class MessageBatchCreate(BaseModel):
+    # Stored in this order: ids are assigned ascending, so listings keep it.
+    messages: List[MessageCreate]
+
+
+class MessageBatchOut(BaseModel):
+    ids: List[int]
+
+
+class MessagePageOut(BaseModel):
+    items: List[MessageOut]
+    next_cursor: Optional[str] = None
+
+
 class ConversationDetailOut(BaseModel):
     id: int
     title: Optional[str]
     created_at: datetime
+    # First page of messages; next_cursor continues at /conversations/{id}/messages.
     messages: List[MessageOut]
+    next_cursor: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class SearchRunSummaryOut(BaseModel):
+    id: int
+    route: str
+    query: str
+    mode: str
+    total_ms: float
+    created_at: datetime
 
     class Config:
         from_attributes = True
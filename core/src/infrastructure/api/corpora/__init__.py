@@ -0,0 +1,3 @@
+from infrastructure.api.corpora.corpora_controller import router
+
+__all__ = ["router"]
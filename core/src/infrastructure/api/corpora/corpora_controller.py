@@ -0,0 +1,89 @@
+from fastapi import APIRouter, HTTPException, Query, Response
+
+from application.dtos import CorpusSummaryDTO, DocumentDTO
+from application.services.corpus import CorpusExistsError
+from infrastructure.api.corpora.schemas import (
+    CorpusCreate,
+    CorpusDocument,
+    CorpusDocumentsUpsert,
+    CorpusOut,
+)
+from infrastructure.api.search.executors import (
+    SEARCH_RETRY_AFTER_SECONDS,
+    ExecutorSaturated,
+    encoder_executor,
+)
+from infrastructure.corpora import corpus_index
+
+router = APIRouter(prefix="/corpora", tags=["corpora"])
+
+
+async def _offload(function, *args):
+    # Writes embed documents, so they share the search encoder pool.
+    try:
+        return await encoder_executor.run(function, *args)
+    except ExecutorSaturated as exc:
+        raise HTTPException(
+            status_code=503,
+            detail="Servidor ocupado, tente novamente",
+            headers={"Retry-After": str(SEARCH_RETRY_AFTER_SECONDS)},
+        ) from exc
+
+
+def _documents(items: list[CorpusDocument]) -> list[DocumentDTO]:
+    return [DocumentDTO(doc_id=item.doc_id, text=item.text) for item in items]
+
+
+def _corpus_out(summary: CorpusSummaryDTO | None) -> CorpusOut:
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Corpus nao encontrado")
+    return CorpusOut(
+        corpus_id=summary.corpus_id,
+        documents=summary.documents,
+        segments=summary.segments,
+        deleted_rows=summary.deleted_rows,
+        version=summary.version,
+    )
+
+
+@router.post("", response_model=CorpusOut, status_code=201)
+async def create_corpus(payload: CorpusCreate) -> CorpusOut:
+    try:
+        summary = await _offload(
+            corpus_index.criar_corpus, _documents(payload.documents), payload.corpus_id
+        )
+    except CorpusExistsError as exc:
+        raise HTTPException(status_code=409, detail="Corpus ja existe") from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="corpus_id invalido") from exc
+    return _corpus_out(summary)
+
+
+@router.get("/{corpus_id}", response_model=CorpusOut)
+def get_corpus(corpus_id: str) -> CorpusOut:
+    return _corpus_out(corpus_index.resumo(corpus_id))
+
+
+@router.put("/{corpus_id}/documents", response_model=CorpusOut)
+async def upsert_documents(corpus_id: str, payload: CorpusDocumentsUpsert) -> CorpusOut:
+    summary = await _offload(
+        corpus_index.adicionar_documentos, corpus_id, _documents(payload.documents)
+    )
+    return _corpus_out(summary)
+
+
+@router.delete("/{corpus_id}/documents", response_model=CorpusOut)
+def delete_documents(corpus_id: str, doc_id: list[str] = Query(...)) -> CorpusOut:
+    return _corpus_out(corpus_index.remover_documentos(corpus_id, doc_id))
+
+
+@router.post("/{corpus_id}/compact", response_model=CorpusOut)
+async def compact_corpus(corpus_id: str) -> CorpusOut:
+    return _corpus_out(await _offload(corpus_index.compactar, corpus_id))
+
+
+@router.delete("/{corpus_id}", status_code=204)
+def delete_corpus(corpus_id: str) -> Response:
+    if not corpus_index.remover_corpus(corpus_id):
+        raise HTTPException(status_code=404, detail="Corpus nao encontrado")
+    return Response(status_code=204)
@@ -0,0 +1,26 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class CorpusDocument(BaseModel):
+    doc_id: str
+    text: str
+
+
+class CorpusCreate(BaseModel):
+    # Without corpus_id a random one is assigned.
+    corpus_id: Optional[str] = None
+    documents: List[CorpusDocument] = []
+
+
+class CorpusDocumentsUpsert(BaseModel):
+    documents: List[CorpusDocument]
+
+
+class CorpusOut(BaseModel):
+    corpus_id: str
+    documents: int
+    segments: int
+    deleted_rows: int
+    version: int
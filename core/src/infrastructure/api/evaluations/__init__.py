@@ -0,0 +1,3 @@
+from infrastructure.api.evaluations.evaluations_controller import router
+
+__all__ = ["router"]
@@ -0,0 +1,100 @@
+import os
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from application.dtos import EvaluationConfigDTO
+from application.services import EvaluationService
+from infrastructure.api.evaluations.jobs import EvaluationJob, evaluation_jobs
+from infrastructure.api.evaluations.schemas import EvaluationJobOut, EvaluationRequest
+from infrastructure.api.search.search_controller import build_search_use_case
+from infrastructure.datasets import PublicDatasetRepository
+from infrastructure.evaluation import (
+    evaluation_dataset_from_public,
+    report_to_csv,
+    report_to_dict,
+)
+from infrastructure.retrieval import Bm25Index
+
+router = APIRouter(prefix="/evaluations", tags=["evaluations"])
+
+# Threads ranking queries inside one evaluation job.
+EVALUATION_WORKERS = int(os.getenv("EVALUATION_WORKERS", "4"))
+
+
+def _build_service() -> EvaluationService:
+    # Jobs rank on their own EVALUATION_WORKERS threads, so they neither take nor wait
+    # for slots of the request-facing quantum pool.
+    return EvaluationService(build_search_use_case(offload=False))
+
+
+def _to_job_schema(job: EvaluationJob) -> EvaluationJobOut:
+    return EvaluationJobOut(
+        job_id=job.job_id,
+        dataset_id=job.dataset_id,
+        status=job.status,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        error=job.error,
+        report=report_to_dict(job.report) if job.report else None,
+    )
+
+
+def _get_job(job_id: str) -> EvaluationJob:
+    job = evaluation_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Avaliacao nao encontrada")
+    return job
+
+
+@router.post("", response_model=EvaluationJobOut, status_code=202)
+def create_evaluation(payload: EvaluationRequest) -> EvaluationJobOut:
+    if not payload.modes or any(mode not in ("classical", "quantum") for mode in payload.modes):
+        raise HTTPException(status_code=400, detail="Modo invalido")
+    if not payload.top_ks or not payload.candidate_ks:
+        raise HTTPException(status_code=400, detail="Informe top_ks e candidate_ks")
+    if min(payload.top_ks + payload.candidate_ks) < 1:
+        raise HTTPException(status_code=400, detail="top_ks e candidate_ks devem ser positivos")
+    if not 0 < payload.confidence < 1:
+        raise HTTPException(status_code=400, detail="confidence deve estar entre 0 e 1")
+    if payload.lexical_pools and min(payload.lexical_pools) < 1:
+        raise HTTPException(status_code=400, detail="lexical_pools devem ser positivos")
+    if payload.fusion not in ("none", "rrf"):
+        raise HTTPException(status_code=400, detail="fusion deve ser none ou rrf")
+
+    dataset = PublicDatasetRepository().get_dataset(payload.dataset_id)
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset nao encontrado")
+
+    evaluation_dataset = evaluation_dataset_from_public(dataset)
+    config = EvaluationConfigDTO(
+        modes=tuple(payload.modes),
+        top_ks=tuple(payload.top_ks),
+        candidate_ks=tuple(payload.candidate_ks),
+        confidence=payload.confidence,
+        workers=EVALUATION_WORKERS,
+        lexical_pools=tuple(payload.lexical_pools),
+        fusion=payload.fusion,
+    )
+
+    def run():
+        lexical_index = None
+        if config.lexical_pools:
+            lexical_index = Bm25Index.build(doc.text for doc in evaluation_dataset.documents)
+        return _build_service().avaliar(evaluation_dataset, config, lexical_index)
+
+    job = evaluation_jobs.submit(payload.dataset_id, run)
+    return _to_job_schema(job)
+
+
+@router.get("/{job_id}", response_model=EvaluationJobOut)
+def get_evaluation(job_id: str) -> EvaluationJobOut:
+    return _to_job_schema(_get_job(job_id))
+
+
+@router.get("/{job_id}/report.csv", response_class=PlainTextResponse)
+def get_evaluation_csv(job_id: str) -> PlainTextResponse:
+    job = _get_job(job_id)
+    if job.report is None:
+        raise HTTPException(status_code=409, detail="Avaliacao ainda nao concluida")
+    return PlainTextResponse(report_to_csv(job.report), media_type="text/csv")
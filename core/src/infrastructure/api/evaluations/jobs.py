@@ -0,0 +1,65 @@
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
+
+from application.dtos import EvaluationReportDTO
+
+EVALUATION_JOB_WORKERS = int(os.getenv("EVALUATION_JOB_WORKERS", "1"))
+EVALUATION_MAX_JOBS = int(os.getenv("EVALUATION_MAX_JOBS", "20"))
+
+
+@dataclass
+class EvaluationJob:
+    job_id: str
+    dataset_id: str
+    status: str = "pending"
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: Optional[datetime] = None
+    report: Optional[EvaluationReportDTO] = None
+    error: Optional[str] = None
+
+
+class EvaluationJobStore:
+    # Runs evaluations in the background and keeps the most recent jobs in memory;
+    # the oldest finished jobs are dropped beyond max_jobs.
+
+    def __init__(self, workers: int, max_jobs: int) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="evaluation")
+        self._max_jobs = max_jobs
+        self._jobs: Dict[str, EvaluationJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, dataset_id: str, run: Callable[[], EvaluationReportDTO]) -> EvaluationJob:
+        job = EvaluationJob(job_id=uuid.uuid4().hex, dataset_id=dataset_id)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._evict()
+        self._executor.submit(self._run, job, run)
+        return job
+
+    def get(self, job_id: str) -> Optional[EvaluationJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: EvaluationJob, run: Callable[[], EvaluationReportDTO]) -> None:
+        job.status = "running"
+        try:
+            job.report = run()
+            job.status = "done"
+        except Exception as exc:
+            job.error = str(exc)
+            job.status = "failed"
+        job.finished_at = datetime.now(timezone.utc)
+
+    def _evict(self) -> None:
+        finished = [job for job in self._jobs.values() if job.status in ("done", "failed")]
+        finished.sort(key=lambda job: job.created_at)
+        while len(self._jobs) > self._max_jobs and finished:
+            del self._jobs[finished.pop(0).job_id]
+
+
+evaluation_jobs = EvaluationJobStore(EVALUATION_JOB_WORKERS, EVALUATION_MAX_JOBS)
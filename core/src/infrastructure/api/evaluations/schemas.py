@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+class EvaluationRequest(BaseModel):
+    dataset_id: str
+    modes: List[str] = ["classical", "quantum"]
+    top_ks: List[int] = [1, 3, 5]
+    candidate_ks: List[int] = [10, 20]
+    confidence: float = 0.95
+    # BM25 pool sizes evaluated besides the full corpus, with the recall they lose.
+    lexical_pools: List[int] = []
+    fusion: str = "none"
+
+
+class EvaluationJobOut(BaseModel):
+    job_id: str
+    dataset_id: str
+    status: str
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    report: Optional[Dict[str, Any]] = None
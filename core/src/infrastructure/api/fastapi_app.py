@@ -1,11 +1,16 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from infrastructure.api.auth import router as auth_router
 from infrastructure.api.search.search_controller import router as search_router
 from infrastructure.api.chat import router as chat_router
+from infrastructure.api.corpora import router as corpora_router
 from infrastructure.api.datasets import router as datasets_router
-from infrastructure.persistence.database import init_db
+from infrastructure.api.evaluations import router as evaluations_router
+from infrastructure.api.preload import start_warm_up
+from infrastructure.observability import PrometheusMiddleware, register_pool_metrics, registry
+from infrastructure.persistence.database import async_engine, engine, init_db
 
 app = FastAPI(title="Quantum Search TCC")
 
@@ -16,19 +21,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Browsers only let pages read response headers listed here.
+    expose_headers=["X-Next-Cursor"],
 )
+app.add_middleware(PrometheusMiddleware)
+register_pool_metrics(engine)
+register_pool_metrics(async_engine, "async")
 
 app.include_router(auth_router)
 app.include_router(search_router)
 app.include_router(chat_router)
+app.include_router(corpora_router)
 app.include_router(datasets_router)
+app.include_router(evaluations_router)
 
 
 @app.on_event("startup")
 def on_startup() -> None:
     init_db()
+    # /health and /auth answer right away; the model loads behind them.
+    start_warm_up()
 
 
 @app.get("/health")
 def health() -> dict:
     return {"status": "ok"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,134 @@
+import gc
+import logging
+import os
+import threading
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from application.dtos import DocumentDTO
+from application.interfaces import QuantumComparator
+
+from infrastructure.api.search.search_controller import build_quantum_comparator
+from infrastructure.datasets import PublicDatasetRepository, dataset_corpora
+from infrastructure.embeddings import (
+    DEFAULT_MODEL_NAME,
+    LocalEmbedder,
+    compressed_corpora,
+    corpus_matrices,
+    load_model,
+)
+from infrastructure.retrieval import lexical_indexes
+
+# Optional .npy file for the public dataset embeddings. When set, the matrix is written
+# once and memory-mapped, so workers share it through the page cache even without fork.
+CORPUS_MATRIX_PATH = os.getenv("CORPUS_MATRIX_PATH", "")
+# Optional directory for the public datasets' BM25 indexes (one .npz per corpus);
+# indexes found there are loaded instead of rebuilt.
+LEXICAL_INDEX_DIR = os.getenv("LEXICAL_INDEX_DIR", "")
+# Product quantization of the public dataset embeddings: bytes per vector (subspaces
+# of 384 / CORPUS_PQ_SUBSPACES dimensions, one byte each); 0 keeps no compressed copy.
+# Searches then score only the codes and re-score a shortlist exactly, so pair it with
+# CORPUS_MATRIX_PATH to keep the float matrix on disk instead of in memory.
+CORPUS_PQ_SUBSPACES = int(os.getenv("CORPUS_PQ_SUBSPACES", "0"))
+# Vectors per dataset the codebooks are trained on.
+CORPUS_PQ_TRAIN_SAMPLE = int(os.getenv("CORPUS_PQ_TRAIN_SAMPLE", "20000"))
+# Optional directory for the codes (one <fingerprint>/ per corpus, memory-mapped).
+CORPUS_PQ_DIR = os.getenv("CORPUS_PQ_DIR", "")
+# Intra-op threads per worker; 0 splits the CPUs evenly between the workers.
+TORCH_NUM_THREADS = int(os.getenv("TORCH_NUM_THREADS", "0"))
+# Load the model and PennyLane in a background thread at startup instead of on the
+# first search.
+SEARCH_WARMUP = os.getenv("SEARCH_WARMUP", "true").lower() == "true"
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up() -> None:
+    # The app imports neither torch nor pennylane; this pays for both before the first
+    # search needs them. A failure only means that search loads them itself.
+    try:
+        load_model(DEFAULT_MODEL_NAME)
+        import pennylane  # noqa: F401
+    except Exception:
+        logger.exception("Falha ao aquecer o modelo de embeddings")
+
+
+def start_warm_up() -> threading.Thread | None:
+    if not SEARCH_WARMUP:
+        return None
+    thread = threading.Thread(target=warm_up, name="search-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def _rerank_index(comparator: QuantumComparator, documents: list[DocumentDTO]) -> Any:
+    # Built from the corpus matrix rows. A matrix loaded from CORPUS_MATRIX_PATH may
+    # lack some texts; the corpus is then reranked without an index.
+    rows = corpus_matrices.lookup([doc.text for doc in documents])
+    if not rows or min(rows) < 0:
+        return None
+    return comparator.index_corpus(corpus_matrices.matrix[rows])
+
+
+def preload(repository: PublicDatasetRepository | None = None) -> None:
+    # Runs once in the gunicorn master (preload_app) before the workers are forked: the
+    # model weights and corpus matrices are then shared copy-on-write by every worker.
+    import torch
+
+    # Torch's OpenMP pool cannot be reused by forked children; with one thread the
+    # master's encodes run inline and never start it. Workers set their own count.
+    torch.set_num_threads(1)
+    warm_up()
+
+    # The search routes take the documents and fingerprints from dataset_corpora, so
+    # they match the keys of the stores built below.
+    repository = repository or PublicDatasetRepository()
+    corpora = [corpus.documents for corpus in dataset_corpora.build(repository)]
+    path = Path(CORPUS_MATRIX_PATH) if CORPUS_MATRIX_PATH else None
+    if path is not None and path.exists():
+        corpus_matrices.load(path)
+    else:
+        corpus_matrices.build(
+            (doc.text for documents in corpora for doc in documents), LocalEmbedder()
+        )
+        if path is not None:
+            corpus_matrices.save(path)
+            corpus_matrices.load(path)
+
+    lexical_indexes.build(corpora, Path(LEXICAL_INDEX_DIR) if LEXICAL_INDEX_DIR else None)
+    comparator = build_quantum_comparator()
+    if comparator.indexes_corpora:
+        dataset_corpora.index(partial(_rerank_index, comparator))
+    if CORPUS_PQ_SUBSPACES > 0:
+        compressed_corpora.build(
+            corpora,
+            corpus_matrices,
+            CORPUS_PQ_SUBSPACES,
+            CORPUS_PQ_TRAIN_SAMPLE,
+            Path(CORPUS_PQ_DIR) if CORPUS_PQ_DIR else None,
+        )
+        logger.info(
+            "Corpora comprimidos: %d (%.1f MiB de codigos, matriz float32 de %.1f MiB)",
+            len(compressed_corpora),
+            compressed_corpora.nbytes / 2**20,
+            corpus_matrices.matrix.nbytes / 2**20,
+        )
+
+    # Everything allocated so far lives as long as the process. Freezing it keeps the
+    # collector from writing to (and so copying) those pages in each worker.
+    gc.freeze()
+
+
+def configure_worker(workers: int) -> None:
+    # Called in each worker right after fork.
+    import torch
+
+    threads = TORCH_NUM_THREADS or max(1, (os.cpu_count() or 1) // max(1, workers))
+    torch.set_num_threads(threads)
+
+    # Connections opened by the master must not be shared with the children.
+    from infrastructure.persistence.database import async_engine, engine
+
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
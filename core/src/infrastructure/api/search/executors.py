@@ -0,0 +1,113 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence, TypeVar
+
+from application.interfaces import CircuitStats, QuantumComparator
+
+T = TypeVar("T")
+
+SEARCH_ENCODER_WORKERS = int(os.getenv("SEARCH_ENCODER_WORKERS", "2"))
+SEARCH_QUANTUM_WORKERS = int(os.getenv("SEARCH_QUANTUM_WORKERS", "2"))
+SEARCH_QUEUE_SIZE = int(os.getenv("SEARCH_QUEUE_SIZE", "16"))
+SEARCH_RETRY_AFTER_SECONDS = int(os.getenv("SEARCH_RETRY_AFTER_SECONDS", "2"))
+# How long work of an already admitted request waits for a slot before giving up.
+SEARCH_ADMITTED_WAIT_SECONDS = float(os.getenv("SEARCH_ADMITTED_WAIT_SECONDS", "30"))
+
+
+class ExecutorSaturated(Exception):
+    pass
+
+
+class BoundedExecutor:
+    # Thread pool with a hard cap on running + queued jobs. Admission of a new
+    # request is non-blocking: past the cap submit raises ExecutorSaturated, which the
+    # routes turn into a 503 with Retry-After. Later work of an admitted request
+    # (submit_waiting) waits for a slot instead, up to SEARCH_ADMITTED_WAIT_SECONDS.
+
+    def __init__(self, name: str, workers: int, queue_size: int) -> None:
+        self.name = name
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def submit(self, function: Callable[..., T], *args) -> "Future[T]":
+        if not self._slots.acquire(blocking=False):
+            raise ExecutorSaturated(self.name)
+        return self._start(function, *args)
+
+    async def run(self, function: Callable[..., T], *args) -> T:
+        return await asyncio.wrap_future(self.submit(function, *args))
+
+    def submit_waiting(self, function: Callable[..., T], *args) -> "Future[T]":
+        if not self._slots.acquire(timeout=SEARCH_ADMITTED_WAIT_SECONDS):
+            raise ExecutorSaturated(self.name)
+        return self._start(function, *args)
+
+    def call(self, function: Callable[..., T], *args) -> T:
+        return self.submit_waiting(function, *args).result()
+
+    def _start(self, function: Callable[..., T], *args) -> "Future[T]":
+        try:
+            future = self._executor.submit(function, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+
+encoder_executor = BoundedExecutor("search-encoder", SEARCH_ENCODER_WORKERS, SEARCH_QUEUE_SIZE)
+quantum_executor = BoundedExecutor("search-quantum", SEARCH_QUANTUM_WORKERS, SEARCH_QUEUE_SIZE)
+
+
+class OffloadedComparator(QuantumComparator):
+    # Runs circuit simulations on the quantum pool so at most
+    # SEARCH_QUANTUM_WORKERS simulations execute at once. Reranks belong to requests
+    # that were admitted on the encoder pool, so they wait for a quantum slot.
+
+    def __init__(self, inner: QuantumComparator, executor: BoundedExecutor) -> None:
+        self._inner = inner
+        self._executor = executor
+
+    def compare(self, vector_a: Sequence[float], vector_b: Sequence[float]) -> float:
+        return self._executor.call(self._inner.compare, vector_a, vector_b)
+
+    def compare_many(
+        self, vector_a: Sequence[float], vectors: Sequence[Sequence[float]]
+    ) -> List[float]:
+        return self._executor.call(self._inner.compare_many, vector_a, vectors)
+
+    def compare_batch(
+        self,
+        vectors_a: Sequence[Sequence[float]],
+        candidates: Sequence[Sequence[Sequence[float]]],
+    ) -> List[List[float]]:
+        # Each query's rerank is an independent job, so a batch spreads over every
+        # quantum worker instead of running one query at a time.
+        futures = []
+        try:
+            for vector_a, vectors in zip(vectors_a, candidates):
+                futures.append(
+                    self._executor.submit_waiting(self._inner.compare_many, vector_a, vectors)
+                )
+        except ExecutorSaturated:
+            for future in futures:
+                future.cancel()
+            raise
+        return [future.result() for future in futures]
+
+    @property
+    def linear_cost(self) -> bool:
+        return self._inner.linear_cost
+
+    @property
+    def indexes_corpora(self) -> bool:
+        return self._inner.indexes_corpora
+
+    def index_corpus(self, vectors: Sequence[Sequence[float]]) -> Any:
+        # Runs at ingestion, not in a rerank, so on the caller's thread.
+        return self._inner.index_corpus(vectors)
+
+    def consume_stats(self, with_resources: bool = False) -> Optional[CircuitStats]:
+        return self._inner.consume_stats(with_resources)
@@ -1,14 +1,27 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel
 
 
 class SearchRequest(BaseModel):
     query: str
-    documents: List[str]
+    documents: List[str] = []
+    upload_id: Optional[str] = None
+    # Indexed corpus (/corpora) searched instead of documents.
+    corpus_id: Optional[str] = None
     mode: str = "classical"
     top_k: int = 5
     candidate_k: int = 20
+    instrument: bool = False
+    latency_budget_ms: Optional[float] = None
+    include_answer: bool = True
+    # BM25 first stage: only the lexical_pool best lexical matches are embedded
+    # (None uses SEARCH_LEXICAL_POOL, 0 disables it); fusion "rrf" ranks them by
+    # reciprocal rank fusion of the BM25 and dense rankings.
+    lexical_pool: Optional[int] = None
+    fusion: str = "none"
+    # With a bearer token, the run is stored in this conversation for replay.
+    conversation_id: Optional[int] = None
 
 
 class DatasetSearchRequest(BaseModel):
@@ -17,6 +30,30 @@ class DatasetSearchRequest(BaseModel):
     mode: str = "compare"
     top_k: int = 5
     candidate_k: int = 20
+    instrument: bool = False
+    latency_budget_ms: Optional[float] = None
+    include_answer: bool = True
+    # BM25 first stage: only the lexical_pool best lexical matches are embedded
+    # (None uses SEARCH_LEXICAL_POOL, 0 disables it); fusion "rrf" ranks them by
+    # reciprocal rank fusion of the BM25 and dense rankings.
+    lexical_pool: Optional[int] = None
+    fusion: str = "none"
+    # With a bearer token, the run is stored in this conversation for replay.
+    conversation_id: Optional[int] = None
+
+
+class BatchSearchRequest(BaseModel):
+    queries: List[str] = []
+    query_ids: List[str] = []
+    documents: Optional[List[str]] = None
+    upload_id: Optional[str] = None
+    corpus_id: Optional[str] = None
+    dataset_id: Optional[str] = None
+    mode: str = "classical"
+    top_k: int = 5
+    candidate_k: int = 20
+    lexical_pool: Optional[int] = None
+    fusion: str = "none"
 
 
 class SearchResultOut(BaseModel):
@@ -25,6 +62,19 @@ class SearchResultOut(BaseModel):
     score: float
 
 
+class QuantumMetricsOut(BaseModel):
+    prefilter_ms: float
+    rerank_ms: float
+    simulator_ms: float
+    python_overhead_ms: float
+    circuit_executions: int
+    qubits: Optional[int] = None
+    circuit_depth: Optional[int] = None
+    gate_counts: Dict[str, int] = {}
+    effective_candidate_k: Optional[int] = None
+    budget_truncated: bool = False
+
+
 class SearchMetricsOut(BaseModel):
     recall_at_k: Optional[float] = None
     mrr: Optional[float] = None
@@ -33,6 +83,10 @@ class SearchMetricsOut(BaseModel):
     k: int
     candidate_k: int
     has_labels: bool
+    quantum: Optional[QuantumMetricsOut] = None
+    cached: bool = False
+    effective_candidate_k: Optional[int] = None
+    budget_truncated: bool = False
 
 
 class SearchResponseLite(BaseModel):
@@ -53,3 +107,31 @@ class SearchResponse(BaseModel):
     answer: Optional[str] = None
     metrics: Optional[SearchMetricsOut] = None
     comparison: Optional[SearchComparisonOut] = None
+    timings: Dict[str, float] = {}
+
+
+class BatchQueryResultOut(BaseModel):
+    query: str
+    query_id: Optional[str] = None
+    results: List[SearchResultOut]
+    metrics: Optional[SearchMetricsOut] = None
+    comparison: Optional[SearchComparisonOut] = None
+
+
+class BatchSearchResponse(BaseModel):
+    mode: str
+    results: List[BatchQueryResultOut]
+    timings: Dict[str, float] = {}
+
+
+class UploadOut(BaseModel):
+    upload_id: str
+    documents: int
+
+
+class StageLatencyOut(BaseModel):
+    count: int
+    p50: float
+    p90: float
+    p95: float
+    p99: float
@@ -1,164 +1,931 @@
-from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+import asyncio
+import os
+import time
+from functools import partial
+from typing import Any
 
-from application.dtos import DocumentDTO, SearchFileRequestDTO, SearchRequestDTO
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Request,
+    Response,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from application.dtos import (
+    BatchSearchRequestDTO,
+    DocumentDTO,
+    SearchEventDTO,
+    SearchFileRequestDTO,
+    SearchRequestDTO,
+)
+from application.instrumentation import RerankCostModel, StageLatencyAggregator
+from application.interfaces import LexicalIndex
 from application.services import SearchService
-from application.use_cases import BuscarPorArquivoUseCase, RealizarBuscaUseCase
+from application.services.search import (
+    content_fingerprint,
+    corpus_fingerprint,
+    manifest_fingerprint,
+    mark_cached,
+    search_cache_key,
+)
+from application.use_cases import (
+    BuscarPorArquivoUseCase,
+    LexicalStage,
+    RealizarBuscaUseCase,
+    ShortlistStage,
+)
+from infrastructure.api.search.executors import (
+    SEARCH_RETRY_AFTER_SECONDS,
+    ExecutorSaturated,
+    OffloadedComparator,
+    encoder_executor,
+    quantum_executor,
+)
+from infrastructure.api.auth.security import Principal, get_optional_principal
+from infrastructure.api.search import serialization
 from infrastructure.api.search.file_reader import PdfTxtDocumentTextExtractor
 from infrastructure.api.search.schemas import (
+    BatchSearchRequest as BatchSearchRequestSchema,
+    BatchSearchResponse as BatchSearchResponseSchema,
     DatasetSearchRequest as DatasetSearchRequestSchema,
     SearchRequest as SearchRequestSchema,
     SearchResponse as SearchResponseSchema,
-    SearchResponseLite as SearchResponseLiteSchema,
+    StageLatencyOut,
+    UploadOut,
+)
+from infrastructure.api.search.upload_store import upload_store
+from infrastructure.cache import LruTtlResultCache
+from infrastructure.corpora import PreparedCorpus, corpus_index, prepared_corpora
+from infrastructure.datasets import PublicDatasetRepository, dataset_corpora
+from infrastructure.embeddings import (
+    DEFAULT_MODEL_NAME,
+    CorpusCachedEmbedder,
+    LocalEmbedder,
+    compressed_corpora,
+    corpus_matrices,
+)
+from infrastructure.observability import (
+    InstrumentedComparator,
+    InstrumentedEmbedder,
+    InstrumentedResultCache,
+)
+from infrastructure.observability.metrics import (
+    quantum_rerank_candidate_seconds,
+    search_duration_seconds,
+    search_requests_total,
+)
+from infrastructure.persistence.database import get_db
+from infrastructure.persistence.search_runs import owns_conversation, record_search_run
+from infrastructure.retrieval import Bm25Index, lexical_indexes
+from infrastructure.quantum import (
+    CosineSimilarityComparator,
+    L2SamplingComparator,
+    SuperpositionSwapTestComparator,
+    SwapTestQuantumComparator,
 )
-from infrastructure.datasets import PublicDatasetRepository
-from infrastructure.embeddings import LocalEmbedder
-from infrastructure.quantum import CosineSimilarityComparator, SwapTestQuantumComparator
 
 router = APIRouter(prefix="/search", tags=["search"])
 
+# "swap_test" runs one circuit per candidate; "superposition" is the experimental
+# index-register circuit that reranks all candidates in a single execution;
+# "l2_sampling" is the classical quantum-inspired length-squared sampling estimator.
+QUANTUM_COMPARATOR = os.getenv("QUANTUM_COMPARATOR", "swap_test")
+L2_SAMPLING_SAMPLES = int(os.getenv("L2_SAMPLING_SAMPLES", "64"))
+SEARCH_BATCH_MAX_QUERIES = int(os.getenv("SEARCH_BATCH_MAX_QUERIES", "256"))
+# Identical searches (same normalised query, corpus, model and parameters) are served
+# from memory; SEARCH_CACHE_MAX_ENTRIES=0 disables the cache.
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "256"))
+SEARCH_CACHE_TTL_SECONDS = int(os.getenv("SEARCH_CACHE_TTL_SECONDS", "600"))
+# Default BM25 candidate pool for requests that do not set lexical_pool; 0 embeds
+# the whole corpus.
+SEARCH_LEXICAL_POOL = int(os.getenv("SEARCH_LEXICAL_POOL", "0"))
+FUSION_METHODS = ("none", "rrf")
+# Dataset documents re-scored exactly after the product-quantized first stage (only
+# for datasets compressed at startup, see CORPUS_PQ_SUBSPACES); 0 scores them all.
+CORPUS_PQ_SHORTLIST = int(os.getenv("CORPUS_PQ_SHORTLIST", "200"))
 
-def _build_service() -> SearchService:
-    embedder = LocalEmbedder()
+stage_latencies = StageLatencyAggregator()
+# Shared by every request so latency budgets are sized from the latest reranks.
+rerank_cost_model = RerankCostModel()
+quantum_rerank_candidate_seconds.set_function(
+    lambda: (rerank_cost_model.per_candidate_ms or 0.0) / 1000
+)
+result_cache = InstrumentedResultCache(
+    LruTtlResultCache(SEARCH_CACHE_MAX_ENTRIES, SEARCH_CACHE_TTL_SECONDS)
+)
+
+
+def build_quantum_comparator():
+    if QUANTUM_COMPARATOR == "superposition":
+        return SuperpositionSwapTestComparator()
+    if QUANTUM_COMPARATOR == "l2_sampling":
+        return L2SamplingComparator(samples=L2_SAMPLING_SAMPLES)
+    return SwapTestQuantumComparator()
+
+
+def build_search_use_case(offload: bool = True) -> RealizarBuscaUseCase:
+    # Public dataset texts come from the preloaded matrices; only the rest is encoded.
+    # Callers that are not requests (evaluation jobs, the CLI) pass offload=False and
+    # rerank on their own threads, outside the request-facing quantum pool.
+    embedder = CorpusCachedEmbedder(InstrumentedEmbedder(LocalEmbedder()), corpus_matrices)
     classical = CosineSimilarityComparator()
-    quantum = SwapTestQuantumComparator()
-    buscar_use_case = RealizarBuscaUseCase(embedder, classical, quantum)
+    quantum = InstrumentedComparator(build_quantum_comparator())
+    if offload:
+        quantum = OffloadedComparator(quantum, quantum_executor)
+    return RealizarBuscaUseCase(embedder, classical, quantum, rerank_cost_model)
+
+
+def _build_service() -> SearchService:
     buscar_por_arquivo_use_case = BuscarPorArquivoUseCase(PdfTxtDocumentTextExtractor())
-    return SearchService(buscar_use_case, buscar_por_arquivo_use_case)
+    return SearchService(build_search_use_case(), buscar_por_arquivo_use_case)
 
 
-def _to_response_schema(response) -> SearchResponseSchema:
-    comparison = None
-    if response.comparison:
-        comparison = {
-            "classical": _to_response_lite_schema(response.comparison.classical),
-            "quantum": _to_response_lite_schema(response.comparison.quantum),
-        }
+def _json_response(body: str, headers: dict | None = None) -> Response:
+    return Response(content=body, media_type="application/json", headers=headers)
 
-    return SearchResponseSchema(
-        query=response.query,
-        mode=response.mode,
-        results=[
-            {"doc_id": item.doc_id, "text": item.text, "score": item.score}
-            for item in response.results
-        ],
-        answer=response.answer,
-        metrics=_metrics_to_schema(response.metrics),
-        comparison=comparison,
-    )
 
+async def _finish(
+    response, start: float, route: str, headers: dict | None = None, record=None
+) -> Response:
+    mapping_start = time.perf_counter()
+    fields = serialization.response_fields(response)
+    timings = dict(response.timings)
+    timings["response_mapping"] = (time.perf_counter() - mapping_start) * 1000
+    elapsed = time.perf_counter() - start
+    timings["total"] = elapsed * 1000
+    stage_latencies.record(timings)
+    search_requests_total.labels(route, response.mode).inc()
+    search_duration_seconds.labels(route, response.mode).observe(elapsed)
+    fields.append(("timings", serialization.encode_timings(timings)))
+    body = serialization.encode_object(fields)
+    if record is not None:
+        await run_in_threadpool(record, response, body, timings)
+    return _json_response(body, headers)
 
-def _to_response_lite_schema(response) -> SearchResponseLiteSchema:
-    return SearchResponseLiteSchema(
-        results=[
-            {"doc_id": item.doc_id, "text": item.text, "score": item.score}
-            for item in response.results
-        ],
-        answer=response.answer,
-        metrics=_metrics_to_schema(response.metrics),
+
+async def _run_recorder(
+    db: Session,
+    user: Principal | None,
+    conversation_id: int | None,
+    route: str,
+    fingerprint: str,
+    **parameters,
+):
+    # Checked before searching, so a bad conversation_id costs no encoding. Returns
+    # the callable that stores the finished run, or None for anonymous searches.
+    if conversation_id is None:
+        return None
+    if user is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Autenticacao necessaria para registrar a busca na conversa",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if not await run_in_threadpool(owns_conversation, db, user.id, conversation_id):
+        raise HTTPException(status_code=404, detail="Conversa nao encontrada")
+    parameters.update(comparator=QUANTUM_COMPARATOR, model=DEFAULT_MODEL_NAME)
+    return partial(record_search_run, db, conversation_id, route, parameters, fingerprint)
+
+
+async def _offload(function, *args):
+    # Search work runs on the dedicated encoder pool instead of Starlette's shared
+    # threadpool; when that pool is full the request is rejected right away.
+    try:
+        return await encoder_executor.run(function, *args)
+    except ExecutorSaturated as exc:
+        raise HTTPException(
+            status_code=503,
+            detail="Servidor ocupado, tente novamente",
+            headers={"Retry-After": str(SEARCH_RETRY_AFTER_SECONDS)},
+        ) from exc
+
+
+def _cache_key(
+    query: str,
+    fingerprint: str,
+    mode: str,
+    top_k: int,
+    candidate_k: int,
+    instrument: bool,
+    latency_budget_ms: float | None,
+    include_answer: bool,
+    relevant_doc_ids: list[str] | None = None,
+    lexical_pool: int = 0,
+    fusion: str = "none",
+) -> str:
+    return search_cache_key(
+        query,
+        fingerprint,
+        DEFAULT_MODEL_NAME,
+        mode=mode,
+        top_k=top_k,
+        candidate_k=candidate_k,
+        instrument=instrument,
+        latency_budget_ms=latency_budget_ms,
+        include_answer=include_answer,
+        relevant_doc_ids=sorted(relevant_doc_ids or []),
+        lexical_pool=lexical_pool,
+        fusion=fusion,
+        comparator=QUANTUM_COMPARATOR,
+        l2_sampling_samples=L2_SAMPLING_SAMPLES,
     )
 
 
-def _metrics_to_schema(metrics):
-    if metrics is None:
+async def _cached_search(key: str, function, *args):
+    lookup_start = time.perf_counter()
+    cached = result_cache.get(key)
+    if cached is not None:
+        return mark_cached(cached, (time.perf_counter() - lookup_start) * 1000)
+    response = await _offload(function, *args)
+    # A rerank cut short by its budget depends on load at the time; do not replay it.
+    if not _budget_truncated(response):
+        result_cache.set(key, response)
+    return response
+
+
+def _budget_truncated(response) -> bool:
+    lites = [response]
+    if response.comparison is not None:
+        lites += [response.comparison.classical, response.comparison.quantum]
+    return any(lite.metrics is not None and lite.metrics.budget_truncated for lite in lites)
+
+
+def _check_budget(latency_budget_ms: float | None) -> None:
+    if latency_budget_ms is not None and latency_budget_ms <= 0:
+        raise HTTPException(status_code=400, detail="latency_budget_ms deve ser positivo")
+
+
+def _check_lexical(lexical_pool: int | None, fusion: str) -> int:
+    # Returns the pool size the request runs with.
+    if fusion not in FUSION_METHODS:
+        raise HTTPException(status_code=400, detail="fusion deve ser none ou rrf")
+    pool = SEARCH_LEXICAL_POOL if lexical_pool is None else lexical_pool
+    if pool < 0:
+        raise HTTPException(status_code=400, detail="lexical_pool nao pode ser negativo")
+    return pool
+
+
+def _lexical_stage(
+    docs: list[DocumentDTO],
+    pool: int,
+    fusion: str,
+    index=None,
+    fingerprint: str | None = None,
+) -> LexicalStage | None:
+    # Uploads and public datasets come with an index built at ingestion (the latter
+    # found by the fingerprint the caller already has); inline corpora are indexed
+    # here, which costs far less than embedding them.
+    if pool <= 0 or (pool >= len(docs) and fusion == "none"):
         return None
-    return {
-        "recall_at_k": metrics.recall_at_k,
-        "mrr": metrics.mrr,
-        "ndcg_at_k": metrics.ndcg_at_k,
-        "latency_ms": metrics.latency_ms,
-        "k": metrics.k,
-        "candidate_k": metrics.candidate_k,
-        "has_labels": metrics.has_labels,
-    }
+    if index is None and fingerprint is not None:
+        index = lexical_indexes.get(fingerprint)
+    if index is None:
+        index = Bm25Index.build(doc.text for doc in docs)
+    return LexicalStage(index=index, pool_size=pool, fusion=fusion)
 
 
-@router.post("", response_model=SearchResponseSchema)
-def search(payload: SearchRequestSchema) -> SearchResponseSchema:
-    docs = [DocumentDTO(doc_id=f"doc-{i+1}", text=text) for i, text in enumerate(payload.documents)]
+def _shortlist_stage(docs: list[DocumentDTO], fingerprint: str) -> ShortlistStage | None:
+    # Only the public datasets have a compressed copy.
+    if CORPUS_PQ_SHORTLIST <= 0 or CORPUS_PQ_SHORTLIST >= len(docs) or not compressed_corpora:
+        return None
+    index = compressed_corpora.get(fingerprint)
+    if index is None:
+        return None
+    return ShortlistStage(index=index, size=CORPUS_PQ_SHORTLIST)
+
+
+def _text_documents(texts: list[str]) -> list[DocumentDTO]:
+    return [DocumentDTO(doc_id=f"doc-{i+1}", text=text) for i, text in enumerate(texts)]
+
+
+def _indexed_corpus(corpus_id: str) -> PreparedCorpus:
+    # The documents carry their stored embeddings; answer sentences, the BM25 index
+    # and the rerank index are prepared once per manifest version, whose fingerprint
+    # is the corpus'.
+    loaded = corpus_index.documentos_versionados(corpus_id)
+    if loaded is None:
+        prepared_corpora.discard(corpus_id)
+        raise HTTPException(status_code=404, detail="Corpus nao encontrado")
+    manifest, docs = loaded
+    service = _build_service()
+    return prepared_corpora.prepare(
+        corpus_id,
+        manifest_fingerprint(manifest),
+        docs,
+        service.preparar_documentos,
+        service.indexar_documentos,
+    )
+
+
+def _request_documents(
+    payload: SearchRequestSchema,
+) -> tuple[list[DocumentDTO], LexicalIndex | None, Any, str | None]:
+    # Inline texts, a corpus uploaded (and prepared) beforehand via /search/uploads,
+    # or an indexed corpus (/corpora). The last two come with their lexical and
+    # rerank indexes, an indexed corpus with its fingerprint as well.
+    if payload.upload_id:
+        docs = upload_store.get(payload.upload_id)
+        if docs is None:
+            raise HTTPException(status_code=404, detail="Upload nao encontrado")
+        return (
+            docs,
+            upload_store.lexical_index(payload.upload_id),
+            upload_store.rerank_index(payload.upload_id),
+            None,
+        )
+    if payload.corpus_id:
+        corpus = _indexed_corpus(payload.corpus_id)
+        return corpus.documents, corpus.lexical_index, corpus.rerank_index, corpus.fingerprint
+    return _text_documents(payload.documents), None, None, None
+
+
+def _fingerprinted_documents(
+    payload: SearchRequestSchema,
+) -> tuple[list[DocumentDTO], LexicalIndex | None, Any, str]:
+    # Runs on the encoder pool: an indexed corpus may have to be read from disk, and
+    # hashing a large corpus would stall the event loop as well.
+    docs, index, rerank_index, fingerprint = _request_documents(payload)
+    return docs, index, rerank_index, fingerprint or corpus_fingerprint(docs)
+
+
+def _search_text(
+    payload: SearchRequestSchema,
+    docs: list[DocumentDTO],
+    pool: int,
+    fingerprint: str,
+    index=None,
+    rerank_index=None,
+):
     service = _build_service()
     dto = SearchRequestDTO(query=payload.query, documents=docs)
+    lexical = _lexical_stage(docs, pool, payload.fusion, index, fingerprint)
 
     if payload.mode == "compare":
-        response = service.comparar_por_texto(
+        return service.comparar_por_texto(
             dto,
             top_k=payload.top_k,
             candidate_k=payload.candidate_k,
+            instrument=payload.instrument,
+            latency_budget_ms=payload.latency_budget_ms,
+            include_answer=payload.include_answer,
+            lexical=lexical,
+            rerank_index=rerank_index,
         )
-    else:
-        response = service.buscar_por_texto(
+    return service.buscar_por_texto(
+        dto,
+        mode=payload.mode,
+        top_k=payload.top_k,
+        candidate_k=payload.candidate_k,
+        instrument=payload.instrument,
+        latency_budget_ms=payload.latency_budget_ms,
+        include_answer=payload.include_answer,
+        lexical=lexical,
+        rerank_index=rerank_index,
+    )
+
+
+def _search_file(
+    dto: SearchFileRequestDTO,
+    mode: str,
+    top_k: int,
+    candidate_k: int,
+    instrument: bool,
+    latency_budget_ms: float | None,
+    include_answer: bool,
+):
+    service = _build_service()
+    if mode == "compare":
+        return service.comparar_por_arquivo(
+            dto,
+            top_k=top_k,
+            candidate_k=candidate_k,
+            instrument=instrument,
+            latency_budget_ms=latency_budget_ms,
+            include_answer=include_answer,
+        )
+    return service.buscar_por_arquivo(
+        dto,
+        mode=mode,
+        top_k=top_k,
+        candidate_k=candidate_k,
+        instrument=instrument,
+        latency_budget_ms=latency_budget_ms,
+        include_answer=include_answer,
+    )
+
+
+def _search_dataset(
+    payload: DatasetSearchRequestSchema,
+    dto: SearchRequestDTO,
+    relevant_doc_ids: list[str],
+    pool: int,
+    fingerprint: str,
+    rerank_index=None,
+):
+    service = _build_service()
+    lexical = _lexical_stage(dto.documents, pool, payload.fusion, fingerprint=fingerprint)
+    shortlist = _shortlist_stage(dto.documents, fingerprint)
+    if payload.mode == "compare":
+        return service.comparar_por_texto(
             dto,
-            mode=payload.mode,
             top_k=payload.top_k,
             candidate_k=payload.candidate_k,
+            relevant_doc_ids=relevant_doc_ids,
+            instrument=payload.instrument,
+            latency_budget_ms=payload.latency_budget_ms,
+            include_answer=payload.include_answer,
+            lexical=lexical,
+            shortlist=shortlist,
+            rerank_index=rerank_index,
         )
+    return service.buscar_por_texto(
+        dto,
+        mode=payload.mode,
+        top_k=payload.top_k,
+        candidate_k=payload.candidate_k,
+        relevant_doc_ids=relevant_doc_ids,
+        instrument=payload.instrument,
+        latency_budget_ms=payload.latency_budget_ms,
+        include_answer=payload.include_answer,
+        lexical=lexical,
+        shortlist=shortlist,
+        rerank_index=rerank_index,
+    )
+
 
-    return _to_response_schema(response)
+def _search_batch(
+    payload: BatchSearchRequestSchema,
+    dto: BatchSearchRequestDTO,
+    relevant_doc_ids: list[list[str] | None],
+    pool: int,
+    index=None,
+    rerank_index=None,
+):
+    return _build_service().buscar_em_lote(
+        dto,
+        mode=payload.mode,
+        top_k=payload.top_k,
+        candidate_k=payload.candidate_k,
+        relevant_doc_ids=relevant_doc_ids,
+        lexical=_lexical_stage(dto.documents, pool, payload.fusion, index),
+        rerank_index=rerank_index,
+    )
+
+
+def _extract_documents(filename: str, content: bytes) -> list[DocumentDTO]:
+    return BuscarPorArquivoUseCase(PdfTxtDocumentTextExtractor()).execute(filename, content)
+
+
+def _ingest_upload(
+    filename: str, content: bytes
+) -> tuple[list[DocumentDTO], Bm25Index | None, Any]:
+    # Uploaded corpora are searched repeatedly, so answer sentences are embedded and
+    # the BM25 and rerank indexes are built once here.
+    docs = _extract_documents(filename, content)
+    if not docs:
+        return docs, None, None
+    service = _build_service()
+    docs, rerank_index = service.indexar_documentos(service.preparar_documentos(docs))
+    return docs, Bm25Index.build(doc.text for doc in docs), rerank_index
+
+
+def _batch_corpus(payload: BatchSearchRequestSchema):
+    # Resolves the corpus, its lexical and rerank indexes when they were built
+    # beforehand and the labelled/free queries of a batch request.
+    sources = [
+        payload.documents is not None,
+        bool(payload.upload_id),
+        bool(payload.corpus_id),
+        bool(payload.dataset_id),
+    ]
+    if sum(sources) != 1:
+        raise HTTPException(
+            status_code=400,
+            detail="Informe exatamente uma fonte de documentos: documents, upload_id, "
+            "corpus_id ou dataset_id",
+        )
+
+    queries = list(payload.queries)
+    query_ids: list[str | None] = [None] * len(queries)
+    relevant: list[list[str] | None] = [None] * len(queries)
+    index = rerank_index = None
+
+    if payload.documents is not None:
+        docs = [
+            DocumentDTO(doc_id=f"doc-{i+1}", text=text) for i, text in enumerate(payload.documents)
+        ]
+    elif payload.upload_id:
+        docs = upload_store.get(payload.upload_id)
+        if docs is None:
+            raise HTTPException(status_code=404, detail="Upload nao encontrado")
+        index = upload_store.lexical_index(payload.upload_id)
+        rerank_index = upload_store.rerank_index(payload.upload_id)
+    elif payload.corpus_id:
+        corpus = _indexed_corpus(payload.corpus_id)
+        docs, index, rerank_index = corpus.documents, corpus.lexical_index, corpus.rerank_index
+    else:
+        repository = PublicDatasetRepository()
+        dataset = repository.get_dataset(payload.dataset_id)
+        corpus = dataset_corpora.load(repository, payload.dataset_id)
+        if not dataset or corpus is None:
+            raise HTTPException(status_code=404, detail="Dataset nao encontrado")
+        docs, index = corpus.documents, lexical_indexes.get(corpus.fingerprint)
+        rerank_index = corpus.rerank_index
+        labelled = []
+        if payload.query_ids:
+            for query_id in payload.query_ids:
+                query_info = repository.get_query(payload.dataset_id, query_id)
+                if not query_info:
+                    raise HTTPException(status_code=404, detail="Query nao encontrada")
+                labelled.append(query_info)
+        elif not queries:
+            labelled = dataset.get("queries", [])
+        queries = [item["query"] for item in labelled] + queries
+        query_ids = [item.get("query_id") for item in labelled] + query_ids
+        relevant = [item.get("relevant_doc_ids", []) for item in labelled] + relevant
+
+    if not queries:
+        raise HTTPException(status_code=400, detail="Nenhuma query informada")
+    if len(queries) > SEARCH_BATCH_MAX_QUERIES:
+        raise HTTPException(status_code=400, detail="Limite de queries por lote excedido")
+    dto = BatchSearchRequestDTO(queries=queries, documents=docs)
+    return dto, query_ids, relevant, index, rerank_index
+
+
+def _stream_text(payload: SearchRequestSchema, pool: int):
+    docs, index, rerank_index, _ = _request_documents(payload)
+    return _build_service().buscar_em_etapas(
+        SearchRequestDTO(query=payload.query, documents=docs),
+        mode=payload.mode,
+        top_k=payload.top_k,
+        candidate_k=payload.candidate_k,
+        instrument=payload.instrument,
+        latency_budget_ms=payload.latency_budget_ms,
+        include_answer=payload.include_answer,
+        lexical=_lexical_stage(docs, pool, payload.fusion, index),
+        rerank_index=rerank_index,
+    )
+
+
+def _stream_file(
+    dto: SearchFileRequestDTO,
+    mode: str,
+    top_k: int,
+    candidate_k: int,
+    instrument: bool,
+    latency_budget_ms: float | None,
+    include_answer: bool,
+):
+    return _build_service().buscar_por_arquivo_em_etapas(
+        dto,
+        mode=mode,
+        top_k=top_k,
+        candidate_k=candidate_k,
+        instrument=instrument,
+        latency_budget_ms=latency_budget_ms,
+        include_answer=include_answer,
+    )
+
+
+def _open_stream(factory, *args):
+    events = factory(*args)
+    return events, next(events, None)
+
+
+def _encode_event(event, timings: dict | None, sse: bool) -> str:
+    body = serialization.encode_event(event, timings)
+    if sse:
+        return f"event: {event.event}\ndata: {body}\n\n"
+    return body + "\n"
+
+
+async def _stream(request: Request, start: float, route: str, mode: str, factory, *args):
+    # The first step (extraction, encoding and the first ranking) goes through
+    # admission control before any byte is sent, so saturation is still a 503.
+    # Remaining steps belong to an admitted request: they run one at a time and wait
+    # for a slot (off the event loop). Only a wait that times out ends the stream with
+    # an "error" event. A disconnected client stops the generator before the quantum
+    # rerank starts.
+    sse = "text/event-stream" in request.headers.get("accept", "")
+    events, first = await _offload(_open_stream, factory, *args)
+
+    async def body():
+        event = first
+        pending = None
+        try:
+            while event is not None:
+                timings = None
+                if event.event == "done":
+                    timings = dict(event.timings)
+                    timings["total"] = (time.perf_counter() - start) * 1000
+                    stage_latencies.record(timings)
+                    search_requests_total.labels(route, mode).inc()
+                    search_duration_seconds.labels(route, mode).observe(
+                        time.perf_counter() - start
+                    )
+                yield _encode_event(event, timings, sse)
+                if await request.is_disconnected():
+                    break
+                try:
+                    pending = await asyncio.to_thread(
+                        encoder_executor.submit_waiting, next, events, None
+                    )
+                    event = await asyncio.wrap_future(pending)
+                except ExecutorSaturated:
+                    yield _encode_event(
+                        SearchEventDTO(event="error", detail="Servidor ocupado, tente novamente"),
+                        None,
+                        sse,
+                    )
+                    break
+                pending = None
+        finally:
+            if pending is not None and not pending.done():
+                # The generator is still running on a worker; close it afterwards.
+                pending.add_done_callback(lambda _: events.close())
+            else:
+                events.close()
+
+    media_type = "text/event-stream" if sse else "application/x-ndjson"
+    return StreamingResponse(body(), media_type=media_type)
+
+
+@router.post("", response_model=SearchResponseSchema)
+async def search(
+    payload: SearchRequestSchema,
+    db: Session = Depends(get_db),
+    current_user: Principal | None = Depends(get_optional_principal),
+) -> Response:
+    start = time.perf_counter()
+    _check_budget(payload.latency_budget_ms)
+    pool = _check_lexical(payload.lexical_pool, payload.fusion)
+    docs, index, rerank_index, fingerprint = await _offload(_fingerprinted_documents, payload)
+    record = await _run_recorder(
+        db,
+        current_user,
+        payload.conversation_id,
+        "/search",
+        fingerprint,
+        top_k=payload.top_k,
+        candidate_k=payload.candidate_k,
+        instrument=payload.instrument,
+        latency_budget_ms=payload.latency_budget_ms,
+        include_answer=payload.include_answer,
+        lexical_pool=pool,
+        fusion=payload.fusion,
+        upload_id=payload.upload_id,
+        corpus_id=payload.corpus_id,
+    )
+    key = _cache_key(
+        payload.query,
+        fingerprint,
+        payload.mode,
+        payload.top_k,
+        payload.candidate_k,
+        payload.instrument,
+        payload.latency_budget_ms,
+        payload.include_answer,
+        lexical_pool=pool,
+        fusion=payload.fusion,
+    )
+    response = await _cached_search(
+        key, _search_text, payload, docs, pool, fingerprint, index, rerank_index
+    )
+    return await _finish(response, start, "/search", record=record)
 
 
 @router.post("/file", response_model=SearchResponseSchema)
-def search_file(
+async def search_file(
     query: str = Form(""),
     file: UploadFile | None = File(None),
     mode: str = Form("classical"),
     top_k: int = Form(5),
     candidate_k: int = Form(20),
-) -> SearchResponseSchema:
+    instrument: bool = Form(False),
+    latency_budget_ms: float | None = Form(None),
+    include_answer: bool = Form(True),
+    conversation_id: int | None = Form(None),
+    db: Session = Depends(get_db),
+    current_user: Principal | None = Depends(get_optional_principal),
+) -> Response:
+    start = time.perf_counter()
+    _check_budget(latency_budget_ms)
     if file is None:
         raise HTTPException(status_code=400, detail="Arquivo nao enviado")
     if not query or not query.strip():
         query = "Resumo do documento"
-    content = file.file.read()
-    service = _build_service()
+    content = await file.read()
     dto = SearchFileRequestDTO(query=query, filename=file.filename or "", content=content)
+    fingerprint = content_fingerprint(dto.filename, content)
+    record = await _run_recorder(
+        db,
+        current_user,
+        conversation_id,
+        "/search/file",
+        fingerprint,
+        top_k=top_k,
+        candidate_k=candidate_k,
+        instrument=instrument,
+        latency_budget_ms=latency_budget_ms,
+        include_answer=include_answer,
+        filename=dto.filename,
+    )
 
-    if mode == "compare":
-        response = service.comparar_por_arquivo(dto, top_k=top_k, candidate_k=candidate_k)
-    else:
-        response = service.buscar_por_arquivo(
-            dto,
-            mode=mode,
-            top_k=top_k,
-            candidate_k=candidate_k,
-        )
+    key = _cache_key(
+        query,
+        fingerprint,
+        mode,
+        top_k,
+        candidate_k,
+        instrument,
+        latency_budget_ms,
+        include_answer,
+    )
+    response = await _cached_search(
+        key,
+        _search_file,
+        dto,
+        mode,
+        top_k,
+        candidate_k,
+        instrument,
+        latency_budget_ms,
+        include_answer,
+    )
+    return await _finish(response, start, "/search/file", record=record)
 
-    return _to_response_schema(response)
+
+@router.post("/stream")
+async def search_stream(payload: SearchRequestSchema, request: Request) -> StreamingResponse:
+    start = time.perf_counter()
+    _check_budget(payload.latency_budget_ms)
+    pool = _check_lexical(payload.lexical_pool, payload.fusion)
+    return await _stream(
+        request,
+        start,
+        "/search/stream",
+        payload.mode,
+        _stream_text,
+        payload,
+        pool,
+    )
+
+
+@router.post("/file/stream")
+async def search_file_stream(
+    request: Request,
+    query: str = Form(""),
+    file: UploadFile | None = File(None),
+    mode: str = Form("compare"),
+    top_k: int = Form(5),
+    candidate_k: int = Form(20),
+    instrument: bool = Form(False),
+    latency_budget_ms: float | None = Form(None),
+    include_answer: bool = Form(True),
+) -> StreamingResponse:
+    start = time.perf_counter()
+    _check_budget(latency_budget_ms)
+    if file is None:
+        raise HTTPException(status_code=400, detail="Arquivo nao enviado")
+    if not query or not query.strip():
+        query = "Resumo do documento"
+    content = await file.read()
+    dto = SearchFileRequestDTO(query=query, filename=file.filename or "", content=content)
+
+    return await _stream(
+        request,
+        start,
+        "/search/file/stream",
+        mode,
+        _stream_file,
+        dto,
+        mode,
+        top_k,
+        candidate_k,
+        instrument,
+        latency_budget_ms,
+        include_answer,
+    )
 
 
 @router.post("/dataset", response_model=SearchResponseSchema)
-def search_dataset(payload: DatasetSearchRequestSchema) -> SearchResponseSchema:
+async def search_dataset(
+    payload: DatasetSearchRequestSchema,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Principal | None = Depends(get_optional_principal),
+) -> Response:
+    start = time.perf_counter()
+    _check_budget(payload.latency_budget_ms)
+    pool = _check_lexical(payload.lexical_pool, payload.fusion)
     repository = PublicDatasetRepository()
-    dataset = repository.get_dataset(payload.dataset_id)
-    if not dataset:
+    # Documents and fingerprint come from preload; a dataset missed there is loaded
+    # and hashed once, off the event loop.
+    corpus = dataset_corpora.get(payload.dataset_id) or await _offload(
+        dataset_corpora.load, repository, payload.dataset_id
+    )
+    if corpus is None:
         raise HTTPException(status_code=404, detail="Dataset nao encontrado")
 
     query_info = repository.get_query(payload.dataset_id, payload.query_id)
     if not query_info:
         raise HTTPException(status_code=404, detail="Query nao encontrada")
 
-    docs = [
-        DocumentDTO(doc_id=item["doc_id"], text=item["text"])
-        for item in dataset.get("documents", [])
-    ]
-    dto = SearchRequestDTO(query=query_info["query"], documents=docs)
-
+    dto = SearchRequestDTO(query=query_info["query"], documents=corpus.documents)
     relevant_doc_ids = query_info.get("relevant_doc_ids", [])
-    service = _build_service()
+    fingerprint = corpus.fingerprint
+    record = await _run_recorder(
+        db,
+        current_user,
+        payload.conversation_id,
+        "/search/dataset",
+        fingerprint,
+        top_k=payload.top_k,
+        candidate_k=payload.candidate_k,
+        instrument=payload.instrument,
+        latency_budget_ms=payload.latency_budget_ms,
+        include_answer=payload.include_answer,
+        lexical_pool=pool,
+        fusion=payload.fusion,
+        dataset_id=payload.dataset_id,
+        query_id=payload.query_id,
+    )
 
-    if payload.mode == "compare":
-        response = service.comparar_por_texto(
-            dto,
-            top_k=payload.top_k,
-            candidate_k=payload.candidate_k,
-            relevant_doc_ids=relevant_doc_ids,
-        )
-    else:
-        response = service.buscar_por_texto(
-            dto,
-            mode=payload.mode,
-            top_k=payload.top_k,
-            candidate_k=payload.candidate_k,
-            relevant_doc_ids=relevant_doc_ids,
-        )
+    key = _cache_key(
+        dto.query,
+        fingerprint,
+        payload.mode,
+        payload.top_k,
+        payload.candidate_k,
+        payload.instrument,
+        payload.latency_budget_ms,
+        payload.include_answer,
+        relevant_doc_ids,
+        lexical_pool=pool,
+        fusion=payload.fusion,
+    )
+    # Dataset searches are fully determined by their ids, so the cache key doubles
+    # as a (weak) validator and a matching If-None-Match skips the search entirely,
+    # unless the search has to be recorded in a conversation.
+    etag = f'W/"{key}"'
+    if record is None and _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    response = await _cached_search(
+        key, _search_dataset, payload, dto, relevant_doc_ids, pool, fingerprint, corpus.rerank_index
+    )
+    # A budget-truncated response is not cached, so it gets no validator either.
+    headers = None if _budget_truncated(response) else {"ETag": etag}
+    return await _finish(response, start, "/search/dataset", headers=headers, record=record)
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    # If-None-Match uses weak comparison, so W/"x" and "x" are the same tag.
+    return "*" in tags or etag.removeprefix("W/") in [tag.removeprefix("W/") for tag in tags]
 
-    return _to_response_schema(response)
 
+@router.post("/uploads", response_model=UploadOut)
+async def upload_documents(file: UploadFile | None = File(None)) -> UploadOut:
+    if file is None:
+        raise HTTPException(status_code=400, detail="Arquivo nao enviado")
+    content = await file.read()
+    docs, index, rerank_index = await _offload(_ingest_upload, file.filename or "", content)
+    if not docs:
+        raise HTTPException(status_code=400, detail="Nenhum texto extraido do arquivo")
+    upload_id = upload_store.put(docs, index, rerank_index)
+    return UploadOut(upload_id=upload_id, documents=len(docs))
+
+
+@router.post("/batch", response_model=BatchSearchResponseSchema)
+async def search_batch(payload: BatchSearchRequestSchema) -> Response:
+    start = time.perf_counter()
+    pool = _check_lexical(payload.lexical_pool, payload.fusion)
+    dto, query_ids, relevant_doc_ids, index, rerank_index = await _offload(_batch_corpus, payload)
+    response = await _offload(
+        _search_batch, payload, dto, relevant_doc_ids, pool, index, rerank_index
+    )
+
+    timings = dict(response.timings)
+    elapsed = time.perf_counter() - start
+    timings["total"] = elapsed * 1000
+    search_requests_total.labels("/search/batch", response.mode).inc()
+    search_duration_seconds.labels("/search/batch", response.mode).observe(elapsed)
+    return _json_response(serialization.encode_batch(response, query_ids, timings))
+
+
+@router.get("/timings", response_model=dict[str, StageLatencyOut])
+def search_timings() -> dict[str, StageLatencyOut]:
+    return {
+        stage: StageLatencyOut(**stats)
+        for stage, stats in stage_latencies.percentiles().items()
+    }
@@ -0,0 +1,139 @@
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Search responses are written straight from the DTOs into JSON text, in one pass.
+# The pydantic schemas in schemas.py still document the shape (response_model) but
+# are not instantiated for every result.
+
+Fields = List[Tuple[str, str]]
+
+_dumps = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def encode_object(fields: Iterable[Tuple[str, str]]) -> str:
+    # fields are (name, already encoded JSON value) pairs.
+    return "{" + ",".join(f"{_dumps(name)}:{value}" for name, value in fields) + "}"
+
+
+def encode_results(results) -> str:
+    return (
+        "["
+        + ",".join(
+            f'{{"doc_id":{_dumps(item.doc_id)},"text":{_dumps(item.text)},'
+            f'"score":{_dumps(float(item.score))}}}'
+            for item in results
+        )
+        + "]"
+    )
+
+
+def _quantum_metrics(quantum) -> Optional[dict]:
+    if quantum is None:
+        return None
+    return {
+        "prefilter_ms": quantum.prefilter_ms,
+        "rerank_ms": quantum.rerank_ms,
+        "simulator_ms": quantum.simulator_ms,
+        "python_overhead_ms": quantum.python_overhead_ms,
+        "circuit_executions": quantum.circuit_executions,
+        "qubits": quantum.qubits,
+        "circuit_depth": quantum.circuit_depth,
+        "gate_counts": quantum.gate_counts,
+        "effective_candidate_k": quantum.effective_candidate_k,
+        "budget_truncated": quantum.budget_truncated,
+    }
+
+
+def encode_metrics(metrics) -> str:
+    if metrics is None:
+        return "null"
+    return _dumps(
+        {
+            "recall_at_k": metrics.recall_at_k,
+            "mrr": metrics.mrr,
+            "ndcg_at_k": metrics.ndcg_at_k,
+            "latency_ms": metrics.latency_ms,
+            "k": metrics.k,
+            "candidate_k": metrics.candidate_k,
+            "has_labels": metrics.has_labels,
+            "quantum": _quantum_metrics(metrics.quantum),
+            "cached": metrics.cached,
+            "effective_candidate_k": metrics.effective_candidate_k,
+            "budget_truncated": metrics.budget_truncated,
+        }
+    )
+
+
+def lite_fields(response) -> Fields:
+    return [
+        ("results", encode_results(response.results)),
+        ("answer", _dumps(response.answer)),
+        ("metrics", encode_metrics(response.metrics)),
+    ]
+
+
+def _comparison(response) -> str:
+    if response.comparison is None:
+        return "null"
+    return encode_object(
+        [
+            ("classical", encode_object(lite_fields(response.comparison.classical))),
+            ("quantum", encode_object(lite_fields(response.comparison.quantum))),
+        ]
+    )
+
+
+def response_fields(response) -> Fields:
+    # Everything but timings, which the caller completes after measuring this step.
+    return [
+        ("query", _dumps(response.query)),
+        ("mode", _dumps(response.mode)),
+        ("results", encode_results(response.results)),
+        ("answer", _dumps(response.answer)),
+        ("metrics", encode_metrics(response.metrics)),
+        ("comparison", _comparison(response)),
+    ]
+
+
+def encode_batch_item(query_id: Optional[str], response) -> str:
+    return encode_object(
+        [
+            ("query", _dumps(response.query)),
+            ("query_id", _dumps(query_id)),
+            ("results", encode_results(response.results)),
+            ("metrics", encode_metrics(response.metrics)),
+            ("comparison", _comparison(response)),
+        ]
+    )
+
+
+def encode_batch(response, query_ids: Iterable[Optional[str]], timings: Dict[str, float]) -> str:
+    items = ",".join(
+        encode_batch_item(query_id, item) for query_id, item in zip(query_ids, response.responses)
+    )
+    return encode_object(
+        [
+            ("mode", _dumps(response.mode)),
+            ("results", f"[{items}]"),
+            ("timings", encode_timings(timings)),
+        ]
+    )
+
+
+def encode_timings(timings: Dict[str, float]) -> str:
+    return _dumps(timings)
+
+
+def encode_event(event, timings: Optional[Dict[str, float]] = None) -> str:
+    fields = [("event", _dumps(event.event))]
+    if event.mode is not None:
+        fields.append(("mode", _dumps(event.mode)))
+    if event.response is not None:
+        fields.extend(lite_fields(event.response))
+    if event.event == "answer":
+        fields.append(("answer", _dumps(event.answer)))
+    if event.event == "done":
+        fields.append(("timings", encode_timings(timings or {})))
+    if event.event == "error":
+        fields.append(("detail", _dumps(event.detail)))
+    return encode_object(fields)
@@ -0,0 +1,67 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+from application.dtos import DocumentDTO
+from application.interfaces import LexicalIndex
+
+SEARCH_UPLOAD_MAX_ENTRIES = int(os.getenv("SEARCH_UPLOAD_MAX_ENTRIES", "32"))
+SEARCH_UPLOAD_TTL_SECONDS = int(os.getenv("SEARCH_UPLOAD_TTL_SECONDS", "3600"))
+
+# (stored at, documents, lexical index, rerank index)
+_Entry = Tuple[float, List[DocumentDTO], Optional[LexicalIndex], Any]
+
+
+class UploadStore:
+    # In-memory corpora extracted from uploaded files, referenced by handle from
+    # batch searches, each with the lexical and rerank indexes built at ingestion.
+    # Least recently used entries are evicted past max_entries.
+
+    def __init__(self, max_entries: int, ttl_seconds: int) -> None:
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(
+        self,
+        documents: List[DocumentDTO],
+        lexical_index: Optional[LexicalIndex] = None,
+        rerank_index: Any = None,
+    ) -> str:
+        upload_id = uuid.uuid4().hex
+        entry = (time.monotonic(), list(documents), lexical_index, rerank_index)
+        with self._lock:
+            self._entries[upload_id] = entry
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return upload_id
+
+    def get(self, upload_id: str) -> Optional[List[DocumentDTO]]:
+        entry = self._entry(upload_id)
+        return entry[1] if entry is not None else None
+
+    def lexical_index(self, upload_id: str) -> Optional[LexicalIndex]:
+        entry = self._entry(upload_id)
+        return entry[2] if entry is not None else None
+
+    def rerank_index(self, upload_id: str) -> Any:
+        entry = self._entry(upload_id)
+        return entry[3] if entry is not None else None
+
+    def _entry(self, upload_id: str) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(upload_id)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self._ttl_seconds:
+                del self._entries[upload_id]
+                return None
+            self._entries.move_to_end(upload_id)
+            return entry
+
+
+upload_store = UploadStore(SEARCH_UPLOAD_MAX_ENTRIES, SEARCH_UPLOAD_TTL_SECONDS)
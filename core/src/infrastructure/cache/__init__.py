@@ -0,0 +1,3 @@
+from .lru_ttl_cache import LruTtlCache, LruTtlResultCache
+
+__all__ = ["LruTtlCache", "LruTtlResultCache"]
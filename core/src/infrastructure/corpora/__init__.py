@@ -0,0 +1,11 @@
+from .segment_store import FileCorpusSegmentStore
+from .corpus_index import corpus_index
+from .prepared_corpus_store import PreparedCorpus, PreparedCorpusStore, prepared_corpora
+
+__all__ = [
+    "FileCorpusSegmentStore",
+    "PreparedCorpus",
+    "PreparedCorpusStore",
+    "corpus_index",
+    "prepared_corpora",
+]
@@ -0,0 +1,32 @@
+import os
+from pathlib import Path
+
+from application.interfaces import Embedder
+from application.services import CorpusIndexService
+from infrastructure.corpora.segment_store import FileCorpusSegmentStore
+from infrastructure.embeddings import DEFAULT_MODEL_NAME, LocalEmbedder
+from infrastructure.observability import InstrumentedEmbedder
+
+# Directory of the indexed corpora (segments and manifests), shared by all workers.
+CORPUS_DIR = os.getenv("CORPUS_DIR", "") or str(
+    Path(__file__).resolve().parents[3] / "data" / "corpora"
+)
+# Compaction thresholds: share of tombstoned rows and number of segments per corpus.
+CORPUS_COMPACT_RATIO = float(os.getenv("CORPUS_COMPACT_RATIO", "0.3"))
+CORPUS_MAX_SEGMENTS = int(os.getenv("CORPUS_MAX_SEGMENTS", "8"))
+
+
+class _ModelEmbedder(Embedder):
+    # LocalEmbedder loads the model when built; this defers that to the first write
+    # (models are cached, so later calls reuse the loaded one).
+    def embed_texts(self, texts):
+        return LocalEmbedder().embed_texts(texts)
+
+
+corpus_index = CorpusIndexService(
+    InstrumentedEmbedder(_ModelEmbedder()),
+    FileCorpusSegmentStore(Path(CORPUS_DIR)),
+    DEFAULT_MODEL_NAME,
+    CORPUS_COMPACT_RATIO,
+    CORPUS_MAX_SEGMENTS,
+)
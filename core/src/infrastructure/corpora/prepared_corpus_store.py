@@ -0,0 +1,70 @@
+import threading
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from application.dtos import DocumentDTO
+from application.interfaces import LexicalIndex
+from infrastructure.retrieval import Bm25Index
+
+
+@dataclass(frozen=True)
+class PreparedCorpus:
+    fingerprint: str
+    documents: List[DocumentDTO]
+    lexical_index: LexicalIndex
+    rerank_index: Any = None
+
+
+class PreparedCorpusStore:
+    # Search view of each indexed corpus at one manifest version, by corpus id: the
+    # documents with their answer sentences embedded, the BM25 index and the quantum
+    # comparator's rerank index. A new version replaces the entry; documents whose text
+    # did not change keep the sentences prepared for the previous one, so only new
+    # texts are embedded.
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, PreparedCorpus] = {}
+        self._lock = threading.Lock()
+
+    def get(self, corpus_id: str, fingerprint: str) -> Optional[PreparedCorpus]:
+        entry = self._entries.get(corpus_id)
+        return entry if entry is not None and entry.fingerprint == fingerprint else None
+
+    def prepare(
+        self,
+        corpus_id: str,
+        fingerprint: str,
+        documents: List[DocumentDTO],
+        prepare: Callable[[List[DocumentDTO]], List[DocumentDTO]],
+        index: Optional[Callable[[List[DocumentDTO]], Tuple[List[DocumentDTO], Any]]] = None,
+    ) -> PreparedCorpus:
+        previous = self._entries.get(corpus_id)
+        if previous is not None and previous.fingerprint == fingerprint:
+            return previous
+        known = {(doc.doc_id, doc.text): doc for doc in previous.documents} if previous else {}
+        missing = [doc for doc in documents if (doc.doc_id, doc.text) not in known]
+        if missing:
+            for doc, item in zip(missing, prepare(missing)):
+                known[(doc.doc_id, doc.text)] = item
+        prepared = []
+        for doc in documents:
+            # The stored embedding comes from this version's document.
+            item = known[(doc.doc_id, doc.text)]
+            prepared.append(
+                replace(doc, sentences=item.sentences, sentence_embeddings=item.sentence_embeddings)
+            )
+        rerank_index = None
+        if index is not None:
+            prepared, rerank_index = index(prepared)
+        lexical_index = Bm25Index.build(doc.text for doc in prepared)
+        entry = PreparedCorpus(fingerprint, prepared, lexical_index, rerank_index)
+        with self._lock:
+            self._entries[corpus_id] = entry
+        return entry
+
+    def discard(self, corpus_id: str) -> None:
+        with self._lock:
+            self._entries.pop(corpus_id, None)
+
+
+prepared_corpora = PreparedCorpusStore()
@@ -0,0 +1,96 @@
+import fcntl
+import json
+import os
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
+
+import numpy as np
+
+from application.dtos import CorpusManifestDTO, CorpusSegmentDTO
+from application.interfaces import CorpusSegmentStore
+
+
+class FileCorpusSegmentStore(CorpusSegmentStore):
+    # One directory per corpus with manifest.json and, per segment, <name>.npy (the
+    # embeddings, memory-mapped on read, so a restart loads a corpus without reading
+    # its vectors) and <name>.jsonl (doc_id and text, one document per line).
+
+    def __init__(self, directory: Path) -> None:
+        self._directory = Path(directory)
+
+    def _path(self, corpus_id: str) -> Path:
+        return self._directory / corpus_id
+
+    def read_manifest(self, corpus_id: str) -> Optional[CorpusManifestDTO]:
+        try:
+            data = json.loads((self._path(corpus_id) / "manifest.json").read_text("utf-8"))
+        except FileNotFoundError:
+            return None
+        return CorpusManifestDTO(
+            corpus_id=data["corpus_id"],
+            model=data["model"],
+            version=data["version"],
+            segments=tuple(data["segments"]),
+            deleted={name: tuple(rows) for name, rows in data["deleted"].items()},
+            next_segment=data["next_segment"],
+        )
+
+    def write_manifest(self, manifest: CorpusManifestDTO) -> None:
+        directory = self._path(manifest.corpus_id)
+        directory.mkdir(parents=True, exist_ok=True)
+        data = {
+            "corpus_id": manifest.corpus_id,
+            "model": manifest.model,
+            "version": manifest.version,
+            "segments": list(manifest.segments),
+            "deleted": {name: list(rows) for name, rows in manifest.deleted.items()},
+            "next_segment": manifest.next_segment,
+        }
+        temporary = directory / "manifest.json.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, directory / "manifest.json")
+
+    def read_segment(self, corpus_id: str, name: str) -> CorpusSegmentDTO:
+        directory = self._path(corpus_id)
+        doc_ids, texts = [], []
+        with open(directory / f"{name}.jsonl", encoding="utf-8") as file:
+            for line in file:
+                item = json.loads(line)
+                doc_ids.append(item["doc_id"])
+                texts.append(item["text"])
+        embeddings = np.load(directory / f"{name}.npy", mmap_mode="r")
+        return CorpusSegmentDTO(name=name, doc_ids=doc_ids, texts=texts, embeddings=embeddings)
+
+    def write_segment(self, corpus_id: str, segment: CorpusSegmentDTO) -> None:
+        directory = self._path(corpus_id)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / f"{segment.name}.npy", np.asarray(segment.embeddings, np.float32))
+        with open(directory / f"{segment.name}.jsonl", "w", encoding="utf-8") as file:
+            for doc_id, text in zip(segment.doc_ids, segment.texts):
+                file.write(json.dumps({"doc_id": doc_id, "text": text}, ensure_ascii=False))
+                file.write("\n")
+
+    def delete_segments(self, corpus_id: str, names: Sequence[str]) -> None:
+        directory = self._path(corpus_id)
+        for name in names:
+            (directory / f"{name}.npy").unlink(missing_ok=True)
+            (directory / f"{name}.jsonl").unlink(missing_ok=True)
+
+    def delete_corpus(self, corpus_id: str) -> None:
+        shutil.rmtree(self._path(corpus_id), ignore_errors=True)
+
+    @contextmanager
+    def locked(self, corpus_id: str) -> Iterator[None]:
+        # The lock file lives next to the corpus directory, which delete_corpus removes.
+        self._directory.mkdir(parents=True, exist_ok=True)
+        with open(self._directory / f".{corpus_id}.lock", "a") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
@@ -1,3 +1,10 @@
+from .dataset_corpus_store import DatasetCorpus, DatasetCorpusStore, dataset_corpora
 from .public_dataset_repository import DatasetSummary, PublicDatasetRepository
 
-__all__ = ["DatasetSummary", "PublicDatasetRepository"]
+__all__ = [
+    "DatasetCorpus",
+    "DatasetCorpusStore",
+    "dataset_corpora",
+    "DatasetSummary",
+    "PublicDatasetRepository",
+]
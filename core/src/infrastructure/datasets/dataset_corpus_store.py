@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, replace
+from typing import Any, Callable
+
+from application.dtos import DocumentDTO
+from application.services.search import corpus_fingerprint
+from infrastructure.datasets.public_dataset_repository import PublicDatasetRepository
+
+
+@dataclass(frozen=True)
+class DatasetCorpus:
+    documents: list[DocumentDTO]
+    fingerprint: str
+    rerank_index: Any = None
+
+
+class DatasetCorpusStore:
+    # Public dataset documents, as the search routes use them, and their corpus
+    # fingerprint by dataset id. Filled at preload or on a dataset's first search, so
+    # later searches neither rebuild the documents nor hash the whole corpus again.
+
+    def __init__(self) -> None:
+        self._corpora: dict[str, DatasetCorpus] = {}
+        self._lock = threading.Lock()
+
+    def get(self, dataset_id: str) -> DatasetCorpus | None:
+        return self._corpora.get(dataset_id)
+
+    def load(self, repository: PublicDatasetRepository, dataset_id: str) -> DatasetCorpus | None:
+        corpus = self._corpora.get(dataset_id)
+        if corpus is not None:
+            return corpus
+        dataset = repository.get_dataset(dataset_id)
+        if dataset is None:
+            return None
+        documents = [
+            DocumentDTO(doc_id=item["doc_id"], text=item["text"])
+            for item in dataset.get("documents", [])
+        ]
+        corpus = DatasetCorpus(documents, corpus_fingerprint(documents))
+        with self._lock:
+            return self._corpora.setdefault(dataset_id, corpus)
+
+    def index(self, index: Callable[[list[DocumentDTO]], Any]) -> None:
+        # Adds the quantum comparator's rerank index to every loaded corpus, once the
+        # corpus matrices it is built from exist (preload).
+        with self._lock:
+            loaded = list(self._corpora.items())
+        for dataset_id, corpus in loaded:
+            rerank_index = index(corpus.documents)
+            if rerank_index is not None:
+                with self._lock:
+                    self._corpora[dataset_id] = replace(corpus, rerank_index=rerank_index)
+
+    def build(self, repository: PublicDatasetRepository) -> list[DatasetCorpus]:
+        return [
+            corpus
+            for summary in repository.list_datasets()
+            if (corpus := self.load(repository, summary.dataset_id)) is not None
+        ]
+
+
+dataset_corpora = DatasetCorpusStore()
@@ -1,3 +1,21 @@
-from .local_embedder import LocalEmbedder
+from .corpus_matrix import CorpusCachedEmbedder, CorpusMatrixStore, corpus_matrices
+from .product_quantization import (
+    CompressedCorpusStore,
+    PqVectorStore,
+    ProductQuantizer,
+    compressed_corpora,
+)
+from .local_embedder import DEFAULT_MODEL_NAME, LocalEmbedder, load_model
 
-__all__ = [LocalEmbedder]
+__all__ = [
+    "LocalEmbedder",
+    "DEFAULT_MODEL_NAME",
+    "load_model",
+    "CorpusMatrixStore",
+    "CorpusCachedEmbedder",
+    "corpus_matrices",
+    "ProductQuantizer",
+    "PqVectorStore",
+    "CompressedCorpusStore",
+    "compressed_corpora",
+]
@@ -0,0 +1,85 @@
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+from application.interfaces import Embedder
+
+
+class CorpusMatrixStore:
+    # Embeddings of known corpora (the public datasets) kept as one float32 matrix plus a
+    # text -> row index. Built once, ideally in the master before workers fork, and
+    # optionally memory-mapped from a .npy file so workers share the pages.
+
+    def __init__(self) -> None:
+        self._rows: Dict[str, int] = {}
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return self._matrix
+
+    def build(self, texts: Iterable[str], embedder: Embedder) -> None:
+        unique = list(dict.fromkeys(texts))
+        vectors = embedder.embed_texts(unique) if unique else []
+        self._replace(unique, np.asarray(vectors, dtype=np.float32))
+
+    def save(self, path: Path) -> None:
+        # The matrix goes to path (.npy) and the texts, in row order, next to it (.json).
+        path = Path(path)
+        np.save(path, self._matrix)
+        texts = sorted(self._rows, key=self._rows.get)
+        path.with_suffix(".json").write_text(json.dumps(texts), encoding="utf-8")
+
+    def load(self, path: Path) -> None:
+        path = Path(path)
+        matrix = np.load(path, mmap_mode="r")
+        texts = json.loads(path.with_suffix(".json").read_text(encoding="utf-8"))
+        self._replace(texts, matrix)
+
+    def lookup(self, texts: Sequence[str]) -> List[int]:
+        # Row of each text, or -1 when it is not part of a stored corpus.
+        rows = self._rows
+        return [rows.get(text, -1) for text in texts]
+
+    def _replace(self, texts: List[str], matrix: np.ndarray) -> None:
+        with self._lock:
+            self._rows = {text: index for index, text in enumerate(texts)}
+            self._matrix = matrix
+
+
+class CorpusCachedEmbedder(Embedder):
+    # Serves texts of stored corpora from the shared matrix and embeds only the rest.
+
+    def __init__(self, embedder: Embedder, store: CorpusMatrixStore) -> None:
+        self._embedder = embedder
+        self._store = store
+
+    def embed_texts(self, texts: Iterable[str]) -> List[List[float]]:
+        texts = list(texts)
+        if not len(self._store):
+            return self._embedder.embed_texts(texts)
+        rows = self._store.lookup(texts)
+        missing = [index for index, row in enumerate(rows) if row < 0]
+        if len(missing) == len(texts):
+            return self._embedder.embed_texts(texts)
+
+        vectors: List[List[float]] = [[] for _ in texts]
+        matrix = self._store.matrix
+        for index, row in enumerate(rows):
+            if row >= 0:
+                vectors[index] = matrix[row].tolist()
+        if missing:
+            encoded = self._embedder.embed_texts([texts[index] for index in missing])
+            for index, vector in zip(missing, encoded):
+                vectors[index] = vector
+        return vectors
+
+
+corpus_matrices = CorpusMatrixStore()
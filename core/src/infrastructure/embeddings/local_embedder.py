@@ -1,13 +1,40 @@
-﻿from typing import Iterable, List
-
-from sentence_transformers import SentenceTransformer
+﻿import os
+import threading
+from typing import TYPE_CHECKING, Dict, Iterable, List
 
 from application.interfaces import Embedder
 
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+
+DEFAULT_MODEL_NAME = "all-MiniLM-L6-v2"
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR") or None
+
+# One model per process: loaded on first use, or in the master before forking workers
+# (see infrastructure.api.preload) so every worker shares its pages copy-on-write.
+_models: Dict[str, "SentenceTransformer"] = {}
+_models_lock = threading.Lock()
+
+
+def load_model(model_name: str = DEFAULT_MODEL_NAME) -> "SentenceTransformer":
+    with _models_lock:
+        model = _models.get(model_name)
+        if model is None:
+            # torch and sentence-transformers are imported here rather than at module
+            # import, so processes that never encode start without them.
+            from sentence_transformers import SentenceTransformer
+
+            model = _models[model_name] = SentenceTransformer(
+                model_name, cache_folder=MODEL_CACHE_DIR
+            )
+        return model
+
 
 class LocalEmbedder(Embedder):
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2") -> None:
-        self._model = SentenceTransformer(model_name)
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME) -> None:
+        self.model_name = model_name
+        self._model = load_model(model_name)
 
     def embed_texts(self, texts: Iterable[str]) -> List[List[float]]:
         embeddings = self._model.encode(list(texts), normalize_embeddings=True)
@@ -0,0 +1,290 @@
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from application.dtos import DocumentDTO
+from application.interfaces import VectorIndex
+from application.services.search import corpus_fingerprint
+from infrastructure.embeddings.corpus_matrix import CorpusMatrixStore
+
+PQ_CENTROIDS = 256
+PQ_ITERATIONS = 20
+# Rows encoded (or scored against the centroids) per step, to bound temporary memory.
+PQ_CHUNK_ROWS = 65536
+
+
+def _unit(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def _nearest(points: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    # ||p - c||^2 without the ||p||^2 term, which is the same for every centroid.
+    squared = (centroids * centroids).sum(axis=1)
+    return np.argmin(squared - 2 * points @ centroids.T, axis=1)
+
+
+def _kmeans(
+    points: np.ndarray, count: int, iterations: int, rng: np.random.Generator
+) -> np.ndarray:
+    centroids = points[rng.choice(len(points), count, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = _nearest(points, centroids)
+        sizes = np.bincount(assignment, minlength=count)
+        filled = sizes > 0
+        for column in range(points.shape[1]):
+            sums = np.bincount(assignment, weights=points[:, column], minlength=count)
+            # A centroid that lost all its points keeps its place.
+            centroids[filled, column] = sums[filled] / sizes[filled]
+    return centroids
+
+
+class ProductQuantizer:
+    # Splits vectors into `subspaces` equal slices and replaces each slice by the
+    # nearest of up to 256 centroids learnt for that slice, so a vector becomes one
+    # byte per subspace. codebooks has shape (subspaces, centroids, dim / subspaces).
+
+    def __init__(self, codebooks: np.ndarray) -> None:
+        self._codebooks = np.asarray(codebooks, dtype=np.float32)
+
+    @property
+    def codebooks(self) -> np.ndarray:
+        return self._codebooks
+
+    @property
+    def subspaces(self) -> int:
+        return self._codebooks.shape[0]
+
+    @property
+    def dim(self) -> int:
+        return self._codebooks.shape[0] * self._codebooks.shape[2]
+
+    @classmethod
+    def train(
+        cls,
+        sample: np.ndarray,
+        subspaces: int,
+        centroids: int = PQ_CENTROIDS,
+        iterations: int = PQ_ITERATIONS,
+        seed: int = 0,
+    ) -> "ProductQuantizer":
+        sample = np.asarray(sample, dtype=np.float32)
+        if sample.ndim != 2 or not len(sample):
+            raise ValueError("Training sample must be a non-empty matrix")
+        if sample.shape[1] % subspaces:
+            raise ValueError("Vector dimension must be a multiple of subspaces")
+        if not 0 < centroids <= 256:
+            raise ValueError("Centroids must be between 1 and 256")
+        count = min(centroids, len(sample))
+        width = sample.shape[1] // subspaces
+        rng = np.random.default_rng(seed)
+        codebooks = np.stack(
+            [
+                _kmeans(sample[:, index * width : (index + 1) * width], count, iterations, rng)
+                for index in range(subspaces)
+            ]
+        )
+        return cls(codebooks)
+
+    def _slices(self, vectors: np.ndarray) -> List[np.ndarray]:
+        width = self._codebooks.shape[2]
+        return [vectors[:, index * width : (index + 1) * width] for index in range(self.subspaces)]
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        codes = np.empty((len(vectors), self.subspaces), dtype=np.uint8)
+        for start in range(0, len(vectors), PQ_CHUNK_ROWS):
+            chunk = vectors[start : start + PQ_CHUNK_ROWS]
+            for index, part in enumerate(self._slices(chunk)):
+                codes[start : start + len(chunk), index] = _nearest(part, self._codebooks[index])
+        return codes
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        parts = [self._codebooks[index][codes[:, index]] for index in range(self.subspaces)]
+        return np.concatenate(parts, axis=1)
+
+    def tables(self, query_vector: Sequence[float]) -> np.ndarray:
+        # Asymmetric distance computation: the inner product of the (unquantized)
+        # query slice with every centroid of its subspace, shape (subspaces, centroids).
+        # A code's approximate inner product is then a sum of table lookups.
+        query = np.asarray(query_vector, dtype=np.float32).reshape(1, self.dim)
+        return np.stack(
+            [
+                self._codebooks[index] @ part[0]
+                for index, part in enumerate(self._slices(query))
+            ]
+        )
+
+
+class PqVectorStore(VectorIndex):
+    # Unit-normalized vectors kept only as product-quantized codes plus their int64
+    # ids. Codes are stored subspace-major, shape (subspaces, vectors), so each table
+    # lookup of a search reads one contiguous uint8 row. search ranks every code by
+    # approximate cosine through per-query lookup tables; callers re-score the
+    # shortlist exactly. Codes and ids are saved as .npy and memory-mapped on load.
+
+    def __init__(
+        self,
+        quantizer: ProductQuantizer,
+        codes: Optional[np.ndarray] = None,
+        ids: Optional[np.ndarray] = None,
+    ) -> None:
+        self._quantizer = quantizer
+        self._codes = (
+            codes if codes is not None else np.zeros((quantizer.subspaces, 0), dtype=np.uint8)
+        )
+        self._ids = ids if ids is not None else np.zeros(0, dtype=np.int64)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def train(
+        cls,
+        sample: np.ndarray,
+        subspaces: int,
+        centroids: int = PQ_CENTROIDS,
+        iterations: int = PQ_ITERATIONS,
+        seed: int = 0,
+    ) -> "PqVectorStore":
+        return cls(ProductQuantizer.train(_unit(sample), subspaces, centroids, iterations, seed))
+
+    @property
+    def quantizer(self) -> ProductQuantizer:
+        return self._quantizer
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._ids
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            codes, ids = self._codes, self._ids
+        return codes.nbytes + ids.nbytes + self._quantizer.codebooks.nbytes
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, vectors: np.ndarray, ids: Optional[Sequence[int]] = None) -> np.ndarray:
+        # Ids default to the next positions after the current largest id.
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self._quantizer.dim)
+        if ids is not None:
+            ids = np.asarray(ids, dtype=np.int64)
+            if len(ids) != len(vectors):
+                raise ValueError("Ids and vectors must have the same length")
+        codes = self._quantizer.encode(_unit(vectors)).T
+        with self._lock:
+            if ids is None:
+                first = int(self._ids.max()) + 1 if len(self._ids) else 0
+                ids = np.arange(first, first + len(vectors), dtype=np.int64)
+            # Appending copies memory-mapped arrays into memory.
+            self._codes = np.ascontiguousarray(np.concatenate([self._codes, codes], axis=1))
+            self._ids = np.concatenate([self._ids, ids])
+        return ids
+
+    def remove(self, ids: Sequence[int]) -> int:
+        # Returns how many vectors were removed.
+        with self._lock:
+            keep = ~np.isin(self._ids, np.asarray(ids, dtype=np.int64))
+            removed = int(len(keep) - keep.sum())
+            if removed:
+                self._codes = np.ascontiguousarray(self._codes[:, keep])
+                self._ids = self._ids[keep]
+        return removed
+
+    def search(self, query_vector: Sequence[float], count: int) -> Tuple[np.ndarray, np.ndarray]:
+        # Ties go to the earliest rows, as in the lexical first stage. Codes and ids
+        # are read as one pair: add and remove replace both.
+        with self._lock:
+            codes, ids = self._codes, self._ids
+        count = max(0, min(count, len(ids)))
+        if count == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        tables = self._quantizer.tables(_unit(query_vector))
+        scores = np.zeros(len(ids), dtype=np.float32)
+        for index in range(self._quantizer.subspaces):
+            scores += tables[index].take(codes[index])
+        threshold = np.partition(scores, len(scores) - count)[len(scores) - count]
+        above = np.flatnonzero(scores > threshold)
+        ties = np.flatnonzero(scores == threshold)[: count - len(above)]
+        chosen = np.concatenate([above, ties])
+        order = chosen[np.lexsort((chosen, -scores[chosen]))]
+        return np.asarray(ids[order]), scores[order]
+
+    def save(self, directory: Path) -> None:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            codes, ids = self._codes, self._ids
+        np.save(directory / "codebooks.npy", self._quantizer.codebooks)
+        np.save(directory / "codes.npy", codes)
+        np.save(directory / "ids.npy", ids)
+
+    @classmethod
+    def load(cls, directory: Path) -> "PqVectorStore":
+        directory = Path(directory)
+        return cls(
+            ProductQuantizer(np.load(directory / "codebooks.npy")),
+            np.load(directory / "codes.npy", mmap_mode="r"),
+            np.load(directory / "ids.npy", mmap_mode="r"),
+        )
+
+
+class CompressedCorpusStore:
+    # Product-quantized copies of known corpora (the public datasets) by corpus
+    # fingerprint; the ids are document positions. Built at startup from the corpus
+    # matrices, optionally persisted as one <fingerprint>/ directory per corpus.
+
+    def __init__(self) -> None:
+        self._stores: Dict[str, PqVectorStore] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._stores)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(store.nbytes for store in self._stores.values())
+
+    def get(self, fingerprint: str) -> Optional[PqVectorStore]:
+        return self._stores.get(fingerprint)
+
+    def build(
+        self,
+        corpora: Iterable[List[DocumentDTO]],
+        matrices: CorpusMatrixStore,
+        subspaces: int,
+        train_sample: int,
+        directory: Optional[Path] = None,
+    ) -> None:
+        # Corpora whose texts are not all in the matrices are skipped.
+        stores: Dict[str, PqVectorStore] = {}
+        for documents in corpora:
+            if not documents:
+                continue
+            fingerprint = corpus_fingerprint(documents)
+            path = Path(directory) / fingerprint if directory is not None else None
+            if path is not None and (path / "codes.npy").exists():
+                stores[fingerprint] = PqVectorStore.load(path)
+                continue
+            rows = np.asarray(matrices.lookup([doc.text for doc in documents]), dtype=np.int64)
+            if (rows < 0).any():
+                continue
+            matrix = matrices.matrix
+            rng = np.random.default_rng(0)
+            sample = np.sort(rng.choice(len(rows), min(train_sample, len(rows)), replace=False))
+            store = PqVectorStore.train(matrix[rows[sample]], subspaces)
+            for start in range(0, len(rows), PQ_CHUNK_ROWS):
+                chunk = rows[start : start + PQ_CHUNK_ROWS]
+                store.add(matrix[chunk], np.arange(start, start + len(chunk)))
+            if path is not None:
+                store.save(path)
+                store = PqVectorStore.load(path)
+            stores[fingerprint] = store
+        with self._lock:
+            self._stores = stores
+
+
+compressed_corpora = CompressedCorpusStore()
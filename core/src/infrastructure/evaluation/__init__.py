@@ -0,0 +1,15 @@
+from .reports import (
+    evaluation_dataset_from_public,
+    report_to_csv,
+    report_to_dict,
+    report_to_rows,
+    write_report,
+)
+
+__all__ = [
+    "evaluation_dataset_from_public",
+    "report_to_csv",
+    "report_to_dict",
+    "report_to_rows",
+    "write_report",
+]
@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, List
+
+from application.dtos import (
+    DocumentDTO,
+    EvaluationDatasetDTO,
+    EvaluationQueryDTO,
+    EvaluationReportDTO,
+)
+
+CSV_COLUMNS = [
+    "mode",
+    "top_k",
+    "candidate_k",
+    "lexical_pool",
+    "queries",
+    "labelled_queries",
+    "recall_at_k_mean",
+    "recall_at_k_ci_low",
+    "recall_at_k_ci_high",
+    "recall_lost_mean",
+    "recall_lost_ci_low",
+    "recall_lost_ci_high",
+    "mrr_mean",
+    "mrr_ci_low",
+    "mrr_ci_high",
+    "ndcg_at_k_mean",
+    "ndcg_at_k_ci_low",
+    "ndcg_at_k_ci_high",
+    "latency_mean_ms",
+    "latency_p50_ms",
+    "latency_p90_ms",
+    "latency_p95_ms",
+    "latency_p99_ms",
+]
+
+
+def evaluation_dataset_from_public(dataset: Dict[str, Any]) -> EvaluationDatasetDTO:
+    return EvaluationDatasetDTO(
+        dataset_id=dataset["id"],
+        documents=[
+            DocumentDTO(doc_id=item["doc_id"], text=item["text"])
+            for item in dataset.get("documents", [])
+        ],
+        queries=[
+            EvaluationQueryDTO(
+                query_id=item["query_id"],
+                query=item["query"],
+                relevant_doc_ids=list(item.get("relevant_doc_ids", [])),
+            )
+            for item in dataset.get("queries", [])
+        ],
+    )
+
+
+def report_to_dict(report: EvaluationReportDTO) -> Dict[str, Any]:
+    return asdict(report)
+
+
+def report_to_rows(report: EvaluationReportDTO) -> List[Dict[str, Any]]:
+    rows = []
+    for cell in report.cells:
+        row: Dict[str, Any] = {
+            "mode": cell.mode,
+            "top_k": cell.top_k,
+            "candidate_k": cell.candidate_k,
+            "lexical_pool": cell.lexical_pool,
+            "queries": cell.queries,
+            "labelled_queries": cell.labelled_queries,
+        }
+        for name in ("recall_at_k", "mrr", "ndcg_at_k"):
+            summary = getattr(cell, name)
+            row[f"{name}_mean"] = summary.mean
+            row[f"{name}_ci_low"] = summary.ci_low
+            row[f"{name}_ci_high"] = summary.ci_high
+        lost = cell.recall_lost
+        row["recall_lost_mean"] = lost.mean if lost is not None else None
+        row["recall_lost_ci_low"] = lost.ci_low if lost is not None else None
+        row["recall_lost_ci_high"] = lost.ci_high if lost is not None else None
+        row["latency_mean_ms"] = cell.latency.mean_ms
+        row["latency_p50_ms"] = cell.latency.p50_ms
+        row["latency_p90_ms"] = cell.latency.p90_ms
+        row["latency_p95_ms"] = cell.latency.p95_ms
+        row["latency_p99_ms"] = cell.latency.p99_ms
+        rows.append(row)
+    return rows
+
+
+def report_to_csv(report: EvaluationReportDTO) -> str:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    writer.writerows(report_to_rows(report))
+    return buffer.getvalue()
+
+
+def write_report(report: EvaluationReportDTO, path: Path) -> None:
+    # The format follows the file extension: .csv for the flat grid, JSON otherwise.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix.lower() == ".csv":
+        path.write_text(report_to_csv(report), encoding="utf-8")
+        return
+    path.write_text(json.dumps(report_to_dict(report), indent=2), encoding="utf-8")
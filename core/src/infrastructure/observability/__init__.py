@@ -0,0 +1,12 @@
+from .instrumented import InstrumentedComparator, InstrumentedEmbedder, InstrumentedResultCache
+from .metrics import register_pool_metrics, registry
+from .middleware import PrometheusMiddleware
+
+__all__ = [
+    "InstrumentedComparator",
+    "InstrumentedEmbedder",
+    "InstrumentedResultCache",
+    "PrometheusMiddleware",
+    "register_pool_metrics",
+    "registry",
+]
@@ -0,0 +1,70 @@
+import time
+from typing import Any, Iterable, List, Optional, Sequence
+
+from application.dtos import SearchResponseDTO
+from application.interfaces import CircuitStats, Embedder, QuantumComparator, SearchResultCache
+from infrastructure.observability.metrics import (
+    encoder_batch_size,
+    encoder_seconds_total,
+    encoder_texts_total,
+    quantum_rerank_candidates,
+    search_cache_entries,
+    search_cache_requests_total,
+)
+
+
+class InstrumentedEmbedder(Embedder):
+    def __init__(self, inner: Embedder) -> None:
+        self._inner = inner
+
+    def embed_texts(self, texts: Iterable[str]) -> List[List[float]]:
+        batch = list(texts)
+        start = time.perf_counter()
+        vectors = self._inner.embed_texts(batch)
+        encoder_seconds_total.inc(time.perf_counter() - start)
+        encoder_texts_total.inc(len(batch))
+        encoder_batch_size.observe(len(batch))
+        return vectors
+
+
+class InstrumentedComparator(QuantumComparator):
+    def __init__(self, inner: QuantumComparator) -> None:
+        self._inner = inner
+
+    def compare(self, vector_a: Sequence[float], vector_b: Sequence[float]) -> float:
+        return self._inner.compare(vector_a, vector_b)
+
+    def compare_many(
+        self, vector_a: Sequence[float], vectors: Sequence[Sequence[float]]
+    ) -> List[float]:
+        quantum_rerank_candidates.observe(len(vectors))
+        return self._inner.compare_many(vector_a, vectors)
+
+    @property
+    def linear_cost(self) -> bool:
+        return self._inner.linear_cost
+
+    @property
+    def indexes_corpora(self) -> bool:
+        return self._inner.indexes_corpora
+
+    def index_corpus(self, vectors: Sequence[Sequence[float]]) -> Any:
+        return self._inner.index_corpus(vectors)
+
+    def consume_stats(self, with_resources: bool = False) -> Optional[CircuitStats]:
+        return self._inner.consume_stats(with_resources)
+
+
+class InstrumentedResultCache(SearchResultCache):
+    def __init__(self, inner: SearchResultCache) -> None:
+        self._inner = inner
+        if hasattr(inner, "__len__"):
+            search_cache_entries.set_function(inner.__len__)
+
+    def get(self, key: str) -> Optional[SearchResponseDTO]:
+        response = self._inner.get(key)
+        search_cache_requests_total.labels("miss" if response is None else "hit").inc()
+        return response
+
+    def set(self, key: str, response: SearchResponseDTO) -> None:
+        self._inner.set(key, response)
@@ -0,0 +1,78 @@
+from infrastructure.observability.prometheus import MetricsRegistry
+
+registry = MetricsRegistry()
+
+http_requests_total = registry.counter(
+    "http_requests_total",
+    "HTTP requests handled, by method, route template and status code.",
+    ("method", "route", "status"),
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency in seconds, by method and route template.",
+    ("method", "route"),
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served.",
+)
+
+search_requests_total = registry.counter(
+    "search_requests_total",
+    "Search requests, by route and search mode.",
+    ("route", "mode"),
+)
+search_duration_seconds = registry.histogram(
+    "search_duration_seconds",
+    "End-to-end search latency in seconds, by route and search mode.",
+    ("route", "mode"),
+)
+
+search_cache_requests_total = registry.counter(
+    "search_cache_requests_total",
+    "Search result cache lookups, by result (hit or miss).",
+    ("result",),
+)
+search_cache_entries = registry.gauge(
+    "search_cache_entries",
+    "Responses currently held by the search result cache.",
+)
+
+encoder_batch_size = registry.histogram(
+    "encoder_batch_size",
+    "Number of texts per embedder call.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024),
+)
+encoder_texts_total = registry.counter(
+    "encoder_texts_total",
+    "Texts encoded by the embedder.",
+)
+encoder_seconds_total = registry.counter(
+    "encoder_seconds_total",
+    "Seconds spent inside the embedder; texts/second = rate(texts) / rate(seconds).",
+)
+
+quantum_rerank_candidates = registry.histogram(
+    "quantum_rerank_candidates",
+    "Candidates sent to the quantum comparator per rerank.",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+quantum_rerank_candidate_seconds = registry.gauge(
+    "quantum_rerank_candidate_seconds",
+    "Moving-average rerank cost per candidate used to size latency budgets.",
+)
+
+db_pool_connections = registry.gauge(
+    "db_pool_connections",
+    "Database connection pool usage per engine (sync or async), sampled at scrape time.",
+    ("engine", "state"),
+)
+
+
+def register_pool_metrics(engine, name: str = "sync") -> None:
+    # AsyncEngine wraps a regular engine that owns the pool.
+    pool = getattr(engine, "sync_engine", engine).pool
+    for state in ("size", "checkedin", "checkedout", "overflow"):
+        function = getattr(pool, state, None)
+        if callable(function):
+            db_pool_connections.set_function(function, name, state)
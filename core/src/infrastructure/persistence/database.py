@@ -1,14 +1,59 @@
 import os
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
 DATABASE_URL = os.getenv('DATABASE_URL', 'mysql+pymysql://tcc:tcc@db:3306/tcc')
+# Pool settings, applied to both engines (each engine has its own pool, so a worker can
+# hold up to twice DB_POOL_SIZE + DB_MAX_OVERFLOW connections). Recycling below the
+# server's wait_timeout avoids handing out connections MySQL has already closed.
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '20'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() in {'1', 'true', 'yes'}
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True, future=True)
+# Sync driver -> asyncio driver of the same database.
+ASYNC_DRIVERS = {
+    'mysql': 'mysql+aiomysql',
+    'mysql+pymysql': 'mysql+aiomysql',
+    'sqlite': 'sqlite+aiosqlite',
+    'sqlite+pysqlite': 'sqlite+aiosqlite',
+}
+
+
+def async_database_url(url: str) -> str:
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL') or async_database_url(DATABASE_URL)
+
+
+def pool_options(url: str) -> dict:
+    options = {'pool_pre_ping': DB_POOL_PRE_PING, 'pool_recycle': DB_POOL_RECYCLE}
+    # SQLite (tests, local runs) keeps SQLAlchemy's default pool for the file or memory db.
+    if make_url(url).get_backend_name() != 'sqlite':
+        options.update(
+            pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT
+        )
+    return options
+
+
+engine = create_engine(DATABASE_URL, future=True, **pool_options(DATABASE_URL))
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
+# The chat and auth routes run on the event loop with this engine; the search routes,
+# which spend their time in the model, keep the sync one.
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **pool_options(ASYNC_DATABASE_URL))
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
 
 class Base(DeclarativeBase):
     pass
@@ -22,7 +67,17 @@ def get_db() -> Generator:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db() -> None:
     from infrastructure.persistence import models  # noqa: F401
 
     Base.metadata.create_all(bind=engine)
+    # create_all skips tables that already exist, so indexes added to a model later
+    # are created here.
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
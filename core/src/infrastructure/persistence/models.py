@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String, Text, func
+from sqlalchemy import JSON, DateTime, Float, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from infrastructure.persistence.database import Base
@@ -19,23 +19,83 @@ class User(Base):
 
 class Conversation(Base):
     __tablename__ = 'conversations'
+    # Conversations and messages are listed in (created_at, id) order and paginated by
+    # keyset on those columns; the composite indexes serve both the filter and the order.
+    __table_args__ = (Index('ix_conversations_user_created', 'user_id', 'created_at', 'id'),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey('users.id'), index=True, nullable=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.id'), nullable=False)
     title: Mapped[str | None] = mapped_column(String(255))
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     user = relationship('User', back_populates='conversations')
-    messages = relationship('Message', back_populates='conversation', cascade='all, delete-orphan')
+    messages = relationship(
+        'Message',
+        back_populates='conversation',
+        cascade='all, delete-orphan',
+        order_by='(Message.created_at, Message.id)',
+    )
+    search_runs = relationship(
+        'SearchRun', back_populates='conversation', cascade='all, delete-orphan'
+    )
 
 
 class Message(Base):
     __tablename__ = 'messages'
+    __table_args__ = (
+        Index('ix_messages_conversation_created', 'conversation_id', 'created_at', 'id'),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    conversation_id: Mapped[int] = mapped_column(ForeignKey('conversations.id'), index=True, nullable=False)
+    conversation_id: Mapped[int] = mapped_column(ForeignKey('conversations.id'), nullable=False)
     role: Mapped[str] = mapped_column(String(20), nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     conversation = relationship('Conversation', back_populates='messages')
+
+
+class SearchRun(Base):
+    # A search made from a conversation, kept so it can be shown again without
+    # re-encoding or re-running circuits, and as a history of its latencies.
+    __tablename__ = 'search_runs'
+    __table_args__ = (
+        Index('ix_search_runs_conversation_created', 'conversation_id', 'created_at', 'id'),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    conversation_id: Mapped[int] = mapped_column(ForeignKey('conversations.id'), nullable=False)
+    route: Mapped[str] = mapped_column(String(40), nullable=False)
+    query: Mapped[str] = mapped_column(Text, nullable=False)
+    mode: Mapped[str] = mapped_column(String(20), nullable=False)
+    parameters: Mapped[dict] = mapped_column(JSON, nullable=False)
+    corpus_fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    # Metrics per ranked mode ("classical", "quantum") and per-stage timings in ms.
+    metrics: Mapped[dict] = mapped_column(JSON, nullable=False)
+    timings: Mapped[dict] = mapped_column(JSON, nullable=False)
+    total_ms: Mapped[float] = mapped_column(Float, nullable=False)
+    # The response body as it was sent, replayed verbatim.
+    response: Mapped[str] = mapped_column(Text(16_777_215), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    conversation = relationship('Conversation', back_populates='search_runs')
+    results = relationship(
+        'SearchRunResult',
+        back_populates='run',
+        cascade='all, delete-orphan',
+        order_by='(SearchRunResult.mode, SearchRunResult.rank)',
+    )
+
+
+class SearchRunResult(Base):
+    __tablename__ = 'search_run_results'
+    __table_args__ = (Index('ix_search_run_results_run_mode_rank', 'run_id', 'mode', 'rank'),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    run_id: Mapped[int] = mapped_column(ForeignKey('search_runs.id'), nullable=False)
+    mode: Mapped[str] = mapped_column(String(20), nullable=False)
+    rank: Mapped[int] = mapped_column(Integer, nullable=False)
+    doc_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    score: Mapped[float] = mapped_column(Float, nullable=False)
+
+    run = relationship('SearchRun', back_populates='results')
@@ -0,0 +1,58 @@
+from dataclasses import asdict
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from infrastructure.persistence.models import Conversation, SearchRun, SearchRunResult
+
+
+def owns_conversation(db: Session, user_id: int, conversation_id: int) -> bool:
+    return (
+        db.query(Conversation.id)
+        .filter(Conversation.id == conversation_id, Conversation.user_id == user_id)
+        .first()
+        is not None
+    )
+
+
+def _ranked_lites(response) -> dict:
+    # The lists of results and metrics a response carries, by ranking mode.
+    if response.comparison is not None:
+        return {"classical": response.comparison.classical, "quantum": response.comparison.quantum}
+    return {response.mode: response}
+
+
+def record_search_run(
+    db: Session,
+    conversation_id: int,
+    route: str,
+    parameters: dict[str, Any],
+    corpus_fingerprint: str,
+    response,
+    body: str,
+    timings: dict[str, float],
+) -> SearchRun:
+    lites = _ranked_lites(response)
+    run = SearchRun(
+        conversation_id=conversation_id,
+        route=route,
+        query=response.query,
+        mode=response.mode,
+        parameters=parameters,
+        corpus_fingerprint=corpus_fingerprint,
+        metrics={
+            mode: asdict(lite.metrics) if lite.metrics is not None else None
+            for mode, lite in lites.items()
+        },
+        timings=timings,
+        total_ms=timings.get("total", 0.0),
+        response=body,
+    )
+    run.results = [
+        SearchRunResult(mode=mode, rank=rank, doc_id=item.doc_id, score=item.score)
+        for mode, lite in lites.items()
+        for rank, item in enumerate(lite.results, start=1)
+    ]
+    db.add(run)
+    db.commit()
+    return run
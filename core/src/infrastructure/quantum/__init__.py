@@ -1,4 +1,13 @@
 from .cosine_comparator import CosineSimilarityComparator
+from .l2_sampling_comparator import L2SamplingComparator, SamplingIndex, build_sampling_index
+from .superposition_swap_test_comparator import SuperpositionSwapTestComparator
 from .swap_test_comparator import SwapTestQuantumComparator
 
-__all__ = ["CosineSimilarityComparator", "SwapTestQuantumComparator"]
+__all__ = [
+    "CosineSimilarityComparator",
+    "L2SamplingComparator",
+    "SamplingIndex",
+    "build_sampling_index",
+    "SuperpositionSwapTestComparator",
+    "SwapTestQuantumComparator",
+]
@@ -0,0 +1,108 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional
+
+from application.interfaces import CircuitStats
+
+
+@dataclass(frozen=True)
+class CircuitResources:
+    width: int
+    depth: int
+    gate_count: int
+    gate_types: Dict[str, int] = field(default_factory=dict)
+    executions: int = 1
+
+
+def circuit_resources(qnode) -> CircuitResources:
+    import pennylane as qml
+
+    # Device-level specs decompose state preparation into native gates, which is
+    # what a hardware run would actually pay for.
+    try:
+        specs = qml.specs(qnode, level="device")()
+    except TypeError:
+        specs = qml.specs(qnode, expansion_strategy="device")()
+
+    if isinstance(specs, dict):
+        resources = specs["resources"]
+        width = getattr(resources, "num_wires", None) or specs.get("num_device_wires", 0)
+    else:
+        resources = specs.resources
+        width = getattr(resources, "num_allocs", None) or specs.num_device_wires
+
+    return CircuitResources(
+        width=int(width),
+        depth=int(resources.depth),
+        gate_count=int(resources.num_gates),
+        gate_types=dict(resources.gate_types),
+    )
+
+
+def sequential_resources(items: Iterable[CircuitResources]) -> CircuitResources:
+    # Resources of running independent circuits one after the other.
+    width = depth = gate_count = executions = 0
+    gate_types: Dict[str, int] = {}
+    for item in items:
+        width = max(width, item.width)
+        depth += item.depth
+        gate_count += item.gate_count
+        executions += item.executions
+        for name, count in item.gate_types.items():
+            gate_types[name] = gate_types.get(name, 0) + count
+    return CircuitResources(
+        width=width,
+        depth=depth,
+        gate_count=gate_count,
+        gate_types=gate_types,
+        executions=executions,
+    )
+
+
+class CircuitStatsRecorder:
+    def __init__(self) -> None:
+        self._executions = 0
+        self._simulator_ms = 0.0
+        self._last_circuit = None
+        # Batched reranks may execute circuits of one comparator from several threads.
+        self._lock = threading.Lock()
+
+    def execute(self, circuit):
+        start = time.perf_counter()
+        output = circuit()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._simulator_ms += elapsed_ms
+            self._executions += 1
+            self._last_circuit = circuit
+        return output
+
+    def consume(self, with_resources: bool = False) -> Optional[CircuitStats]:
+        with self._lock:
+            executions, simulator_ms, last_circuit = (
+                self._executions,
+                self._simulator_ms,
+                self._last_circuit,
+            )
+            self._executions = 0
+            self._simulator_ms = 0.0
+            self._last_circuit = None
+        if executions == 0:
+            return None
+
+        qubits = depth = None
+        gate_counts: Dict[str, int] = {}
+        if with_resources and last_circuit is not None:
+            # Specs describe the most recent circuit; every rerank circuit of a
+            # query shares the same layout.
+            resources = circuit_resources(last_circuit)
+            qubits, depth, gate_counts = resources.width, resources.depth, resources.gate_types
+
+        return CircuitStats(
+            executions=executions,
+            simulator_ms=simulator_ms,
+            qubits=qubits,
+            depth=depth,
+            gate_counts=gate_counts,
+        )
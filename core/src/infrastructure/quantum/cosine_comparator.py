@@ -1,4 +1,4 @@
-from typing import Sequence
+from typing import List, Sequence
 
 import numpy as np
 
@@ -19,3 +19,30 @@ class CosineSimilarityComparator(QuantumComparator):
 
         score = float(np.dot(vec_a, vec_b) / denom)
         return float(np.clip(score, 0.0, 1.0))
+
+    def compare_many(
+        self, vector_a: Sequence[float], vectors: Sequence[Sequence[float]]
+    ) -> List[float]:
+        return self.compare_matrix([vector_a], vectors)[0]
+
+    @property
+    def linear_cost(self) -> bool:
+        return False
+
+    def compare_matrix(
+        self, vectors_a: Sequence[Sequence[float]], vectors_b: Sequence[Sequence[float]]
+    ) -> List[List[float]]:
+        if len(vectors_a) == 0:
+            return []
+        if len(vectors_b) == 0:
+            return [[] for _ in vectors_a]
+
+        left = np.asarray(vectors_a, dtype=float)
+        right = np.asarray(vectors_b, dtype=float)
+        if left.ndim != 2 or right.ndim != 2 or left.shape[1] == 0 or right.shape[1] == 0:
+            return [[self.compare(a, b) for b in vectors_b] for a in vectors_a]
+
+        # One (Q x N) product instead of Q * N dot products.
+        denom = np.outer(np.linalg.norm(left, axis=1), np.linalg.norm(right, axis=1))
+        scores = np.divide(left @ right.T, denom, out=np.zeros(denom.shape), where=denom > 0)
+        return np.clip(scores, 0.0, 1.0).tolist()
@@ -0,0 +1,155 @@
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from application.interfaces import CircuitStats, QuantumComparator
+from infrastructure.quantum.circuit_resources import (
+    CircuitResources,
+    CircuitStatsRecorder,
+    circuit_resources,
+    sequential_resources,
+)
+from infrastructure.quantum.swap_test_comparator import (
+    _build_swap_test_circuit,
+    _next_power_of_two,
+    _pad_and_normalize,
+)
+
+
+@dataclass(frozen=True)
+class SuperpositionResourceReport:
+    candidates: int
+    superposition: CircuitResources
+    superposition_ms: float
+    separate: CircuitResources
+    separate_ms: float
+    max_abs_error: float
+
+
+def _index_bits(index: int, width: int) -> List[int]:
+    return [(index >> (width - 1 - bit)) & 1 for bit in range(width)]
+
+
+class SuperpositionSwapTestComparator(QuantumComparator):
+    # Loads all candidates behind an index register (qRAM style) and runs a single
+    # swap test against the query. Overlaps come from the ancilla statistics
+    # conditioned on each index value: P(0 | i) = (1 + |<q|d_i>|^2) / 2.
+
+    def __init__(self, shots: int | None = None, seed: int | None = None) -> None:
+        self._shots = shots
+        self._rng = np.random.default_rng(seed)
+        self._recorder = CircuitStatsRecorder()
+
+    def compare(self, vector_a: Sequence[float], vector_b: Sequence[float]) -> float:
+        return self.compare_many(vector_a, [vector_b])[0]
+
+    def compare_many(
+        self, vector_a: Sequence[float], vectors: Sequence[Sequence[float]]
+    ) -> List[float]:
+        if len(vectors) == 0:
+            return []
+        circuit, index_qubits = self._build_circuit(vector_a, vectors)
+        probs = np.asarray(self._recorder.execute(circuit), dtype=float)
+        return self._overlaps_from_probs(probs, len(vectors), index_qubits)
+
+    @property
+    def linear_cost(self) -> bool:
+        # One circuit for all candidates; splitting them multiplies the executions.
+        return False
+
+    def consume_stats(self, with_resources: bool = False) -> Optional[CircuitStats]:
+        return self._recorder.consume(with_resources)
+
+    def resource_report(
+        self, vector_a: Sequence[float], vectors: Sequence[Sequence[float]]
+    ) -> SuperpositionResourceReport:
+        if len(vectors) == 0:
+            raise ValueError("At least one candidate vector is required")
+
+        circuit, index_qubits = self._build_circuit(vector_a, vectors)
+        start = time.perf_counter()
+        probs = np.asarray(circuit(), dtype=float)
+        superposition_ms = (time.perf_counter() - start) * 1000
+        estimated = self._overlaps_from_probs(probs, len(vectors), index_qubits)
+
+        query, candidates = self._prepare(vector_a, vectors)
+        separate_circuits = [_build_swap_test_circuit(query, item) for item in candidates]
+        start = time.perf_counter()
+        exact = [
+            float(np.clip(2 * separate()[0] - 1, 0.0, 1.0)) for separate in separate_circuits
+        ]
+        separate_ms = (time.perf_counter() - start) * 1000
+
+        return SuperpositionResourceReport(
+            candidates=len(vectors),
+            superposition=circuit_resources(circuit),
+            superposition_ms=superposition_ms,
+            separate=sequential_resources(circuit_resources(item) for item in separate_circuits),
+            separate_ms=separate_ms,
+            max_abs_error=float(np.max(np.abs(np.array(estimated) - np.array(exact)))),
+        )
+
+    @staticmethod
+    def _prepare(
+        vector_a: Sequence[float], vectors: Sequence[Sequence[float]]
+    ) -> tuple[np.ndarray, List[np.ndarray]]:
+        query = np.array(vector_a, dtype=float)
+        candidates = [np.array(vector, dtype=float) for vector in vectors]
+        if query.size == 0 or any(item.size == 0 for item in candidates):
+            raise ValueError("Vectors must be non-empty")
+
+        # At least one data qubit so the controlled state preparation has a target.
+        target_len = max(2, _next_power_of_two(max(item.size for item in [query, *candidates])))
+        query = _pad_and_normalize(query, target_len)
+        candidates = [_pad_and_normalize(item, target_len) for item in candidates]
+        return query, candidates
+
+    def _build_circuit(self, vector_a: Sequence[float], vectors: Sequence[Sequence[float]]):
+        import pennylane as qml
+
+        query, candidates = self._prepare(vector_a, vectors)
+        n_qubits = int(np.log2(query.size))
+        index_qubits = max(1, int(np.ceil(np.log2(len(candidates)))))
+
+        index_wires = list(range(1, 1 + index_qubits))
+        data_wires = list(range(1 + index_qubits, 1 + index_qubits + n_qubits))
+        query_wires = list(
+            range(1 + index_qubits + n_qubits, 1 + index_qubits + 2 * n_qubits)
+        )
+        dev = qml.device("default.qubit", wires=1 + index_qubits + 2 * n_qubits)
+
+        @qml.qnode(dev)
+        def circuit() -> np.ndarray:
+            for wire in index_wires:
+                qml.Hadamard(wires=wire)
+            for index, candidate in enumerate(candidates):
+                qml.ctrl(
+                    qml.StatePrep(candidate, wires=data_wires),
+                    control=index_wires,
+                    control_values=_index_bits(index, index_qubits),
+                )
+            qml.AmplitudeEmbedding(query, wires=query_wires, normalize=False)
+            qml.Hadamard(wires=0)
+            for data_wire, query_wire in zip(data_wires, query_wires):
+                qml.CSWAP(wires=[0, data_wire, query_wire])
+            qml.Hadamard(wires=0)
+            return qml.probs(wires=[0, *index_wires])
+
+        return circuit, index_qubits
+
+    def _overlaps_from_probs(
+        self, probs: np.ndarray, n_candidates: int, index_qubits: int
+    ) -> List[float]:
+        if self._shots:
+            counts = self._rng.multinomial(self._shots, probs / probs.sum())
+            probs = counts / self._shots
+
+        joint = probs.reshape(2, 2**index_qubits)[:, :n_candidates]
+        marginal = joint.sum(axis=0)
+        prob_zero = np.divide(
+            joint[0], marginal, out=np.full(n_candidates, 0.5), where=marginal > 0
+        )
+        similarity = 2 * prob_zero - 1
+        return [float(value) for value in np.clip(similarity, 0.0, 1.0)]
@@ -1,9 +1,9 @@
-﻿from typing import Sequence
+﻿from typing import Optional, Sequence
 
 import numpy as np
-import pennylane as qml
 
-from application.interfaces import QuantumComparator
+from application.interfaces import CircuitStats, QuantumComparator
+from infrastructure.quantum.circuit_resources import CircuitStatsRecorder
 
 
 def _next_power_of_two(value: int) -> int:
@@ -24,7 +24,32 @@ def _pad_and_normalize(vector: np.ndarray, target_len: int) -> np.ndarray:
     return vector / norm
 
 
+def _build_swap_test_circuit(vec_a: np.ndarray, vec_b: np.ndarray):
+    # pennylane takes seconds to import, so it is only loaded once a circuit is built.
+    import pennylane as qml
+
+    n_qubits = int(np.log2(vec_a.size))
+    dev = qml.device("default.qubit", wires=1 + 2 * n_qubits)
+
+    @qml.qnode(dev)
+    def circuit() -> np.ndarray:
+        qml.Hadamard(wires=0)
+        qml.AmplitudeEmbedding(vec_a, wires=range(1, 1 + n_qubits), normalize=False)
+        qml.AmplitudeEmbedding(
+            vec_b, wires=range(1 + n_qubits, 1 + 2 * n_qubits), normalize=False
+        )
+        for i in range(n_qubits):
+            qml.CSWAP(wires=[0, 1 + i, 1 + n_qubits + i])
+        qml.Hadamard(wires=0)
+        return qml.probs(wires=0)
+
+    return circuit
+
+
 class SwapTestQuantumComparator(QuantumComparator):
+    def __init__(self) -> None:
+        self._recorder = CircuitStatsRecorder()
+
     def compare(self, vector_a: Sequence[float], vector_b: Sequence[float]) -> float:
         vec_a = np.array(vector_a, dtype=float)
         vec_b = np.array(vector_b, dtype=float)
@@ -36,21 +61,10 @@ class SwapTestQuantumComparator(QuantumComparator):
         vec_a = _pad_and_normalize(vec_a, target_len)
         vec_b = _pad_and_normalize(vec_b, target_len)
 
-        n_qubits = int(np.log2(target_len))
-        dev = qml.device("default.qubit", wires=1 + 2 * n_qubits)
-
-        @qml.qnode(dev)
-        def circuit() -> np.ndarray:
-            qml.Hadamard(wires=0)
-            qml.AmplitudeEmbedding(vec_a, wires=range(1, 1 + n_qubits), normalize=False)
-            qml.AmplitudeEmbedding(
-                vec_b, wires=range(1 + n_qubits, 1 + 2 * n_qubits), normalize=False
-            )
-            for i in range(n_qubits):
-                qml.CSWAP(wires=[0, 1 + i, 1 + n_qubits + i])
-            qml.Hadamard(wires=0)
-            return qml.probs(wires=0)
-
-        prob_zero = circuit()[0]
+        circuit = _build_swap_test_circuit(vec_a, vec_b)
+        prob_zero = self._recorder.execute(circuit)[0]
         similarity = 2 * prob_zero - 1
         return float(np.clip(similarity, 0.0, 1.0))
+
+    def consume_stats(self, with_resources: bool = False) -> Optional[CircuitStats]:
+        return self._recorder.consume(with_resources)
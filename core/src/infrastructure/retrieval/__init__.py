@@ -0,0 +1,4 @@
+from .bm25_index import Bm25Index, tokenize
+from .index_store import LexicalIndexStore, lexical_indexes
+
+__all__ = ["Bm25Index", "tokenize", "LexicalIndexStore", "lexical_indexes"]
@@ -0,0 +1,124 @@
+import re
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from application.interfaces import LexicalIndex
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN = re.compile(r"\w\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    # Lowercase words of two or more characters, accents removed, so "Computação"
+    # and "computacao" are the same term.
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _TOKEN.findall(stripped)
+
+
+class Bm25Index(LexicalIndex):
+    # Okapi BM25 over an inverted index kept as CSR arrays: the postings of term t are
+    # doc_ids[indptr[t]:indptr[t + 1]], each with its precomputed BM25 weight, so a
+    # query only adds up the weight slices of its terms (about 8 bytes per posting).
+
+    def __init__(
+        self,
+        terms: Dict[str, int],
+        indptr: np.ndarray,
+        doc_ids: np.ndarray,
+        weights: np.ndarray,
+        documents: int,
+    ) -> None:
+        self._terms = terms
+        self._indptr = indptr
+        self._doc_ids = doc_ids
+        self._weights = weights
+        self._documents = documents
+
+    @classmethod
+    def build(
+        cls, texts: Iterable[str], k1: float = BM25_K1, b: float = BM25_B
+    ) -> "Bm25Index":
+        counts = [Counter(tokenize(text)) for text in texts]
+        lengths = np.array([sum(count.values()) for count in counts], dtype=np.float32)
+        average = float(lengths.mean()) if len(lengths) and lengths.mean() > 0 else 1.0
+
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        for position, count in enumerate(counts):
+            for term, frequency in count.items():
+                postings.setdefault(term, []).append((position, frequency))
+
+        terms = {term: index for index, term in enumerate(sorted(postings))}
+        indptr = np.zeros(len(terms) + 1, dtype=np.int64)
+        for term, index in terms.items():
+            indptr[index + 1] = len(postings[term])
+        np.cumsum(indptr, out=indptr)
+        doc_ids = np.empty(int(indptr[-1]), dtype=np.int32)
+        frequencies = np.empty(int(indptr[-1]), dtype=np.float32)
+        for term, index in terms.items():
+            items = np.asarray(postings[term], dtype=np.int64)
+            doc_ids[indptr[index] : indptr[index + 1]] = items[:, 0]
+            frequencies[indptr[index] : indptr[index + 1]] = items[:, 1]
+
+        document_frequency = np.diff(indptr).astype(np.float32)
+        idf = np.log1p((len(counts) - document_frequency + 0.5) / (document_frequency + 0.5))
+        norm = k1 * (1 - b + b * lengths[doc_ids] / average)
+        weights = np.repeat(idf, np.diff(indptr)) * frequencies * (k1 + 1) / (frequencies + norm)
+        return cls(terms, indptr, doc_ids, weights.astype(np.float32), len(counts))
+
+    def __len__(self) -> int:
+        return self._documents
+
+    def scores(self, query: str) -> np.ndarray:
+        scores = np.zeros(self._documents, dtype=np.float32)
+        for term, repeats in Counter(tokenize(query)).items():
+            index = self._terms.get(term)
+            if index is None:
+                continue
+            start, end = self._indptr[index], self._indptr[index + 1]
+            # A term's postings name each document once, so plain fancy indexing adds up.
+            scores[self._doc_ids[start:end]] += repeats * self._weights[start:end]
+        return scores
+
+    def top(self, query: str, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        # Ties (including documents without any query term) go to the earliest
+        # positions, so the pool of a query is deterministic.
+        scores = self.scores(query)
+        count = max(0, min(count, self._documents))
+        if count == 0:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.float32)
+        threshold = np.partition(scores, self._documents - count)[self._documents - count]
+        above = np.flatnonzero(scores > threshold)
+        ties = np.flatnonzero(scores == threshold)[: count - len(above)]
+        chosen = np.concatenate([above, ties])
+        order = chosen[np.lexsort((chosen, -scores[chosen]))]
+        return order, scores[order]
+
+    def save(self, path: Path) -> None:
+        terms = sorted(self._terms, key=self._terms.get)
+        np.savez(
+            Path(path),
+            terms=np.array(terms, dtype=str),
+            indptr=self._indptr,
+            doc_ids=self._doc_ids,
+            weights=self._weights,
+            documents=np.array(self._documents),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "Bm25Index":
+        with np.load(Path(path)) as saved:
+            terms = {str(term): index for index, term in enumerate(saved["terms"])}
+            return cls(
+                terms,
+                saved["indptr"],
+                saved["doc_ids"],
+                saved["weights"],
+                int(saved["documents"]),
+            )
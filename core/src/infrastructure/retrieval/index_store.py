@@ -0,0 +1,46 @@
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from application.dtos import DocumentDTO
+from application.services.search import corpus_fingerprint
+from infrastructure.retrieval.bm25_index import Bm25Index
+
+
+class LexicalIndexStore:
+    # BM25 indexes of known corpora (the public datasets) by corpus fingerprint, so a
+    # changed dataset never reuses a stale index. Built once at startup, optionally
+    # persisted as one <fingerprint>.npz per corpus.
+
+    def __init__(self) -> None:
+        self._indexes: Dict[str, Bm25Index] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._indexes)
+
+    def get(self, fingerprint: str) -> Optional[Bm25Index]:
+        return self._indexes.get(fingerprint)
+
+    def build(
+        self, corpora: Iterable[List[DocumentDTO]], directory: Optional[Path] = None
+    ) -> None:
+        # With a directory, indexes saved there by an earlier start are loaded and the
+        # missing ones are built and saved.
+        if directory is not None:
+            Path(directory).mkdir(parents=True, exist_ok=True)
+        indexes: Dict[str, Bm25Index] = {}
+        for documents in corpora:
+            fingerprint = corpus_fingerprint(documents)
+            path = Path(directory) / f"{fingerprint}.npz" if directory is not None else None
+            if path is not None and path.exists():
+                indexes[fingerprint] = Bm25Index.load(path)
+                continue
+            indexes[fingerprint] = Bm25Index.build(doc.text for doc in documents)
+            if path is not None:
+                indexes[fingerprint].save(path)
+        with self._lock:
+            self._indexes = indexes
+
+
+lexical_indexes = LexicalIndexStore()
@@ -5,3 +5,94 @@ ROOT = Path(__file__).resolve().parents[1]
 SRC = ROOT / "src"
 if str(SRC) not in sys.path:
     sys.path.insert(0, str(SRC))
+
+from types import SimpleNamespace  # noqa: E402
+
+import pytest  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import NullPool  # noqa: E402
+
+from application.interfaces import DocumentTextExtractor, Embedder  # noqa: E402
+from application.services import SearchService  # noqa: E402
+from application.use_cases import BuscarPorArquivoUseCase, RealizarBuscaUseCase  # noqa: E402
+from infrastructure.quantum import CosineSimilarityComparator  # noqa: E402
+
+
+class FakeEmbedder(Embedder):
+    # Deterministic vectors for search tests: the text length (unless length=False)
+    # followed by 1 + the count of each character of counted, or the vector of table
+    # when one is given. Every call's texts are kept in batches.
+    def __init__(self, counted="a", length=True, table=None):
+        self.counted = counted
+        self.length = length
+        self.table = table
+        self.batches = []
+
+    @property
+    def calls(self):
+        return len(self.batches)
+
+    def embed_texts(self, texts):
+        texts = list(texts)
+        self.batches.append(texts)
+        if self.table is not None:
+            return [self.table.get(text, [0.1, 0.1, 0.1]) for text in texts]
+        return [
+            ([len(t)] if self.length else []) + [t.count(c) + 1 for c in self.counted]
+            for t in texts
+        ]
+
+
+class FakeExtractor(DocumentTextExtractor):
+    def extract(self, filename: str, content: bytes) -> str:
+        return content.decode("utf-8")
+
+
+def build_search_service(embedder=None, quantum=None, cost_model=None):
+    # A SearchService over fakes; the quantum comparator defaults to exact cosine.
+    buscar_use_case = RealizarBuscaUseCase(
+        embedder or FakeEmbedder(),
+        CosineSimilarityComparator(),
+        quantum or CosineSimilarityComparator(),
+        cost_model,
+    )
+    return SearchService(buscar_use_case, BuscarPorArquivoUseCase(FakeExtractor()))
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    # A SQLite file shared by the sync routes (search) and the async ones (chat, auth).
+    # TestClient may run each request on a new event loop, so async connections are
+    # not pooled between requests.
+    from infrastructure.api.fastapi_app import app
+    from infrastructure.persistence.database import Base, get_async_db, get_db
+
+    path = tmp_path / "test.db"
+    engine = create_engine(f"sqlite:///{path}")
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    async_session_factory = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+    def get_test_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    async def get_test_async_db():
+        async with async_session_factory() as session:
+            yield session
+
+    monkeypatch.setitem(app.dependency_overrides, get_db, get_test_db)
+    monkeypatch.setitem(app.dependency_overrides, get_async_db, get_test_async_db)
+    yield SimpleNamespace(
+        engine=engine, async_engine=async_engine, session_factory=session_factory
+    )
+    engine.dispose()
+    async_engine.sync_engine.dispose()
@@ -0,0 +1,107 @@
+from fastapi.testclient import TestClient
+
+from application.dtos import DocumentDTO, SearchRequestDTO
+from infrastructure.api.fastapi_app import app
+from infrastructure.api.search import search_controller
+from tests.conftest import FakeEmbedder, build_search_service
+
+
+client = TestClient(app)
+
+REPEATED = "Quantum reranking compares the query state with each candidate."
+PARAPHRASE = "Quantum reranking compares the query state with every candidate."
+OTHER = "Classical prefiltering keeps only the best scored documents first."
+FOURTH = "Swap tests estimate the overlap between two normalised states."
+VECTORS = {
+    "quantum": [1.0, 0.0, 0.0],
+    REPEATED: [0.95, 0.31, 0.0],
+    PARAPHRASE: [0.95, 0.31, 0.0],
+    OTHER: [0.9, -0.3, 0.3],
+    FOURTH: [0.9, 0.0, -0.43],
+}
+
+
+def _service(embedder):
+    return build_search_service(embedder)
+
+
+def _documents():
+    return [
+        DocumentDTO(doc_id="1", text=f"{REPEATED} {PARAPHRASE}"),
+        DocumentDTO(doc_id="2", text=f"{OTHER} {FOURTH}"),
+    ]
+
+
+def test_answer_prefers_diverse_sentences():
+    response = _service(FakeEmbedder(table=VECTORS)).buscar_por_texto(
+        SearchRequestDTO(query="quantum", documents=_documents())
+    )
+
+    # The paraphrase is as relevant as the first pick but adds nothing new.
+    assert response.answer == f"Com base no documento, {REPEATED} {OTHER} {FOURTH}"
+
+
+def test_prepared_documents_answer_without_encoding_sentences():
+    embedder = FakeEmbedder(table=VECTORS)
+    service = _service(embedder)
+    prepared = service.preparar_documentos(_documents())
+    assert prepared[0].sentences == [REPEATED, PARAPHRASE]
+    embedder.batches.clear()
+
+    response = service.comparar_por_texto(SearchRequestDTO(query="quantum", documents=prepared))
+
+    assert response.answer and response.comparison.quantum.answer
+    # One query + document encoding shared by both modes, no sentence encodings.
+    assert embedder.calls == 2
+    assert all(REPEATED not in batch for batch in embedder.batches)
+
+
+def test_compare_mode_builds_one_answer_for_both_modes():
+    embedder = FakeEmbedder(table=VECTORS)
+
+    response = _service(embedder).comparar_por_texto(
+        SearchRequestDTO(query="quantum", documents=_documents())
+    )
+
+    assert response.answer == response.comparison.classical.answer
+    assert response.answer == response.comparison.quantum.answer
+    assert [name for name in response.timings if name.endswith("answer")] == ["classical.answer"]
+    assert [name for name in response.timings if name.endswith("encode")] == [
+        "classical.query_encode",
+        "classical.document_encode",
+    ]
+
+
+def test_answer_can_be_skipped():
+    embedder = FakeEmbedder(table=VECTORS)
+
+    response = _service(embedder).comparar_por_texto(
+        SearchRequestDTO(query="quantum", documents=_documents()), include_answer=False
+    )
+
+    assert response.answer is None and response.comparison.quantum.answer is None
+    assert not any(name.endswith("answer") for name in response.timings)
+    assert embedder.calls == 2
+
+
+def test_search_over_uploaded_corpus(monkeypatch):
+    monkeypatch.setattr(
+        search_controller, "_build_service", lambda: _service(FakeEmbedder(table=VECTORS))
+    )
+
+    upload = client.post(
+        "/search/uploads",
+        files={"file": ("doc.txt", f"{REPEATED} {OTHER}".encode(), "text/plain")},
+    )
+    upload_id = upload.json()["upload_id"]
+    response = client.post("/search", json={"query": "quantum", "upload_id": upload_id})
+    skipped = client.post(
+        "/search", json={"query": "quantum", "upload_id": upload_id, "include_answer": False}
+    )
+    missing = client.post("/search", json={"query": "quantum", "upload_id": "missing"})
+
+    assert response.status_code == 200
+    assert response.json()["results"][0]["doc_id"] == "uploaded-1"
+    assert REPEATED in response.json()["answer"]
+    assert skipped.json()["answer"] is None
+    assert missing.status_code == 404
@@ -0,0 +1,105 @@
+import threading
+
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+
+from infrastructure.api.auth import security
+from infrastructure.api.auth.throttle import LoginThrottle
+from infrastructure.api.fastapi_app import app
+from infrastructure.cache import LruTtlCache
+from infrastructure.persistence.models import User
+
+
+def test_register_login_and_me_on_the_async_session(database, monkeypatch):
+    monkeypatch.setattr(security, "principal_cache", LruTtlCache(16, 60))
+    client = TestClient(app)
+    credentials = {"email": "ana@example.com", "password": "segredo123"}
+
+    registered = client.post("/auth/register", json=credentials)
+    duplicate = client.post("/auth/register", json=credentials)
+    wrong = client.post("/auth/login", data={"username": credentials["email"], "password": "x"})
+    token = client.post(
+        "/auth/login",
+        data={"username": credentials["email"], "password": credentials["password"]},
+    ).json()["access_token"]
+    me = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+
+    assert registered.status_code == 201 and registered.json()["email"] == credentials["email"]
+    assert duplicate.status_code == 400
+    assert wrong.status_code == 401
+    assert me.json()["id"] == registered.json()["id"]
+    with database.session_factory() as db:
+        assert db.query(User).one().password_hash != credentials["password"]
+
+
+def _login(client, password):
+    return client.post("/auth/login", data={"username": "ana@example.com", "password": password})
+
+
+def test_login_rehashes_at_the_configured_cost_off_the_request_thread(database, monkeypatch):
+    with database.session_factory() as db:
+        old = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+        db.add(User(email="ana@example.com", password_hash=old.hash("segredo123")))
+        db.commit()
+    current = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=5)
+    check = current.verify_and_update
+    threads = []
+
+    def verify_and_update(secret, hashed):
+        threads.append(threading.current_thread().name)
+        return check(secret, hashed)
+
+    monkeypatch.setattr(security, "pwd_context", current)
+    monkeypatch.setattr(current, "verify_and_update", verify_and_update)
+    monkeypatch.setattr(security, "login_throttle", LoginThrottle(10, 60, 16))
+    client = TestClient(app)
+
+    assert _login(client, "segredo123").status_code == 200
+    with database.session_factory() as db:
+        assert db.query(User).one().password_hash.startswith("$2b$05$")
+    assert _login(client, "segredo123").status_code == 200
+    assert threads and all(name.startswith("password-hash") for name in threads)
+
+
+def test_login_attempts_are_throttled_per_account_before_hashing(database, monkeypatch):
+    checked = []
+    fast = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+    check = fast.verify_and_update
+    with database.session_factory() as db:
+        db.add(User(email="ana@example.com", password_hash=fast.hash("segredo123")))
+        db.add(User(email="bia@example.com", password_hash=fast.hash("segredo123")))
+        db.commit()
+
+    def verify_and_update(secret, hashed):
+        checked.append(secret)
+        return check(secret, hashed)
+
+    monkeypatch.setattr(security, "pwd_context", fast)
+    monkeypatch.setattr(fast, "verify_and_update", verify_and_update)
+    monkeypatch.setattr(security, "login_throttle", LoginThrottle(3, 60, 16))
+    client = TestClient(app)
+
+    statuses = [_login(client, "errada").status_code for _ in range(3)]
+    blocked = _login(client, "segredo123")
+    other = client.post(
+        "/auth/login", data={"username": "bia@example.com", "password": "segredo123"}
+    )
+
+    assert statuses == [401, 401, 401]
+    assert blocked.status_code == 429 and int(blocked.headers["retry-after"]) > 0
+    assert other.status_code == 200
+    assert checked == ["errada", "errada", "errada", "segredo123"]
+
+
+def test_password_work_is_rejected_when_its_queue_is_full(database, monkeypatch):
+    monkeypatch.setattr(security, "password_slots", threading.BoundedSemaphore(1))
+    monkeypatch.setattr(security, "login_throttle", LoginThrottle(10, 60, 16))
+    client = TestClient(app)
+    credentials = {"email": "ana@example.com", "password": "segredo123"}
+
+    security.password_slots.acquire()
+    busy = client.post("/auth/register", json=credentials)
+    security.password_slots.release()
+
+    assert busy.status_code == 503 and busy.headers["Retry-After"] == "1"
+    assert client.post("/auth/register", json=credentials).status_code == 201
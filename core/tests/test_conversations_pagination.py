@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from infrastructure.api.auth.security import Principal, get_current_principal
+from infrastructure.api.fastapi_app import app
+from infrastructure.persistence.models import Conversation, Message, User
+
+
+def _client(database, monkeypatch):
+    db = database.session_factory()
+    owner = User(email="owner@example.com", password_hash="x")
+    other = User(email="other@example.com", password_hash="x")
+    db.add_all([owner, other])
+    db.flush()
+    # Several rows share a timestamp, so the id has to break the ties.
+    start = datetime(2026, 1, 1)
+    for index in range(7):
+        conversation = Conversation(
+            user_id=owner.id, title=f"c{index}", created_at=start + timedelta(minutes=index // 2)
+        )
+        db.add(conversation)
+    db.add(Conversation(user_id=other.id, title="alheia", created_at=start))
+    db.flush()
+    first = db.query(Conversation).filter(Conversation.title == "c0").one()
+    for index in range(5):
+        db.add(
+            Message(
+                conversation_id=first.id,
+                role="user",
+                content=f"m{index}",
+                created_at=start + timedelta(seconds=index // 3),
+            )
+        )
+    db.commit()
+    owner_id = owner.id
+    db.close()
+
+    def current_user():
+        return Principal(id=owner_id, email="owner@example.com", created_at=start)
+
+    monkeypatch.setitem(app.dependency_overrides, get_current_principal, current_user)
+    return TestClient(app)
+
+
+def test_conversations_are_listed_newest_first_one_page_at_a_time(database, monkeypatch):
+    client = _client(database, monkeypatch)
+
+    titles, cursor = [], None
+    while True:
+        params = {"limit": 3} | ({"cursor": cursor} if cursor else {})
+        response = client.get(
+            "/conversations", params=params, headers={"Origin": "http://localhost:8080"}
+        )
+        assert response.status_code == 200
+        # Browser clients (the bundled frontend) can only follow a header CORS exposes.
+        assert "X-Next-Cursor" in response.headers["access-control-expose-headers"]
+        titles.extend(item["title"] for item in response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+
+    assert titles == ["c6", "c5", "c4", "c3", "c2", "c1", "c0"]
+    summary = client.get("/conversations").json()[-1]
+    assert summary["message_count"] == 5
+    assert summary["last_message_at"].startswith("2026-01-01T00:00:01")
+    assert "messages" not in summary
+
+
+def test_summary_listing_does_not_read_message_bodies(database, monkeypatch):
+    client = _client(database, monkeypatch)
+    statements = []
+    event.listen(
+        database.async_engine.sync_engine,
+        "before_cursor_execute",
+        lambda *args: statements.append(args[2]),
+    )
+
+    client.get("/conversations")
+
+    assert statements and not any("content" in statement for statement in statements)
+
+
+def test_messages_are_paged_oldest_first_after_the_detail(database, monkeypatch):
+    client = _client(database, monkeypatch)
+    conversation_id = client.get("/conversations").json()[-1]["id"]
+
+    detail = client.get(f"/conversations/{conversation_id}", params={"limit": 2}).json()
+    contents = [item["content"] for item in detail["messages"]]
+    cursor = detail["next_cursor"]
+    while cursor:
+        page = client.get(
+            f"/conversations/{conversation_id}/messages", params={"limit": 2, "cursor": cursor}
+        ).json()
+        contents.extend(item["content"] for item in page["items"])
+        cursor = page["next_cursor"]
+
+    assert contents == ["m0", "m1", "m2", "m3", "m4"]
+    assert client.get("/conversations", params={"cursor": "???"}).status_code == 400
@@ -0,0 +1,239 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from application.dtos import DocumentDTO
+from application.interfaces import Embedder
+from application.services import CorpusIndexService, SearchService
+from application.use_cases import BuscarPorArquivoUseCase, RealizarBuscaUseCase
+from infrastructure.api.corpora import corpora_controller
+from infrastructure.api.fastapi_app import app
+from infrastructure.api.search import search_controller
+from infrastructure.api.search.file_reader import PdfTxtDocumentTextExtractor
+from infrastructure.cache import LruTtlResultCache
+from infrastructure.corpora import FileCorpusSegmentStore, PreparedCorpusStore
+from infrastructure.quantum import CosineSimilarityComparator
+
+
+client = TestClient(app)
+
+
+class RecordingEmbedder(Embedder):
+    def __init__(self):
+        self.texts = []
+
+    def embed_texts(self, texts):
+        texts = list(texts)
+        self.texts.extend(texts)
+        return [[len(t), t.count("a") + 1, t.count("q") + 1] for t in texts]
+
+
+class BlockingEmbedder(RecordingEmbedder):
+    def __init__(self):
+        super().__init__()
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def embed_texts(self, texts):
+        self.started.set()
+        self.release.wait(5)
+        return super().embed_texts(texts)
+
+
+class FailingEmbedder(Embedder):
+    def embed_texts(self, texts):
+        raise AssertionError("stored documents must not be embedded again")
+
+
+class CompactingStore(FileCorpusSegmentStore):
+    # Lets another service compact the corpus right after a reader read its manifest.
+    def __init__(self, directory, writer):
+        super().__init__(directory)
+        self.writer = writer
+
+    def read_segment(self, corpus_id, name):
+        if self.writer is not None:
+            writer, self.writer = self.writer, None
+            writer.compactar(corpus_id)
+        return super().read_segment(corpus_id, name)
+
+
+def _docs(**texts):
+    return [DocumentDTO(doc_id=doc_id, text=text) for doc_id, text in texts.items()]
+
+
+def _service(directory, embedder=None, **kwargs):
+    return CorpusIndexService(
+        embedder or RecordingEmbedder(), FileCorpusSegmentStore(directory), "model", **kwargs
+    )
+
+
+def test_updates_and_deletes_append_segments_and_survive_a_restart(tmp_path):
+    embedder = RecordingEmbedder()
+    service = _service(tmp_path, embedder, compact_ratio=1.0)
+    service.criar_corpus(_docs(a="banana", b="qubits", c="futebol"), "news")
+
+    summary = service.adicionar_documentos(
+        "news", _docs(a="banana", b="qubits quanticos", d="bolo")
+    )
+    service.remover_documentos("news", ["c", "missing"])
+
+    # "a" did not change, so only the new and updated texts were embedded.
+    assert embedder.texts == ["banana", "qubits", "futebol", "qubits quanticos", "bolo"]
+    assert summary.segments == 2 and summary.deleted_rows == 1
+    manifest = json.loads((tmp_path / "news" / "manifest.json").read_text())
+    assert manifest["version"] == 3 and len(manifest["segments"]) == 2
+
+    restarted = _service(tmp_path, FailingEmbedder(), compact_ratio=1.0)
+    documents = restarted.documentos("news")
+    assert [(doc.doc_id, doc.text) for doc in documents] == [
+        ("a", "banana"),
+        ("b", "qubits quanticos"),
+        ("d", "bolo"),
+    ]
+    assert np.allclose(documents[1].embedding, [16, 2, 3])
+    assert restarted.resumo("news").deleted_rows == 2
+    assert service.documentos("unknown") is None and restarted.resumo("../news") is None
+
+
+def test_compaction_rewrites_live_rows_without_embedding_them(tmp_path):
+    service = _service(tmp_path, compact_ratio=0.5, max_segments=3)
+    service.criar_corpus(_docs(a="banana", b="qubits"), "c1")
+    service.adicionar_documentos("c1", _docs(c="bolo"))
+    service.adicionar_documentos("c1", _docs(d="futebol"))
+    before = service.resumo("c1")
+
+    # A fourth segment is over max_segments: the corpus is compacted into one.
+    after = service.adicionar_documentos("c1", _docs(e="xadrez"))
+    files = sorted(path.suffix for path in (tmp_path / "c1").iterdir())
+
+    assert before.segments == 3
+    assert after.segments == 1 and after.documents == 5 and after.deleted_rows == 0
+    assert files == [".json", ".jsonl", ".npy"]
+    # Tombstoning more than half of the rows compacts as well.
+    assert service.remover_documentos("c1", ["a", "b", "c"]).segments == 1
+    reloaded = _service(tmp_path, FailingEmbedder()).documentos("c1")
+    assert [doc.doc_id for doc in reloaded] == ["d", "e"]
+    assert np.allclose(reloaded[1].embedding, [6, 2, 1])
+
+
+def test_rows_of_another_model_are_embedded_again_on_compaction(tmp_path):
+    _service(tmp_path).criar_corpus(_docs(a="banana"), "c1")
+    embedder = RecordingEmbedder()
+    upgraded = CorpusIndexService(embedder, FileCorpusSegmentStore(tmp_path), "other-model")
+
+    assert upgraded.documentos("c1")[0].embedding is None
+    upgraded.compactar("c1")
+    assert embedder.texts == ["banana"]
+    assert upgraded.documentos("c1")[0].embedding is not None
+
+
+def test_a_read_racing_a_compaction_retries_with_the_new_manifest(tmp_path):
+    writer = _service(tmp_path)
+    writer.criar_corpus(_docs(a="banana"), "c1")
+    writer.adicionar_documentos("c1", _docs(b="qubits"))
+    reader = CorpusIndexService(FailingEmbedder(), CompactingStore(tmp_path, writer), "model")
+
+    documents = reader.documentos("c1")
+
+    assert [doc.doc_id for doc in documents] == ["a", "b"]
+    assert reader.resumo("c1").segments == 1
+
+
+def test_reads_return_the_last_commit_while_a_writer_embeds(tmp_path):
+    embedder = BlockingEmbedder()
+    embedder.release.set()
+    service = _service(tmp_path, embedder)
+    service.criar_corpus(_docs(a="banana"), "c1")
+    embedder.release.clear()
+    embedder.started.clear()
+
+    with ThreadPoolExecutor(2) as pool:
+        writing = pool.submit(service.adicionar_documentos, "c1", _docs(b="qubits"))
+        assert embedder.started.wait(5)
+        try:
+            reading = pool.submit(service.documentos, "c1").result(timeout=2)
+        finally:
+            embedder.release.set()
+        written = writing.result()
+
+    assert [doc.doc_id for doc in reading] == ["a"]
+    assert written.documents == 2
+    assert [doc.doc_id for doc in service.documentos("c1")] == ["a", "b"]
+
+
+def test_prepared_corpora_embed_the_sentences_of_changed_documents_only():
+    prepared = []
+
+    def prepare(documents):
+        prepared.extend(doc.doc_id for doc in documents)
+        return [
+            replace(doc, sentences=[doc.text], sentence_embeddings=[[1.0]]) for doc in documents
+        ]
+
+    store = PreparedCorpusStore()
+    first = store.prepare("kb", "v1", _docs(a="banana", b="qubits"), prepare)
+    again = store.prepare("kb", "v1", _docs(a="banana", b="qubits"), prepare)
+    updated = [DocumentDTO("a", "banana", embedding=[1, 2, 3]), DocumentDTO("b", "bits")]
+    second = store.prepare("kb", "v2", updated, prepare)
+
+    assert again is first and prepared == ["a", "b", "b"]
+    assert store.get("kb", "v1") is None and store.get("kb", "v2") is second
+    assert second.documents[0].sentences == ["banana"]
+    assert second.documents[0].embedding == [1, 2, 3]
+    assert len(second.lexical_index) == 2
+
+
+def test_search_targets_a_corpus_id_without_embedding_its_documents(monkeypatch, tmp_path):
+    service = _service(tmp_path)
+    monkeypatch.setattr(corpora_controller, "corpus_index", service)
+    monkeypatch.setattr(search_controller, "corpus_index", service)
+    monkeypatch.setattr(search_controller, "result_cache", LruTtlResultCache(16, 60))
+    embedder = RecordingEmbedder()
+    monkeypatch.setattr(
+        search_controller,
+        "_build_service",
+        lambda: SearchService(
+            RealizarBuscaUseCase(
+                embedder, CosineSimilarityComparator(), CosineSimilarityComparator()
+            ),
+            BuscarPorArquivoUseCase(PdfTxtDocumentTextExtractor()),
+        ),
+    )
+
+    created = client.post(
+        "/corpora",
+        json={
+            "corpus_id": "kb",
+            "documents": [
+                {"doc_id": "d1", "text": "banana banana"},
+                {"doc_id": "d2", "text": "qubits"},
+            ],
+        },
+    )
+    updated = client.put(
+        "/corpora/kb/documents", json={"documents": [{"doc_id": "d3", "text": "q"}]}
+    )
+    deleted = client.delete("/corpora/kb/documents", params={"doc_id": "d1"})
+    duplicate = client.post("/corpora", json={"corpus_id": "kb"})
+    invalid = client.post("/corpora", json={"corpus_id": "../kb"})
+    search = client.post(
+        "/search",
+        json={"query": "qubits", "corpus_id": "kb", "top_k": 5, "include_answer": False},
+    )
+    missing = client.post("/search", json={"query": "qubits", "corpus_id": "nope"})
+
+    assert created.status_code == 201 and created.json()["documents"] == 2
+    assert updated.json()["segments"] == 2
+    assert deleted.json()["documents"] == 2
+    assert duplicate.status_code == 409 and invalid.status_code == 400
+    assert search.status_code == 200
+    assert [item["doc_id"] for item in search.json()["results"]] == ["d2", "d3"]
+    assert embedder.texts == ["qubits"]
+    assert missing.status_code == 404
+    assert client.delete("/corpora/kb").status_code == 204
+    assert client.get("/corpora/kb").status_code == 404
@@ -0,0 +1,21 @@
+from infrastructure.persistence import database
+
+
+def test_async_url_swaps_in_the_asyncio_driver():
+    assert (
+        database.async_database_url("mysql+pymysql://tcc:s3cr%40t@db:3306/tcc")
+        == "mysql+aiomysql://tcc:s3cr%40t@db:3306/tcc"
+    )
+    assert database.async_database_url("sqlite:///./local.db") == "sqlite+aiosqlite:///./local.db"
+
+
+def test_pool_limits_only_apply_to_server_databases(monkeypatch):
+    monkeypatch.setattr(database, "DB_POOL_SIZE", 4)
+    monkeypatch.setattr(database, "DB_MAX_OVERFLOW", 2)
+
+    mysql = database.pool_options("mysql+aiomysql://tcc:tcc@db:3306/tcc")
+    sqlite = database.pool_options("sqlite+aiosqlite:///./local.db")
+
+    assert mysql["pool_size"] == 4 and mysql["max_overflow"] == 2
+    assert mysql["pool_pre_ping"] is database.DB_POOL_PRE_PING
+    assert "pool_size" not in sqlite and sqlite["pool_recycle"] == database.DB_POOL_RECYCLE
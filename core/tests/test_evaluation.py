@@ -0,0 +1,165 @@
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+import evaluate
+from application.dtos import (
+    DocumentDTO,
+    EvaluationConfigDTO,
+    EvaluationDatasetDTO,
+    EvaluationQueryDTO,
+)
+from application.interfaces import Embedder
+from application.services import EvaluationService
+from application.services.evaluation import ranking_metric_matrix
+from application.services.search.metrics import compute_ranking_metrics
+from application.use_cases import RealizarBuscaUseCase, SearchResult
+from domain.entities import Document
+from infrastructure.api.evaluations import evaluations_controller
+from infrastructure.api.search import search_controller
+from infrastructure.api.fastapi_app import app
+from infrastructure.datasets import PublicDatasetRepository
+from infrastructure.evaluation import report_to_csv, write_report
+from infrastructure.quantum import CosineSimilarityComparator
+
+
+client = TestClient(app)
+DATA_PATH = Path(__file__).resolve().parents[1] / "data" / "public_datasets.json"
+
+
+class FakeEmbedder(Embedder):
+    def __init__(self):
+        self.calls = 0
+
+    def embed_texts(self, texts):
+        self.calls += 1
+        return [[len(t), t.count("a") + 1, t.count("e") + 1] for t in texts]
+
+
+def _service(embedder=None):
+    # The cosine comparator stands in for the quantum rerank to keep the grid fast.
+    return EvaluationService(
+        RealizarBuscaUseCase(
+            embedder or FakeEmbedder(), CosineSimilarityComparator(), CosineSimilarityComparator()
+        )
+    )
+
+
+def _dataset():
+    return EvaluationDatasetDTO(
+        dataset_id="tiny",
+        documents=[
+            DocumentDTO(doc_id="d1", text="banana bread"),
+            DocumentDTO(doc_id="d2", text="green tea leaves"),
+            DocumentDTO(doc_id="d3", text="apple"),
+            DocumentDTO(doc_id="d4", text="cheese"),
+        ],
+        queries=[
+            EvaluationQueryDTO(query_id="q1", query="banana", relevant_doc_ids=["d1"]),
+            EvaluationQueryDTO(query_id="q2", query="tea", relevant_doc_ids=["d2", "d4"]),
+            EvaluationQueryDTO(query_id="q3", query="apple pie", relevant_doc_ids=["d3"]),
+            EvaluationQueryDTO(query_id="q4", query="unlabelled", relevant_doc_ids=[]),
+        ],
+    )
+
+
+def test_ranking_metric_matrix_matches_per_query_metrics():
+    rng = np.random.default_rng(11)
+    doc_ids = [f"d{i}" for i in range(8)]
+    rankings = [list(rng.permutation(doc_ids)[: rng.integers(1, 9)]) for _ in range(20)]
+    relevant = [
+        list(rng.choice(doc_ids, size=rng.integers(1, 4), replace=False)) for _ in range(20)
+    ]
+    top_ks = [1, 3, 5]
+
+    matrix = ranking_metric_matrix(rankings, relevant, top_ks)
+
+    for row, k in enumerate(top_ks):
+        for column, (ranking, labels) in enumerate(zip(rankings, relevant)):
+            results = [
+                SearchResult(document=Document(doc_id=doc_id, text=""), score=0.0)
+                for doc_id in ranking
+            ]
+            expected = compute_ranking_metrics(results, labels, k=k, latency_ms=0.0, candidate_k=k)
+            assert np.isclose(matrix["recall_at_k"][row, column], expected.recall_at_k)
+            assert np.isclose(matrix["mrr"][row, column], expected.mrr)
+            assert np.isclose(matrix["ndcg_at_k"][row, column], expected.ndcg_at_k)
+
+
+def test_evaluation_covers_the_grid_with_one_encoding():
+    embedder = FakeEmbedder()
+    config = EvaluationConfigDTO(top_ks=(1, 3), candidate_ks=(2, 4), workers=3)
+
+    report = _service(embedder).avaliar(_dataset(), config)
+
+    assert embedder.calls == 2
+    assert len(report.cells) == 2 * 2 * 2
+    classical = [cell for cell in report.cells if cell.mode == "classical" and cell.top_k == 3]
+    assert classical[0].recall_at_k == classical[1].recall_at_k
+    for cell in report.cells:
+        assert cell.queries == 4 and cell.labelled_queries == 3
+        assert cell.recall_at_k.ci_low <= cell.recall_at_k.mean <= cell.recall_at_k.ci_high
+        assert 0 < cell.latency.p50_ms <= cell.latency.p99_ms
+
+
+def test_reports_are_written_as_csv_and_json(tmp_path):
+    report = _service().avaliar(_dataset(), EvaluationConfigDTO(top_ks=(1,), candidate_ks=(2,)))
+
+    lines = report_to_csv(report).strip().splitlines()
+    assert lines[0].startswith("mode,top_k,candidate_k")
+    assert len(lines) == 1 + len(report.cells)
+
+    write_report(report, tmp_path / "report.json")
+    saved = json.loads((tmp_path / "report.json").read_text())
+    assert saved["dataset_id"] == "tiny" and len(saved["cells"]) == len(report.cells)
+
+
+def test_evaluation_job_endpoints(monkeypatch):
+    monkeypatch.setattr(evaluations_controller, "_build_service", _service)
+    monkeypatch.setattr(
+        evaluations_controller,
+        "PublicDatasetRepository",
+        lambda: PublicDatasetRepository(DATA_PATH),
+    )
+
+    created = client.post(
+        "/evaluations", json={"dataset_id": "mini-rag", "top_ks": [1, 3], "candidate_ks": [3]}
+    )
+    assert created.status_code == 202
+    job_id = created.json()["job_id"]
+
+    deadline = time.time() + 10
+    job = created.json()
+    while job["status"] not in ("done", "failed") and time.time() < deadline:
+        time.sleep(0.05)
+        job = client.get(f"/evaluations/{job_id}").json()
+
+    assert job["status"] == "done"
+    assert job["report"]["queries"] == 5
+    csv_response = client.get(f"/evaluations/{job_id}/report.csv")
+    assert csv_response.status_code == 200
+    assert csv_response.headers["content-type"].startswith("text/csv")
+    assert client.get("/evaluations/missing").status_code == 404
+
+
+def test_cli_uses_the_configured_quantum_comparator(monkeypatch, tmp_path):
+    built = []
+
+    def comparator():
+        built.append(CosineSimilarityComparator())
+        return built[-1]
+
+    monkeypatch.setattr(search_controller, "LocalEmbedder", FakeEmbedder)
+    monkeypatch.setattr(search_controller, "build_quantum_comparator", comparator)
+    output = tmp_path / "report.json"
+    argv = ["evaluate.py", "mini-rag", "--data-path", str(DATA_PATH), "--output", str(output)]
+    monkeypatch.setattr(sys, "argv", argv + ["--top-k", "1", "--candidate-k", "3"])
+
+    evaluate.main()
+
+    assert len(built) == 1
+    assert json.loads(output.read_text())["queries"] == 5
@@ -0,0 +1,21 @@
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+HEAVY_MODULES = ("torch", "transformers", "sentence_transformers", "pennylane")
+
+
+def test_api_import_does_not_load_model_or_quantum_libraries():
+    # Importing them takes several seconds; the API must start without them and load
+    # them on first use or in the warm-up thread (benchmarks/import_time.py).
+    code = (
+        "import sys, infrastructure.api.fastapi_app;"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=SRC, check=True, capture_output=True, text=True
+    )
+
+    assert result.stdout.strip() == ""
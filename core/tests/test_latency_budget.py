@@ -0,0 +1,127 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from application.dtos import DocumentDTO, SearchRequestDTO
+from application.instrumentation import RerankCostModel
+from infrastructure.api.fastapi_app import app
+from infrastructure.api.search import search_controller
+from infrastructure.quantum import CosineSimilarityComparator
+from tests.conftest import FakeEmbedder, build_search_service
+
+
+client = TestClient(app)
+DOCUMENTS = [DocumentDTO(doc_id=str(i), text="a" * i + "b" * (20 - i)) for i in range(1, 17)]
+
+
+class SlowComparator(CosineSimilarityComparator):
+    # Reverses the classical order so reranked and untouched candidates are told apart.
+    linear_cost = True
+
+    def __init__(self, delay_ms: float):
+        self.delay_ms = delay_ms
+        self.compared = 0
+        self.calls = 0
+
+    def compare_many(self, vector_a, vectors):
+        time.sleep(self.delay_ms * len(vectors) / 1000)
+        self.compared += len(vectors)
+        self.calls += 1
+        return [1.0 - score for score in super().compare_many(vector_a, vectors)]
+
+
+class OneCircuitComparator(SlowComparator):
+    linear_cost = False
+
+
+def _service(comparator, cost_model=None):
+    return build_search_service(FakeEmbedder("ab", length=False), comparator, cost_model)
+
+
+def test_cost_model_tracks_recent_cost_and_fits_budget():
+    model = RerankCostModel(alpha=0.5)
+    assert model.fit(10.0, 8) == 8
+
+    model.observe(4, 8.0)
+    model.observe(2, 8.0)
+
+    assert model.per_candidate_ms == 3.0
+    assert model.fit(10.0, 8) == 3
+    assert model.fit(100.0, 8) == 8
+    assert model.fit(-1.0, 8) == 0
+
+
+def test_budget_shrinks_rerank_and_keeps_classical_order_for_the_rest():
+    comparator = SlowComparator(delay_ms=5)
+    cost_model = RerankCostModel()
+    cost_model.observe(1, 5.0)
+    classical = _service(CosineSimilarityComparator()).buscar_por_texto(
+        SearchRequestDTO(query="aaaaaaaaaaaaaaaa", documents=DOCUMENTS), top_k=16
+    )
+
+    response = _service(comparator, cost_model).buscar_por_texto(
+        SearchRequestDTO(query="aaaaaaaaaaaaaaaa", documents=DOCUMENTS),
+        mode="quantum",
+        top_k=16,
+        candidate_k=16,
+        latency_budget_ms=40,
+    )
+
+    metrics = response.metrics
+    assert metrics.budget_truncated is True
+    assert 0 < metrics.effective_candidate_k < 16
+    assert comparator.compared == metrics.effective_candidate_k
+    assert len(response.results) == 16
+    untouched = [item.doc_id for item in response.results[metrics.effective_candidate_k :]]
+    expected = [item.doc_id for item in classical.results[metrics.effective_candidate_k :]]
+    assert untouched == expected
+
+
+def test_budget_splits_only_comparators_with_linear_cost():
+    linear, one_circuit = SlowComparator(delay_ms=0), OneCircuitComparator(delay_ms=0)
+
+    for comparator in (linear, one_circuit):
+        response = _service(comparator).buscar_por_texto(
+            SearchRequestDTO(query="ab", documents=DOCUMENTS),
+            mode="quantum",
+            candidate_k=16,
+            latency_budget_ms=5000,
+        )
+        assert response.metrics.effective_candidate_k == 16
+
+    assert linear.calls == 4
+    assert one_circuit.calls == 1
+
+
+def test_without_budget_every_candidate_is_reranked():
+    cost_model = RerankCostModel()
+    response = _service(SlowComparator(delay_ms=0), cost_model).buscar_por_texto(
+        SearchRequestDTO(query="ab", documents=DOCUMENTS), mode="quantum", candidate_k=6
+    )
+
+    assert response.metrics.effective_candidate_k == 6
+    assert response.metrics.budget_truncated is False
+    assert cost_model.per_candidate_ms is not None
+
+
+def test_search_endpoint_reports_budget_fields(monkeypatch):
+    monkeypatch.setattr(
+        search_controller, "_build_service", lambda: _service(CosineSimilarityComparator())
+    )
+    payload = {
+        "query": "aab",
+        "documents": [doc.text for doc in DOCUMENTS],
+        "mode": "compare",
+        "candidate_k": 4,
+        "latency_budget_ms": 5000,
+    }
+
+    response = client.post("/search", json=payload)
+    rejected = client.post("/search", json={**payload, "latency_budget_ms": 0})
+
+    assert response.status_code == 200
+    quantum = response.json()["comparison"]["quantum"]["metrics"]
+    assert quantum["effective_candidate_k"] == 4
+    assert quantum["budget_truncated"] is False
+    assert response.json()["metrics"]["effective_candidate_k"] is None
+    assert rejected.status_code == 400
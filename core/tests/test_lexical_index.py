@@ -0,0 +1,221 @@
+from pathlib import Path
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from application.dtos import (
+    BatchSearchRequestDTO,
+    DocumentDTO,
+    EvaluationConfigDTO,
+    EvaluationDatasetDTO,
+    EvaluationQueryDTO,
+)
+from application.interfaces import Embedder
+from application.services import EvaluationService, SearchService
+from application.use_cases import BuscarPorArquivoUseCase, LexicalStage, RealizarBuscaUseCase
+from infrastructure.api.fastapi_app import app
+from infrastructure.api.search import search_controller
+from infrastructure.api.search.file_reader import PdfTxtDocumentTextExtractor
+from infrastructure.datasets import (
+    DatasetCorpusStore,
+    PublicDatasetRepository,
+    dataset_corpus_store,
+)
+from infrastructure.evaluation import report_to_csv
+from infrastructure.quantum import CosineSimilarityComparator
+from infrastructure.retrieval import Bm25Index, LexicalIndexStore, tokenize
+
+
+client = TestClient(app)
+
+DOCUMENTS = [
+    DocumentDTO(doc_id="d1", text="Computação quântica usa qubits"),
+    DocumentDTO(doc_id="d2", text="receita de bolo de banana"),
+    DocumentDTO(doc_id="d3", text="qubits e portas quânticas em circuitos"),
+    DocumentDTO(doc_id="d4", text="banana verde e banana madura"),
+    DocumentDTO(doc_id="d5", text="historia do futebol brasileiro"),
+]
+
+
+class RecordingEmbedder(Embedder):
+    def __init__(self):
+        self.texts = []
+
+    def embed_texts(self, texts):
+        texts = list(texts)
+        self.texts.extend(texts)
+        return [[len(t), t.count("a") + 1, t.count("q") + 1] for t in texts]
+
+
+def _use_case(embedder=None):
+    return RealizarBuscaUseCase(
+        embedder or RecordingEmbedder(), CosineSimilarityComparator(), CosineSimilarityComparator()
+    )
+
+
+def _index():
+    return Bm25Index.build(doc.text for doc in DOCUMENTS)
+
+
+def test_bm25_ranks_matching_documents_and_survives_a_round_trip(tmp_path):
+    index = _index()
+
+    positions, scores = index.top("qubits quanticos computacao", 2)
+    index.save(tmp_path / "index.npz")
+    loaded = Bm25Index.load(tmp_path / "index.npz")
+
+    assert tokenize("Computação, QUÂNTICA!") == ["computacao", "quantica"]
+    assert positions.tolist() == [0, 2] and scores[0] > scores[1] > 0
+    # A repeated term outweighs a single occurrence of the same term.
+    assert index.top("banana", 1)[0].tolist() == [3]
+    assert len(loaded) == len(DOCUMENTS)
+    assert np.allclose(loaded.scores("banana qubits"), index.scores("banana qubits"))
+    # Ties, here documents without any query term, fill the pool in corpus order.
+    assert index.top("futebol", 3)[0].tolist() == [4, 0, 1]
+
+
+def test_lexical_stage_embeds_only_the_pool():
+    embedder = RecordingEmbedder()
+    stage = LexicalStage(index=_index(), pool_size=2)
+
+    encoded = _use_case(embedder).encode("banana", DOCUMENTS, lexical=stage)
+    unmatched = _use_case().encode("xadrez", DOCUMENTS, lexical=stage)
+
+    assert [doc.doc_id for doc in encoded.documents] == ["d2", "d4"]
+    assert embedder.texts == ["banana", DOCUMENTS[1].text, DOCUMENTS[3].text]
+    # No indexed term in the query: nothing to narrow by, the whole corpus is scored.
+    assert len(unmatched.documents) == len(DOCUMENTS)
+
+
+def test_rrf_fuses_the_lexical_and_dense_rankings():
+    use_case = _use_case()
+    dense = use_case.encode("banana", DOCUMENTS)
+    fused = use_case.encode(
+        "banana", DOCUMENTS, lexical=LexicalStage(index=_index(), pool_size=5, fusion="rrf")
+    )
+
+    dense_rank = {
+        doc_id: rank for rank, doc_id in enumerate(use_case.rank(dense)[0].doc_ids())
+    }
+    lexical_rank = {"d4": 0, "d2": 1, "d1": 2, "d3": 3, "d5": 4}
+    expected = [
+        1 / (61 + dense_rank[doc.doc_id]) + 1 / (61 + lexical_rank[doc.doc_id])
+        for doc in fused.documents
+    ]
+    assert [doc.doc_id for doc in fused.documents] == [doc.doc_id for doc in DOCUMENTS]
+    assert np.allclose(fused.base_scores, expected)
+
+
+def test_batch_embeds_the_union_of_the_pools_and_matches_single_queries():
+    embedder = RecordingEmbedder()
+    stage = LexicalStage(index=_index(), pool_size=2)
+    queries = ["banana", "qubits"]
+
+    batch = _use_case(embedder).encode_batch(queries, DOCUMENTS, lexical=stage)
+
+    assert sorted(embedder.texts[2:]) == sorted(DOCUMENTS[i].text for i in (0, 1, 2, 3))
+    for query, item in zip(queries, batch):
+        single = _use_case().encode(query, DOCUMENTS, lexical=stage)
+        assert [doc.doc_id for doc in item.documents] == [doc.doc_id for doc in single.documents]
+        assert np.allclose(item.base_scores, single.base_scores)
+
+    service = SearchService(_use_case(), BuscarPorArquivoUseCase(PdfTxtDocumentTextExtractor()))
+    response = service.buscar_em_lote(
+        BatchSearchRequestDTO(queries=queries, documents=DOCUMENTS), top_k=5, lexical=stage
+    )
+    assert [len(item.results) for item in response.responses] == [2, 2]
+
+
+def test_evaluation_reports_the_recall_lost_per_pool_size():
+    dataset = EvaluationDatasetDTO(
+        dataset_id="tiny",
+        documents=DOCUMENTS,
+        queries=[
+            EvaluationQueryDTO(query_id="q1", query="banana", relevant_doc_ids=["d2", "d4"]),
+            EvaluationQueryDTO(query_id="q2", query="qubits", relevant_doc_ids=["d1", "d5"]),
+        ],
+    )
+    config = EvaluationConfigDTO(
+        modes=("classical",), top_ks=(5,), candidate_ks=(2,), lexical_pools=(2, 5)
+    )
+
+    report = EvaluationService(_use_case()).avaliar(dataset, config, _index())
+
+    cells = {cell.lexical_pool: cell for cell in report.cells}
+    assert set(cells) == {None, 2, 5}
+    assert cells[None].recall_lost is None and cells[None].recall_at_k.mean == 1.0
+    # With two documents per pool, "d5" never reaches the dense stage for q2.
+    assert cells[2].recall_at_k.mean == 0.75 and cells[2].recall_lost.mean == 0.25
+    assert cells[5].recall_lost.mean == 0.0
+    header = report_to_csv(report).splitlines()[0].split(",")
+    assert "lexical_pool" in header and "recall_lost_mean" in header
+
+
+def test_dataset_indexes_are_persisted_by_corpus_fingerprint(tmp_path):
+    store = LexicalIndexStore()
+    store.build([DOCUMENTS], tmp_path)
+    reloaded = LexicalIndexStore()
+    reloaded.build([DOCUMENTS], tmp_path)
+
+    assert len(list(tmp_path.glob("*.npz"))) == 1
+    (fingerprint,) = [path.stem for path in tmp_path.glob("*.npz")]
+    assert np.allclose(reloaded.get(fingerprint).scores("banana"), _index().scores("banana"))
+
+
+def test_dataset_corpora_are_fingerprinted_once_per_dataset(monkeypatch):
+    hashed = []
+    fingerprint = dataset_corpus_store.corpus_fingerprint
+    monkeypatch.setattr(
+        dataset_corpus_store,
+        "corpus_fingerprint",
+        lambda documents: hashed.append(len(documents)) or fingerprint(documents),
+    )
+    repository = PublicDatasetRepository(
+        Path(__file__).resolve().parents[1] / "data" / "public_datasets.json"
+    )
+    store = DatasetCorpusStore()
+
+    (built,) = store.build(repository)
+    loaded = store.load(repository, "mini-rag")
+
+    assert loaded is built and store.get("mini-rag") is built
+    assert hashed == [len(built.documents)]
+    assert store.load(repository, "missing") is None
+
+
+def test_search_endpoint_narrows_uploads_with_their_stored_index(monkeypatch):
+    embedder = RecordingEmbedder()
+    monkeypatch.setattr(
+        search_controller,
+        "_build_service",
+        lambda: SearchService(
+            _use_case(embedder), BuscarPorArquivoUseCase(PdfTxtDocumentTextExtractor())
+        ),
+    )
+    text = "Historia do futebol brasileiro. " * 40 + "Receita de bolo de banana. " * 20
+    upload = client.post(
+        "/search/uploads", files={"file": ("doc.txt", text.encode("utf-8"), "text/plain")}
+    )
+    upload_id, chunks = upload.json()["upload_id"], upload.json()["documents"]
+    assert chunks > 1
+    assert len(search_controller.upload_store.lexical_index(upload_id)) == chunks
+
+    embedder.texts.clear()
+    response = client.post(
+        "/search",
+        json={
+            "query": "banana",
+            "upload_id": upload_id,
+            "lexical_pool": 1,
+            "include_answer": False,
+        },
+    )
+    invalid = client.post(
+        "/search", json={"query": "banana", "documents": ["a"], "fusion": "sum"}
+    )
+
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == 1
+    assert "banana" in response.json()["results"][0]["text"]
+    assert len(embedder.texts) == 2
+    assert invalid.status_code == 400
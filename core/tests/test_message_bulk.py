@@ -0,0 +1,82 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from infrastructure.api.auth.security import Principal, get_current_principal
+from infrastructure.api.fastapi_app import app
+from infrastructure.persistence.models import Conversation, Message, User
+
+
+def _client(database, monkeypatch):
+    with database.session_factory() as db:
+        owner = User(email="owner@example.com", password_hash="x")
+        other = User(email="other@example.com", password_hash="x")
+        db.add_all([owner, other])
+        db.flush()
+        mine = Conversation(user_id=owner.id, title="minha")
+        theirs = Conversation(user_id=other.id, title="alheia")
+        db.add_all([mine, theirs])
+        db.commit()
+        ids = {"owner": owner.id, "mine": mine.id, "theirs": theirs.id}
+
+    def current_user():
+        return Principal(
+            id=ids["owner"], email="owner@example.com", created_at=datetime(2026, 1, 1)
+        )
+
+    monkeypatch.setitem(app.dependency_overrides, get_current_principal, current_user)
+    return TestClient(app), ids
+
+
+# Without RETURNING (MySQL) the ids are read back in the same transaction.
+@pytest.mark.parametrize("returning", [True, False])
+def test_bulk_messages_are_inserted_in_order_with_one_statement(
+    database, monkeypatch, returning
+):
+    client, ids = _client(database, monkeypatch)
+    dialect = database.async_engine.sync_engine.dialect
+    monkeypatch.setattr(dialect, "insert_executemany_returning", returning)
+    statements = []
+    event.listen(
+        database.async_engine.sync_engine,
+        "before_cursor_execute",
+        lambda *args: statements.append(args[2]),
+    )
+    roles = ["user", "assistant"] * 30
+    messages = [{"role": role, "content": f"m{index}"} for index, role in enumerate(roles)]
+
+    response = client.post(
+        f"/conversations/{ids['mine']}/messages/bulk", json={"messages": messages}
+    )
+    page = client.get(f"/conversations/{ids['mine']}/messages").json()
+
+    assert response.status_code == 201
+    assert response.json()["ids"] == [item["id"] for item in page["items"]]
+    assert [item["content"] for item in page["items"]] == [f"m{index}" for index in range(60)]
+    assert sum(statement.startswith("INSERT INTO messages") for statement in statements) == 1
+
+
+def test_bulk_messages_are_validated_before_anything_is_written(database, monkeypatch):
+    client, ids = _client(database, monkeypatch)
+    messages = [
+        {"role": "user", "content": "a"},
+        {"role": "robot", "content": "b"},
+        {"role": "system", "content": "c"},
+        {"role": "", "content": "d"},
+    ]
+
+    invalid = client.post(
+        f"/conversations/{ids['mine']}/messages/bulk", json={"messages": messages}
+    )
+    foreign = client.post(
+        f"/conversations/{ids['theirs']}/messages/bulk",
+        json={"messages": [{"role": "user", "content": "a"}]},
+    )
+
+    assert invalid.status_code == 400
+    assert invalid.json()["detail"] == "Invalid role at positions 1, 3"
+    assert foreign.status_code == 404
+    with database.session_factory() as db:
+        assert db.query(Message).count() == 0
@@ -0,0 +1,55 @@
+import threading
+
+from fastapi.testclient import TestClient
+
+from infrastructure.api.fastapi_app import app
+from infrastructure.observability.prometheus import MetricsRegistry
+
+
+client = TestClient(app)
+
+
+def _sample(body: str, prefix: str) -> float:
+    for line in body.splitlines():
+        if line.startswith(prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{prefix} not found in scrape")
+
+
+def test_metrics_endpoint_counts_requests_per_route():
+    before = client.get("/metrics").text
+    series = 'http_requests_total{method="GET",route="/health",status="200"}'
+    baseline = _sample(before, series) if series in before else 0.0
+
+    client.get("/health")
+    client.get("/health")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert _sample(body, series) == baseline + 2
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/health",le="+Inf"}' in body
+    assert "http_requests_in_flight" in body
+
+
+def test_histogram_merges_observations_from_many_threads():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("work_seconds", "Work.", ("kind",), buckets=(1.0, 2.0))
+
+    def worker():
+        for _ in range(1000):
+            histogram.labels("a").observe(1.5)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    body = registry.render()
+    assert 'work_seconds_bucket{kind="a",le="1"} 0' in body
+    assert 'work_seconds_bucket{kind="a",le="2"} 8000' in body
+    assert 'work_seconds_count{kind="a"} 8000' in body
+    assert 'work_seconds_sum{kind="a"} 12000' in body
@@ -0,0 +1,81 @@
+import gc
+from pathlib import Path
+
+import numpy as np
+import torch
+
+from application.interfaces import Embedder
+from infrastructure.api import preload as preload_module
+from infrastructure.datasets import PublicDatasetRepository
+from infrastructure.embeddings import CorpusCachedEmbedder, CorpusMatrixStore
+
+
+DATA_PATH = Path(__file__).resolve().parents[1] / "data" / "public_datasets.json"
+
+
+class FakeEmbedder(Embedder):
+    def __init__(self):
+        self.texts = []
+
+    def embed_texts(self, texts):
+        texts = list(texts)
+        self.texts.extend(texts)
+        return [[float(len(t)), float(t.count("a"))] for t in texts]
+
+
+def test_cached_embedder_serves_stored_texts_and_encodes_the_rest(tmp_path):
+    store = CorpusMatrixStore()
+    store.build(["alpha", "beta", "alpha"], FakeEmbedder())
+    store.save(tmp_path / "corpus.npy")
+    loaded = CorpusMatrixStore()
+    loaded.load(tmp_path / "corpus.npy")
+    inner = FakeEmbedder()
+
+    vectors = CorpusCachedEmbedder(inner, loaded).embed_texts(["beta", "gamma", "alpha"])
+
+    assert isinstance(loaded.matrix, np.memmap) and len(loaded) == 2
+    assert vectors == [[4.0, 1.0], [5.0, 2.0], [5.0, 2.0]]
+    assert inner.texts == ["gamma"]
+
+
+def test_preload_builds_dataset_matrices_and_worker_sets_threads(monkeypatch):
+    store = CorpusMatrixStore()
+    loaded_models = []
+    monkeypatch.setattr(preload_module, "corpus_matrices", store)
+    monkeypatch.setattr(preload_module, "load_model", loaded_models.append)
+    monkeypatch.setattr(preload_module, "LocalEmbedder", FakeEmbedder)
+    monkeypatch.setattr(preload_module, "TORCH_NUM_THREADS", 3)
+    threads = torch.get_num_threads()
+
+    try:
+        preload_module.preload(PublicDatasetRepository(DATA_PATH))
+        assert torch.get_num_threads() == 1
+        assert gc.get_freeze_count() > 0
+
+        preload_module.configure_worker(workers=4)
+        assert torch.get_num_threads() == 3
+    finally:
+        gc.unfreeze()
+        torch.set_num_threads(threads)
+
+    assert loaded_models == ["all-MiniLM-L6-v2"]
+    dataset = PublicDatasetRepository(DATA_PATH).get_dataset("mini-rag")
+    texts = [item["text"] for item in dataset["documents"]]
+    assert all(row >= 0 for row in store.lookup(texts))
+
+
+def test_warm_up_logs_failures_instead_of_raising(monkeypatch, caplog):
+    def unavailable(model_name):
+        raise OSError("model files not found")
+
+    monkeypatch.setattr(preload_module, "load_model", unavailable)
+
+    preload_module.warm_up()
+
+    assert "Falha ao aquecer" in caplog.text
+
+
+def test_start_warm_up_is_disabled_by_setting(monkeypatch):
+    monkeypatch.setattr(preload_module, "SEARCH_WARMUP", False)
+
+    assert preload_module.start_warm_up() is None
@@ -0,0 +1,62 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from infrastructure.api.auth import security
+from infrastructure.api.auth.security import create_access_token
+from infrastructure.api.fastapi_app import app
+from infrastructure.cache import LruTtlCache
+from infrastructure.persistence.models import Conversation, User
+
+
+def _setup(database, monkeypatch):
+    session_factory = database.session_factory
+    with session_factory() as db:
+        user = User(email="owner@example.com", password_hash="x")
+        db.add(user)
+        db.flush()
+        db.add(Conversation(user_id=user.id, title="c"))
+        db.commit()
+        user_id = user.id
+
+    statements = []
+    event.listen(
+        database.async_engine.sync_engine,
+        "before_cursor_execute",
+        lambda *args: statements.append(args[2]),
+    )
+    monkeypatch.setattr(security, "principal_cache", LruTtlCache(16, 60))
+    headers = {"Authorization": f"Bearer {create_access_token(str(user_id))}"}
+    return TestClient(app), session_factory, statements, headers, user_id
+
+
+def _user_reads(statements):
+    return [statement for statement in statements if "FROM users" in statement]
+
+
+def test_principal_is_read_once_and_reused_across_requests(database, monkeypatch):
+    client, _, statements, headers, _ = _setup(database, monkeypatch)
+
+    for _ in range(5):
+        assert client.get("/conversations", headers=headers).status_code == 200
+
+    # One users read for five requests; each request still lists its conversations.
+    assert len(_user_reads(statements)) == 1
+    assert len(statements) == 6
+    assert "password_hash" not in _user_reads(statements)[0]
+
+
+def test_user_changes_invalidate_the_cached_principal(database, monkeypatch):
+    client, session_factory, _, headers, user_id = _setup(database, monkeypatch)
+    assert client.get("/auth/me", headers=headers).json()["email"] == "owner@example.com"
+
+    with session_factory() as db:
+        db.get(User, user_id).email = "renamed@example.com"
+        db.commit()
+
+    assert client.get("/auth/me", headers=headers).json()["email"] == "renamed@example.com"
+
+    with session_factory() as db:
+        db.delete(db.get(User, user_id))
+        db.commit()
+
+    assert client.get("/auth/me", headers=headers).status_code == 401
@@ -0,0 +1,157 @@
+from pathlib import Path
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from application.dtos import DocumentDTO
+from application.interfaces import Embedder
+from application.services import SearchService
+from application.use_cases import BuscarPorArquivoUseCase, RealizarBuscaUseCase, ShortlistStage
+from infrastructure.api.fastapi_app import app
+from infrastructure.api.search import search_controller
+from infrastructure.api.search.file_reader import PdfTxtDocumentTextExtractor
+from infrastructure.cache import LruTtlResultCache
+from infrastructure.datasets import PublicDatasetRepository
+from infrastructure.embeddings import CompressedCorpusStore, CorpusMatrixStore, PqVectorStore
+from infrastructure.quantum import CosineSimilarityComparator
+
+
+client = TestClient(app)
+DATA_PATH = Path(__file__).resolve().parents[1] / "data" / "public_datasets.json"
+
+
+class RecordingEmbedder(Embedder):
+    def __init__(self):
+        self.texts = []
+
+    def embed_texts(self, texts):
+        texts = list(texts)
+        self.texts.extend(texts)
+        return [[len(t), t.count("a") + 1, t.count("e") + 1, t.count("o") + 1] for t in texts]
+
+
+def _clustered(count, dim=32, clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    return centers[rng.integers(clusters, size=count)] + 0.3 * rng.normal(size=(count, dim))
+
+
+def _unit(vectors):
+    return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+def test_shortlist_recall_against_exact_cosine_at_a_fraction_of_the_memory():
+    vectors = _clustered(2000).astype(np.float32)
+    queries = _clustered(20, seed=1)
+    store = PqVectorStore.train(vectors, subspaces=8, centroids=64)
+    store.add(vectors)
+
+    found = []
+    for query in queries:
+        exact = np.argsort(-(_unit(vectors) @ _unit(query)), kind="stable")[:10]
+        shortlist, _ = store.search(query, 100)
+        # Exact re-scoring of the shortlist, as the search does before ranking.
+        rescored = shortlist[np.argsort(-(_unit(vectors[shortlist]) @ _unit(query)))[:10]]
+        found.append(len(set(exact) & set(rescored)) / 10)
+
+    assert np.mean(found) >= 0.9
+    # 8 code bytes and an 8-byte id per vector instead of 128 bytes of float32.
+    assert store.nbytes < vectors.nbytes / 4
+
+
+def test_store_add_remove_and_memory_mapped_round_trip(tmp_path):
+    vectors = _clustered(300)
+    store = PqVectorStore.train(vectors, subspaces=4, centroids=16)
+    assert store.add(vectors[:200]).tolist() == list(range(200))
+    assert store.add(vectors[200:]).tolist() == list(range(200, 300))
+
+    assert store.remove([5, 7, 999]) == 2
+    store.save(tmp_path)
+    loaded = PqVectorStore.load(tmp_path)
+    ids, scores = loaded.search(vectors[5], 10)
+
+    assert isinstance(np.load(tmp_path / "codes.npy", mmap_mode="r"), np.memmap)
+    assert len(loaded) == 298 and 5 not in ids.tolist()
+    assert np.allclose(scores, store.search(vectors[5], 10)[1])
+    loaded.add(vectors[5:6], [5])
+    assert 5 in loaded.search(vectors[5], 10)[0].tolist()
+
+
+def test_shortlist_stage_embeds_only_the_shortlist_and_scores_it_exactly():
+    documents = [DocumentDTO(doc_id=f"d{i}", text="ab" * i + "e" * (i % 3)) for i in range(1, 9)]
+    embedder = RecordingEmbedder()
+    vectors = np.asarray(embedder.embed_texts(doc.text for doc in documents), dtype=np.float32)
+    store = PqVectorStore.train(vectors, subspaces=2, centroids=8)
+    store.add(vectors)
+    use_case = RealizarBuscaUseCase(
+        embedder, CosineSimilarityComparator(), CosineSimilarityComparator()
+    )
+
+    embedder.texts.clear()
+    encoded = use_case.encode("abab", documents, shortlist=ShortlistStage(index=store, size=3))
+
+    shortlist, _ = store.search(embedder.embed_texts(["abab"])[0], 3)
+    expected = [documents[i] for i in sorted(shortlist)]
+    assert encoded.documents == expected
+    assert embedder.texts[1:4] == [doc.text for doc in expected]
+    exact = _unit(vectors[[documents.index(doc) for doc in expected]]) @ _unit(
+        np.asarray(encoded.query_vector)
+    )
+    assert np.allclose(encoded.base_scores, exact)
+
+
+def test_dataset_search_rescores_the_compressed_shortlist(monkeypatch, tmp_path):
+    repository = PublicDatasetRepository(DATA_PATH)
+    documents = [
+        DocumentDTO(doc_id=item["doc_id"], text=item["text"])
+        for item in repository.get_dataset("mini-rag")["documents"]
+    ]
+    matrices = CorpusMatrixStore()
+    matrices.build((doc.text for doc in documents), RecordingEmbedder())
+    compressed = CompressedCorpusStore()
+    compressed.build([documents], matrices, subspaces=2, train_sample=100, directory=tmp_path)
+    reloaded = CompressedCorpusStore()
+    reloaded.build([documents], CorpusMatrixStore(), 2, 100, tmp_path)
+    assert len(reloaded) == 1 and reloaded.nbytes == compressed.nbytes
+
+    embedder = RecordingEmbedder()
+    monkeypatch.setattr(search_controller, "PublicDatasetRepository", lambda: repository)
+    monkeypatch.setattr(search_controller, "result_cache", LruTtlResultCache(16, 60))
+    monkeypatch.setattr(search_controller, "compressed_corpora", reloaded)
+    monkeypatch.setattr(search_controller, "CORPUS_PQ_SHORTLIST", 2)
+    monkeypatch.setattr(
+        search_controller,
+        "_build_service",
+        lambda: SearchService(
+            RealizarBuscaUseCase(
+                embedder, CosineSimilarityComparator(), CosineSimilarityComparator()
+            ),
+            BuscarPorArquivoUseCase(PdfTxtDocumentTextExtractor()),
+        ),
+    )
+
+    response = client.post(
+        "/search/dataset",
+        json={
+            "dataset_id": "mini-rag",
+            "query_id": "q1",
+            "mode": "classical",
+            "include_answer": False,
+        },
+    )
+
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == 2
+    # The query and the two shortlisted documents.
+    assert len(embedder.texts) == 3
+
+
+def test_search_breaks_ties_at_the_cut_off_towards_the_earliest_rows():
+    best, other = _clustered(2, clusters=2)
+    vectors = np.stack([other] * 47 + [best] * 3)
+    store = PqVectorStore.train(np.stack([best, other]), subspaces=4, centroids=2)
+    store.add(vectors)
+
+    ids, _ = store.search(best, 5)
+
+    assert ids.tolist() == [47, 48, 49, 0, 1]
@@ -0,0 +1,82 @@
+import numpy as np
+
+from application.dtos import DocumentDTO
+from application.interfaces import Embedder
+from application.use_cases import LexicalStage, RealizarBuscaUseCase
+from infrastructure.quantum import (
+    CosineSimilarityComparator,
+    L2SamplingComparator,
+    SuperpositionSwapTestComparator,
+    SwapTestQuantumComparator,
+    build_sampling_index,
+    l2_sampling_comparator,
+)
+from infrastructure.retrieval import Bm25Index
+
+
+class LengthEmbedder(Embedder):
+    def embed_texts(self, texts):
+        return [[len(t), t.count("a") + 1, t.count("q") + 1, t.count(" ") + 1] for t in texts]
+
+
+def test_superposition_matches_separate_swap_tests():
+    rng = np.random.default_rng(0)
+    query = rng.normal(size=4).tolist()
+    candidates = [rng.normal(size=4).tolist() for _ in range(3)]
+
+    separate = [SwapTestQuantumComparator().compare(query, item) for item in candidates]
+    together = SuperpositionSwapTestComparator().compare_many(query, candidates)
+
+    assert np.allclose(together, separate, atol=1e-9)
+
+
+def test_superposition_resource_report_counts_one_execution():
+    comparator = SuperpositionSwapTestComparator()
+    report = comparator.resource_report([1.0, 0.0], [[1.0, 0.0], [0.0, 1.0]])
+
+    assert report.candidates == 2
+    assert report.superposition.executions == 1
+    assert report.separate.executions == 2
+    assert report.max_abs_error < 1e-9
+
+
+def test_l2_sampling_estimate_converges_to_cosine():
+    rng = np.random.default_rng(1)
+    query = rng.normal(size=32)
+    candidates = rng.normal(size=(5, 32)) + query
+    exact = candidates @ query / (np.linalg.norm(candidates, axis=1) * np.linalg.norm(query))
+
+    comparator = L2SamplingComparator(samples=20000, seed=3)
+    estimated = comparator.compare_indexed(query, build_sampling_index(candidates))
+
+    assert np.allclose(estimated, np.clip(exact, 0.0, 1.0), atol=0.05)
+
+
+def test_l2_sampling_reranks_from_the_corpus_index_built_at_ingestion(monkeypatch):
+    documents = [
+        DocumentDTO(doc_id=f"d{i}", text=text)
+        for i, text in enumerate(["banana", "qubits quanticos", "bolo de banana", "banana q"])
+    ]
+    lexical = LexicalStage(index=Bm25Index.build(doc.text for doc in documents), pool_size=2)
+
+    def search(use_case, docs, rerank_index=None):
+        encoded = use_case.encode("banana", docs, lexical=lexical, rerank_index=rerank_index)
+        return use_case.rank(encoded, mode="quantum", candidate_k=2)[0]
+
+    def use_case():
+        comparator = L2SamplingComparator(samples=64, seed=5)
+        return RealizarBuscaUseCase(LengthEmbedder(), CosineSimilarityComparator(), comparator)
+
+    expected = search(use_case(), documents)
+    indexing = use_case()
+    indexed, rerank_index = indexing.index_documents(documents)
+
+    def rebuilt(vectors):
+        raise AssertionError("the corpus index must be reused")
+
+    monkeypatch.setattr(l2_sampling_comparator, "build_sampling_index", rebuilt)
+    found = search(indexing, indexed, rerank_index)
+
+    assert all(doc.embedding is not None for doc in indexed)
+    assert found.doc_ids() == expected.doc_ids()
+    assert [item.score for item in found] == [item.score for item in expected]
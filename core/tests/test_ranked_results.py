@@ -0,0 +1,77 @@
+import json
+
+from application.dtos import (
+    DocumentDTO,
+    SearchComparisonDTO,
+    SearchMetricsDTO,
+    SearchResponseDTO,
+    SearchResponseLiteDTO,
+    SearchResultDTO,
+)
+from application.services.search.metrics import compute_ranking_metrics
+from application.use_cases import RankedResults, SearchResult
+from domain.entities import Document
+from infrastructure.api.search import serialization
+from infrastructure.api.search.schemas import SearchResponse as SearchResponseSchema
+
+
+DOCUMENTS = [DocumentDTO(doc_id=f"d{i}", text=f"texto {i}") for i in range(6)]
+
+
+def test_ranked_results_order_by_score_and_materialize_on_read():
+    results = RankedResults.by_score(DOCUMENTS, [0.2, 0.9, 0.5, 0.9, 0.1, 0.5])
+
+    top = results[:3]
+
+    assert isinstance(top, RankedResults) and len(top) == 3
+    assert results.doc_ids() == ["d1", "d3", "d2", "d5", "d0", "d4"]
+    assert list(top) == [
+        SearchResult(document=Document(doc_id="d1", text="texto 1"), score=0.9),
+        SearchResult(document=Document(doc_id="d3", text="texto 3"), score=0.9),
+        SearchResult(document=Document(doc_id="d2", text="texto 2"), score=0.5),
+    ]
+
+
+def test_ranked_results_metrics_match_a_list_of_results():
+    results = RankedResults.by_score(DOCUMENTS, [0.2, 0.9, 0.5, 0.9, 0.1, 0.5])
+    reranked = RankedResults.by_score(DOCUMENTS, [0.3, 0.7], [4, 0]).extend(results[2:4])
+
+    for ranking in (results, reranked):
+        expected = compute_ranking_metrics(
+            list(ranking), ["d2", "d4"], k=3, latency_ms=0.0, candidate_k=3
+        )
+        actual = compute_ranking_metrics(ranking, ["d2", "d4"], k=3, latency_ms=0.0, candidate_k=3)
+        assert actual == expected
+    assert reranked.doc_ids() == ["d0", "d4", "d2", "d5"]
+
+
+def test_response_is_serialized_in_the_schema_shape():
+    lite = SearchResponseLiteDTO(
+        results=[SearchResultDTO(doc_id="d1", text='aspas " e acentuação', score=0.5)],
+        answer=None,
+        metrics=SearchMetricsDTO(
+            recall_at_k=1.0,
+            mrr=1.0,
+            ndcg_at_k=1.0,
+            latency_ms=2.5,
+            k=1,
+            candidate_k=2,
+            has_labels=True,
+        ),
+    )
+    response = SearchResponseDTO(
+        query="consulta",
+        mode="compare",
+        results=lite.results,
+        answer="resposta",
+        metrics=lite.metrics,
+        comparison=SearchComparisonDTO(classical=lite, quantum=lite),
+    )
+
+    fields = serialization.response_fields(response)
+    fields.append(("timings", serialization.encode_timings({"total": 3.0})))
+    body = json.loads(serialization.encode_object(fields))
+
+    assert SearchResponseSchema.model_validate(body).model_dump() == body
+    assert body["results"][0]["text"] == 'aspas " e acentuação'
+    assert body["comparison"]["quantum"]["metrics"]["k"] == 1
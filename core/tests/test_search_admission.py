@@ -0,0 +1,156 @@
+import json
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from application.interfaces import Embedder
+from application.services import SearchService
+from application.use_cases import BuscarPorArquivoUseCase, RealizarBuscaUseCase
+from infrastructure.api.evaluations import evaluations_controller
+from infrastructure.api.fastapi_app import app
+from infrastructure.api.search import executors, search_controller
+from infrastructure.api.search.executors import (
+    BoundedExecutor,
+    ExecutorSaturated,
+    OffloadedComparator,
+)
+from infrastructure.api.search.file_reader import PdfTxtDocumentTextExtractor
+from infrastructure.cache import LruTtlResultCache
+from infrastructure.datasets import PublicDatasetRepository
+from infrastructure.quantum import CosineSimilarityComparator
+
+
+client = TestClient(app)
+DATA_PATH = Path(__file__).resolve().parents[1] / "data" / "public_datasets.json"
+
+
+def test_bounded_executor_rejects_when_full():
+    executor = BoundedExecutor("test", workers=1, queue_size=1)
+    release = threading.Event()
+
+    running = executor.submit(release.wait)
+    queued = executor.submit(release.wait)
+    with pytest.raises(ExecutorSaturated):
+        executor.submit(release.wait)
+
+    release.set()
+    running.result(timeout=5)
+    queued.result(timeout=5)
+    assert executor.submit(lambda: 42).result(timeout=5) == 42
+
+
+def test_search_returns_503_with_retry_after_when_saturated(monkeypatch):
+    executor = BoundedExecutor("test", workers=1, queue_size=0)
+    monkeypatch.setattr(search_controller, "encoder_executor", executor)
+    release = threading.Event()
+    busy = executor.submit(release.wait)
+
+    try:
+        response = client.post("/search", json={"query": "q", "documents": ["a"]})
+        health = client.get("/health")
+    finally:
+        release.set()
+        busy.result(timeout=5)
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(search_controller.SEARCH_RETRY_AFTER_SECONDS)
+    assert health.status_code == 200
+
+
+class FakeEmbedder(Embedder):
+    def embed_texts(self, texts):
+        return [[len(t), t.count("a") + 1] for t in texts]
+
+
+def _quantum_service(monkeypatch, quantum):
+    service = SearchService(
+        RealizarBuscaUseCase(
+            FakeEmbedder(),
+            CosineSimilarityComparator(),
+            OffloadedComparator(CosineSimilarityComparator(), quantum),
+        ),
+        BuscarPorArquivoUseCase(PdfTxtDocumentTextExtractor()),
+    )
+    monkeypatch.setattr(search_controller, "_build_service", lambda: service)
+    monkeypatch.setattr(search_controller, "result_cache", LruTtlResultCache(16, 60))
+
+
+DOCUMENTS = ["abc is first.", "aaaa is second.", "xyz is third."]
+
+
+def test_admitted_reranks_wait_for_a_quantum_slot(monkeypatch):
+    quantum = BoundedExecutor("test-quantum", workers=1, queue_size=0)
+    _quantum_service(monkeypatch, quantum)
+    release = threading.Event()
+    busy = quantum.submit(release.wait)
+    threading.Timer(0.2, release.set).start()
+
+    search = client.post(
+        "/search", json={"query": "abc", "documents": DOCUMENTS, "mode": "quantum"}
+    )
+    busy.result(timeout=5)
+
+    assert search.status_code == 200 and len(search.json()["results"]) == 3
+
+
+def test_reranks_give_up_once_the_wait_times_out(monkeypatch):
+    monkeypatch.setattr(executors, "SEARCH_ADMITTED_WAIT_SECONDS", 0.05)
+    quantum = BoundedExecutor("test-quantum", workers=1, queue_size=0)
+    _quantum_service(monkeypatch, quantum)
+    release = threading.Event()
+    busy = quantum.submit(release.wait)
+
+    try:
+        search = client.post(
+            "/search", json={"query": "abc", "documents": DOCUMENTS, "mode": "quantum"}
+        )
+        stream = client.post(
+            "/search/stream", json={"query": "abc", "documents": DOCUMENTS, "mode": "compare"}
+        )
+    finally:
+        release.set()
+        busy.result(timeout=5)
+
+    assert search.status_code == 503 and "retry-after" in search.headers
+    # The classical ranking was already sent, so the stream ends with an error event.
+    events = [json.loads(line) for line in stream.text.splitlines()]
+    assert events[0]["event"] == "results" and events[0]["mode"] == "classical"
+    assert events[-1] == {"event": "error", "detail": "Servidor ocupado, tente novamente"}
+
+
+def test_evaluations_do_not_use_the_request_quantum_pool(monkeypatch):
+    quantum = BoundedExecutor("test-quantum", workers=1, queue_size=0)
+    monkeypatch.setattr(search_controller, "quantum_executor", quantum)
+    monkeypatch.setattr(search_controller, "LocalEmbedder", FakeEmbedder)
+    monkeypatch.setattr(search_controller, "build_quantum_comparator", CosineSimilarityComparator)
+    monkeypatch.setattr(
+        evaluations_controller,
+        "PublicDatasetRepository",
+        lambda: PublicDatasetRepository(DATA_PATH),
+    )
+    release = threading.Event()
+    busy = quantum.submit(release.wait)
+
+    try:
+        created = client.post(
+            "/evaluations",
+            json={
+                "dataset_id": "mini-rag",
+                "modes": ["classical", "quantum"],
+                "top_ks": [3],
+                "candidate_ks": [3],
+            },
+        )
+        job = created.json()
+        deadline = time.time() + 10
+        while job["status"] not in ("done", "failed") and time.time() < deadline:
+            time.sleep(0.05)
+            job = client.get(f"/evaluations/{job['job_id']}").json()
+    finally:
+        release.set()
+        busy.result(timeout=5)
+
+    assert job["status"] == "done" and job["error"] is None
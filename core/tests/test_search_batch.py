@@ -0,0 +1,142 @@
+import threading
+from pathlib import Path
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from application.dtos import BatchSearchRequestDTO, DocumentDTO, SearchRequestDTO
+from infrastructure.api.fastapi_app import app
+from infrastructure.api.search import search_controller
+from infrastructure.api.search.executors import BoundedExecutor, OffloadedComparator
+from infrastructure.datasets import PublicDatasetRepository
+from infrastructure.quantum import CosineSimilarityComparator, SwapTestQuantumComparator
+from tests.conftest import FakeEmbedder, build_search_service
+
+
+client = TestClient(app)
+
+
+def _build_service(embedder=None):
+    return build_search_service(embedder or FakeEmbedder("ax"), SwapTestQuantumComparator())
+
+
+DOCUMENTS = [
+    DocumentDTO(doc_id="1", text="abc"),
+    DocumentDTO(doc_id="2", text="aaaa"),
+    DocumentDTO(doc_id="3", text="xyz xyz"),
+    DocumentDTO(doc_id="4", text="axa"),
+]
+QUERIES = ["abc", "xx", "aaaaaa"]
+
+
+def test_cosine_compare_matrix_matches_pairwise_scores():
+    rng = np.random.default_rng(3)
+    left = rng.normal(size=(4, 6)).tolist()
+    right = rng.normal(size=(5, 6)).tolist() + [[0.0] * 6]
+    comparator = CosineSimilarityComparator()
+
+    matrix = comparator.compare_matrix(left, right)
+
+    expected = [[comparator.compare(a, b) for b in right] for a in left]
+    assert np.allclose(matrix, expected)
+
+
+def test_batch_search_encodes_corpus_once_and_matches_single_queries():
+    embedder = FakeEmbedder("ax")
+    service = _build_service(embedder)
+
+    batch = service.buscar_em_lote(
+        BatchSearchRequestDTO(queries=QUERIES, documents=DOCUMENTS),
+        mode="compare",
+        candidate_k=3,
+    )
+
+    assert embedder.calls == 2
+    assert [item.query for item in batch.responses] == QUERIES
+    for query, item in zip(QUERIES, batch.responses):
+        single = _build_service().comparar_por_texto(
+            SearchRequestDTO(query=query, documents=DOCUMENTS), candidate_k=3
+        )
+        for mode in ("classical", "quantum"):
+            got = getattr(item.comparison, mode).results
+            want = getattr(single.comparison, mode).results
+            assert [r.doc_id for r in got] == [r.doc_id for r in want]
+            assert np.allclose([r.score for r in got], [r.score for r in want])
+    assert "quantum.rerank" in batch.timings
+
+
+def test_offloaded_compare_batch_uses_all_workers():
+    started = []
+    both_running = threading.Barrier(2, timeout=5)
+
+    class SlowComparator(CosineSimilarityComparator):
+        def compare_many(self, vector_a, vectors):
+            started.append(threading.current_thread().name)
+            both_running.wait()
+            return super().compare_many(vector_a, vectors)
+
+    comparator = OffloadedComparator(
+        SlowComparator(), BoundedExecutor("batch-test", workers=2, queue_size=2)
+    )
+
+    scores = comparator.compare_batch([[1.0, 0.0], [0.0, 1.0]], [[[1.0, 0.0]], [[1.0, 0.0]]])
+
+    assert scores == [[1.0], [0.0]]
+    assert len(set(started)) == 2
+
+
+def test_batch_endpoint_with_inline_documents(monkeypatch):
+    monkeypatch.setattr(search_controller, "_build_service", _build_service)
+
+    response = client.post(
+        "/search/batch",
+        json={"queries": QUERIES, "documents": [doc.text for doc in DOCUMENTS], "top_k": 2},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["query"] for item in body["results"]] == QUERIES
+    assert all(len(item["results"]) == 2 for item in body["results"])
+    assert "total" in body["timings"]
+
+
+def test_batch_endpoint_with_dataset_reports_labelled_metrics(monkeypatch):
+    monkeypatch.setattr(search_controller, "_build_service", _build_service)
+    data_path = Path(__file__).resolve().parents[1] / "data" / "public_datasets.json"
+    monkeypatch.setattr(
+        search_controller, "PublicDatasetRepository", lambda: PublicDatasetRepository(data_path)
+    )
+
+    response = client.post("/search/batch", json={"dataset_id": "mini-rag", "mode": "compare"})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [item["query_id"] for item in results] == ["q1", "q2", "q3", "q4", "q5"]
+    assert all(item["comparison"]["quantum"]["metrics"]["has_labels"] for item in results)
+
+
+def test_batch_endpoint_with_upload_handle(monkeypatch):
+    monkeypatch.setattr(search_controller, "_build_service", _build_service)
+
+    upload = client.post(
+        "/search/uploads",
+        files={"file": ("doc.txt", b"First sentence. Second sentence here.", "text/plain")},
+    )
+    assert upload.status_code == 200
+    upload_id = upload.json()["upload_id"]
+
+    response = client.post("/search/batch", json={"queries": ["first"], "upload_id": upload_id})
+    missing = client.post("/search/batch", json={"queries": ["first"], "upload_id": "missing"})
+
+    assert response.status_code == 200
+    assert response.json()["results"][0]["results"][0]["doc_id"] == "uploaded-1"
+    assert missing.status_code == 404
+
+
+def test_batch_endpoint_requires_a_single_corpus_source():
+    response = client.post(
+        "/search/batch",
+        json={"queries": ["q"], "documents": ["a"], "dataset_id": "mini-rag"},
+    )
+
+    assert response.status_code == 400
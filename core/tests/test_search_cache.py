@@ -0,0 +1,118 @@
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from application.dtos import DocumentDTO, SearchResponseDTO
+from application.services.search import corpus_fingerprint, search_cache_key
+from infrastructure.api.fastapi_app import app
+from infrastructure.api.search import search_controller
+from infrastructure.cache import LruTtlResultCache
+from infrastructure.datasets import PublicDatasetRepository
+from tests.conftest import build_search_service
+
+
+client = TestClient(app)
+DATA_PATH = Path(__file__).resolve().parents[1] / "data" / "public_datasets.json"
+
+
+def _counting_builder(builds):
+    def build():
+        builds.append(1)
+        return build_search_service()
+
+    return build
+
+
+def _use_fresh_cache(monkeypatch, builds):
+    monkeypatch.setattr(search_controller, "_build_service", _counting_builder(builds))
+    monkeypatch.setattr(search_controller, "result_cache", LruTtlResultCache(16, 60))
+
+
+def test_cache_key_normalizes_query_and_separates_parameters():
+    fingerprint = corpus_fingerprint([DocumentDTO(doc_id="1", text="abc")])
+    key = search_cache_key("what  is\tit ", fingerprint, "model", mode="classical", top_k=5)
+
+    assert key == search_cache_key("what is it", fingerprint, "model", mode="classical", top_k=5)
+    assert key != search_cache_key("what is it", fingerprint, "model", mode="quantum", top_k=5)
+    assert key != search_cache_key("what is it", fingerprint, "other", mode="classical", top_k=5)
+    assert corpus_fingerprint([DocumentDTO("1", "ab"), DocumentDTO("2", "c")]) != corpus_fingerprint(
+        [DocumentDTO("1", "a"), DocumentDTO("2", "bc")]
+    )
+
+
+def test_lru_ttl_cache_evicts_least_recently_used_and_expired_entries():
+    response = SearchResponseDTO(query="q", mode="classical", results=[])
+    cache = LruTtlResultCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", response)
+    cache.set("b", response)
+    cache.get("a")
+    cache.set("c", response)
+
+    assert cache.get("a") is response
+    assert cache.get("b") is None
+
+    expiring = LruTtlResultCache(max_entries=2, ttl_seconds=0)
+    expiring.set("a", response)
+    assert expiring.get("a") is None
+
+
+def test_repeated_search_is_served_from_cache(monkeypatch):
+    builds = []
+    _use_fresh_cache(monkeypatch, builds)
+    payload = {"query": "abc", "documents": ["abc", "aaaa", "xyz"], "mode": "compare"}
+
+    first = client.post("/search", json=payload)
+    second = client.post("/search", json={**payload, "query": "  abc "})
+
+    assert len(builds) == 1
+    assert first.json()["metrics"]["cached"] is False
+    body = second.json()
+    assert body["metrics"]["cached"] is True
+    assert body["comparison"]["quantum"]["metrics"]["cached"] is True
+    assert body["results"] == first.json()["results"]
+    assert "cache_lookup" in body["timings"]
+
+
+def test_dataset_search_honours_if_none_match(monkeypatch):
+    builds = []
+    _use_fresh_cache(monkeypatch, builds)
+    monkeypatch.setattr(
+        search_controller,
+        "PublicDatasetRepository",
+        lambda: PublicDatasetRepository(DATA_PATH),
+    )
+    payload = {"dataset_id": "mini-rag", "query_id": "q1"}
+
+    first = client.post("/search/dataset", json=payload)
+    etag = first.headers["etag"]
+    not_modified = client.post("/search/dataset", json=payload, headers={"If-None-Match": etag})
+    other_query = client.post(
+        "/search/dataset", json={**payload, "query_id": "q2"}, headers={"If-None-Match": etag}
+    )
+
+    assert first.status_code == 200
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+    assert other_query.status_code == 200
+    assert other_query.headers["etag"] != etag
+    assert len(builds) == 2
+
+
+def test_budget_truncated_dataset_search_gets_no_etag(monkeypatch):
+    _use_fresh_cache(monkeypatch, [])
+    monkeypatch.setattr(
+        search_controller,
+        "PublicDatasetRepository",
+        lambda: PublicDatasetRepository(DATA_PATH),
+    )
+    payload = {
+        "dataset_id": "mini-rag",
+        "query_id": "q1",
+        "mode": "quantum",
+        "latency_budget_ms": 0.000001,
+    }
+
+    response = client.post("/search/dataset", json=payload)
+
+    assert response.json()["metrics"]["budget_truncated"] is True
+    assert "etag" not in response.headers
@@ -0,0 +1,74 @@
+from application.dtos import DocumentDTO, SearchFileRequestDTO, SearchRequestDTO
+from application.instrumentation import StageLatencyAggregator
+from infrastructure.quantum import SwapTestQuantumComparator
+from tests.conftest import build_search_service
+
+
+def _build_service():
+    return build_search_service(quantum=SwapTestQuantumComparator())
+
+
+def _request():
+    return SearchRequestDTO(
+        query="abc",
+        documents=[
+            DocumentDTO(doc_id="1", text="abc"),
+            DocumentDTO(doc_id="2", text="aaaa"),
+            DocumentDTO(doc_id="3", text="xyz xyz"),
+        ],
+    )
+
+
+def test_quantum_search_reports_circuit_metrics_when_requested():
+    response = _build_service().buscar_por_texto(
+        _request(), mode="quantum", candidate_k=2, instrument=True
+    )
+
+    quantum = response.metrics.quantum
+    assert quantum.circuit_executions == 2
+    assert quantum.qubits == 3
+    assert quantum.circuit_depth > 0
+    assert quantum.gate_counts
+    assert quantum.rerank_ms >= quantum.simulator_ms
+
+
+def test_instrumentation_is_opt_in():
+    service = _build_service()
+
+    quantum = service.buscar_por_texto(_request(), mode="quantum")
+    classical = service.buscar_por_texto(_request(), mode="classical", instrument=True)
+
+    assert quantum.metrics.quantum is None
+    assert classical.metrics.quantum is None
+
+
+def test_search_returns_per_stage_timings():
+    response = _build_service().comparar_por_texto(_request(), candidate_k=2)
+
+    for stage in ("query_encode", "document_encode", "scoring", "answer", "result_mapping"):
+        assert f"classical.{stage}" in response.timings
+    # Encoding and answer are shared, so they are timed once, under classical.
+    for stage in ("query_encode", "document_encode", "answer"):
+        assert f"quantum.{stage}" not in response.timings
+    assert "quantum.rerank" in response.timings and "quantum.result_mapping" in response.timings
+    assert "classical.rerank" not in response.timings
+
+
+def test_file_search_times_extraction_and_chunking():
+    request = SearchFileRequestDTO(query="abc", filename="doc.txt", content=b"abc. aaaa.")
+
+    response = _build_service().buscar_por_arquivo(request)
+
+    assert {"extract", "chunk", "scoring"} <= set(response.timings)
+
+
+def test_stage_latency_aggregator_percentiles():
+    aggregator = StageLatencyAggregator(window=100)
+    for value in range(1, 101):
+        aggregator.record({"scoring": float(value)})
+
+    stats = aggregator.percentiles()["scoring"]
+
+    assert stats["count"] == 100
+    assert stats["p50"] == 50.0
+    assert stats["p99"] == 99.0
@@ -0,0 +1,131 @@
+from datetime import datetime
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from infrastructure.api.auth.security import (
+    Principal,
+    get_current_principal,
+    get_optional_principal,
+)
+from infrastructure.api.fastapi_app import app
+from infrastructure.api.search import search_controller
+from infrastructure.cache import LruTtlResultCache
+from infrastructure.datasets import PublicDatasetRepository
+from infrastructure.persistence.models import Conversation, SearchRun, User
+from tests.conftest import FakeEmbedder, build_search_service
+
+
+DATA_PATH = Path(__file__).resolve().parents[1] / "data" / "public_datasets.json"
+
+
+def _setup(database, monkeypatch, authenticated=True):
+    session_factory = database.session_factory
+    db = session_factory()
+    owner = User(email="owner@example.com", password_hash="x")
+    other = User(email="other@example.com", password_hash="x")
+    db.add_all([owner, other])
+    db.flush()
+    mine = Conversation(user_id=owner.id, title="minha")
+    theirs = Conversation(user_id=other.id, title="alheia")
+    db.add_all([mine, theirs])
+    db.commit()
+    ids = {"owner": owner.id, "mine": mine.id, "theirs": theirs.id}
+    db.close()
+
+    def current_user():
+        return Principal(
+            id=ids["owner"], email="owner@example.com", created_at=datetime(2026, 1, 1)
+        )
+
+    embedder = FakeEmbedder()
+
+    monkeypatch.setattr(
+        search_controller, "_build_service", lambda: build_search_service(embedder)
+    )
+    monkeypatch.setattr(search_controller, "result_cache", LruTtlResultCache(16, 60))
+    monkeypatch.setitem(app.dependency_overrides, get_current_principal, current_user)
+    monkeypatch.setitem(
+        app.dependency_overrides,
+        get_optional_principal,
+        current_user if authenticated else (lambda: None),
+    )
+    return TestClient(app), session_factory, embedder, ids
+
+
+def test_search_in_a_conversation_is_stored_and_replayed_without_encoding(database, monkeypatch):
+    client, session_factory, embedder, ids = _setup(database, monkeypatch)
+    payload = {
+        "query": "banana",
+        "documents": ["banana bread", "apple pie", "banana split"],
+        "mode": "compare",
+        "top_k": 2,
+        "conversation_id": ids["mine"],
+    }
+
+    searched = client.post("/search", json=payload)
+    calls = embedder.calls
+    runs = client.get(f"/conversations/{ids['mine']}/search-runs").json()
+    replayed = client.get(f"/conversations/{ids['mine']}/search-runs/{runs[0]['id']}")
+
+    assert searched.status_code == 200 and replayed.status_code == 200
+    assert replayed.json() == searched.json()
+    assert embedder.calls == calls
+    assert runs[0]["query"] == "banana" and runs[0]["mode"] == "compare"
+
+    with session_factory() as db:
+        run = db.get(SearchRun, runs[0]["id"])
+        assert run.parameters["top_k"] == 2
+        assert run.total_ms == searched.json()["timings"]["total"]
+        assert set(run.metrics) == {"classical", "quantum"}
+        assert [(item.mode, item.rank) for item in run.results] == [
+            ("classical", 1),
+            ("classical", 2),
+            ("quantum", 1),
+            ("quantum", 2),
+        ]
+
+
+def test_runs_are_only_stored_in_the_callers_conversations(database, monkeypatch):
+    client, session_factory, _, ids = _setup(database, monkeypatch)
+    payload = {"query": "banana", "documents": ["banana"], "conversation_id": ids["theirs"]}
+
+    assert client.post("/search", json=payload).status_code == 404
+    assert client.get(f"/conversations/{ids['theirs']}/search-runs").status_code == 404
+    anonymous = client.post("/search", json={"query": "banana", "documents": ["banana"]})
+    assert anonymous.status_code == 200
+    with session_factory() as db:
+        assert db.query(SearchRun).count() == 0
+
+
+def test_conversation_id_requires_a_token(database, monkeypatch):
+    client, _, embedder, ids = _setup(database, monkeypatch, authenticated=False)
+
+    payload = {"query": "banana", "documents": ["banana"], "conversation_id": ids["mine"]}
+    response = client.post("/search", json=payload)
+
+    assert response.status_code == 401
+    assert embedder.calls == 0
+
+
+def test_dataset_search_in_a_conversation_is_stored_despite_if_none_match(
+    database, monkeypatch
+):
+    client, session_factory, _, ids = _setup(database, monkeypatch)
+    monkeypatch.setattr(
+        search_controller,
+        "PublicDatasetRepository",
+        lambda: PublicDatasetRepository(DATA_PATH),
+    )
+    payload = {"dataset_id": "mini-rag", "query_id": "q1"}
+    etag = client.post("/search/dataset", json=payload).headers["etag"]
+
+    recorded = client.post(
+        "/search/dataset",
+        json={**payload, "conversation_id": ids["mine"]},
+        headers={"If-None-Match": etag},
+    )
+
+    assert recorded.status_code == 200
+    with session_factory() as db:
+        assert db.query(SearchRun).count() == 1
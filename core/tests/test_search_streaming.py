@@ -0,0 +1,114 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from application.dtos import DocumentDTO, SearchRequestDTO
+from infrastructure.api.fastapi_app import app
+from infrastructure.api.search import search_controller
+from infrastructure.quantum import CosineSimilarityComparator
+from tests.conftest import FakeEmbedder, build_search_service
+
+
+client = TestClient(app)
+
+
+class CountingComparator(CosineSimilarityComparator):
+    def __init__(self):
+        self.calls = 0
+
+    def compare_many(self, vector_a, vectors):
+        self.calls += 1
+        return super().compare_many(vector_a, vectors)
+
+
+def _build_service(embedder=None, quantum=None):
+    return build_search_service(embedder, quantum or CountingComparator())
+
+
+def _request():
+    return SearchRequestDTO(
+        query="abc",
+        documents=[
+            DocumentDTO(doc_id="1", text="abc is the first sentence of the corpus here."),
+            DocumentDTO(doc_id="2", text="aaaa appears in the second and longer document."),
+            DocumentDTO(doc_id="3", text="xyz xyz closes the corpus with a third sentence."),
+        ],
+    )
+
+
+def test_staged_search_emits_classical_before_quantum_and_encodes_once():
+    embedder = FakeEmbedder()
+    stream = _build_service(embedder=embedder).buscar_em_etapas(_request(), candidate_k=2)
+
+    events = [next(stream)]
+    # Query and documents are embedded once, before the first ranking...
+    assert embedder.calls == 2
+    events += [next(stream), next(stream)]
+    # ...and the quantum ranking reuses them; the classical answer only embeds its
+    # sentences, and the quantum answer reuses those as well.
+    assert embedder.calls == 3
+    events += list(stream)
+    assert embedder.calls == 3
+
+    assert [(event.event, event.mode) for event in events] == [
+        ("results", "classical"),
+        ("answer", "classical"),
+        ("results", "quantum"),
+        ("answer", "quantum"),
+        ("done", None),
+    ]
+    assert events[0].response.results and events[0].response.answer is None
+    assert events[1].answer
+    assert "quantum.rerank" in events[-1].timings
+
+
+def test_closing_staged_search_skips_quantum_rerank():
+    quantum = CountingComparator()
+    events = _build_service(quantum=quantum).buscar_em_etapas(_request(), candidate_k=2)
+
+    assert next(events).mode == "classical"
+    assert next(events).event == "answer"
+    events.close()
+
+    assert quantum.calls == 0
+
+
+def test_stream_endpoint_returns_ndjson_events(monkeypatch):
+    monkeypatch.setattr(search_controller, "_build_service", _build_service)
+
+    response = client.post(
+        "/search/stream",
+        json={
+            "query": "abc",
+            "documents": [doc.text for doc in _request().documents],
+            "mode": "compare",
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [item["event"] for item in events] == ["results", "answer", "results", "answer", "done"]
+    assert events[0]["mode"] == "classical" and events[0]["results"]
+    assert events[2]["mode"] == "quantum"
+    assert "total" in events[-1]["timings"]
+
+
+def test_file_stream_endpoint_supports_server_sent_events(monkeypatch):
+    monkeypatch.setattr(search_controller, "_build_service", _build_service)
+
+    response = client.post(
+        "/search/file/stream",
+        data={"query": "abc", "mode": "classical"},
+        files={"file": ("doc.txt", b"abc. aaaa.", "text/plain")},
+        headers={"Accept": "text/event-stream"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    names = [
+        line[len("event: ") :]
+        for line in response.text.splitlines()
+        if line.startswith("event: ")
+    ]
+    assert names == ["results", "answer", "done"]
@@ -26,6 +26,12 @@ export interface Message {
 
 export interface ConversationDetail extends Conversation {
   messages: Message[];
+  next_cursor?: string | null;
+}
+
+export interface MessagePage {
+  items: Message[];
+  next_cursor?: string | null;
 }
 
 export interface SearchResult {
@@ -139,15 +145,24 @@ class ApiClient {
   }
 
   async getConversations(): Promise<Conversation[]> {
-    const response = await fetch(`${API_BASE_URL}/conversations`, {
-      headers: this.getHeaders(),
-    });
-
-    if (!response.ok) {
-      throw new Error('Erro ao carregar conversas');
-    }
-
-    return response.json();
+    // The list is paged; X-Next-Cursor points to the next page until the last one.
+    const conversations: Conversation[] = [];
+    let cursor: string | null = null;
+    do {
+      const query: string = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+      const response: Response = await fetch(`${API_BASE_URL}/conversations${query}`, {
+        headers: this.getHeaders(),
+      });
+
+      if (!response.ok) {
+        throw new Error('Erro ao carregar conversas');
+      }
+
+      conversations.push(...((await response.json()) as Conversation[]));
+      cursor = response.headers.get('X-Next-Cursor');
+    } while (cursor);
+
+    return conversations;
   }
 
   async createConversation(title: string): Promise<Conversation> {
@@ -184,6 +199,28 @@ class ApiClient {
       throw new Error('Conversa no encontrada');
     }
 
+    // The detail brings the first page of messages; next_cursor continues it.
+    const conversation: ConversationDetail = await response.json();
+    let cursor = conversation.next_cursor ?? null;
+    while (cursor) {
+      const page = await this.getMessages(id, cursor);
+      conversation.messages.push(...page.items);
+      cursor = page.next_cursor ?? null;
+    }
+
+    return conversation;
+  }
+
+  async getMessages(conversationId: number, cursor: string): Promise<MessagePage> {
+    const query = `?cursor=${encodeURIComponent(cursor)}`;
+    const response = await fetch(`${API_BASE_URL}/conversations/${conversationId}/messages${query}`, {
+      headers: this.getHeaders(),
+    });
+
+    if (!response.ok) {
+      throw new Error('Erro ao carregar mensagens');
+    }
+
     return response.json();
   }
 